@@ -0,0 +1,266 @@
+import asyncio
+from contextlib import asynccontextmanager
+from .AsyncMFRC522 import AsyncMFRC522
+from .AsyncTag import AsyncTag
+from .BasicMFRC522 import BasicMFRC522
+
+
+class AsyncBasicMFRC522:
+    """
+    An asyncio version of BasicMFRC522 for reading and writing data on MIFARE Classic cards.
+
+    The blocking methods wait for a card with `asyncio.sleep` instead of `time.sleep`, and every
+    exchange with the card is awaited, so the event loop keeps running other coroutines.
+
+    Attributes:
+        MFRC522 (AsyncMFRC522): The reader used for communication with the cards.
+        KEY (list): The default authentication key used for reading and writing data.
+        keyring (KeyRing): The candidate keys tried instead of KEY, or None.
+    """
+
+    # Seconds between two attempts to find a card in the blocking methods
+    POLL_INTERVAL = 0.2
+
+    def __init__(self, KEY=[0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF], keyring=None, reader=None, **kwargs):
+        """
+        Initializes an AsyncBasicMFRC522 instance.
+
+        Args:
+            KEY (list): The authentication key used for reading and writing data.
+            keyring (KeyRing): Candidate keys to try per sector, with a cache of the key that worked
+                for each card (default None, which authenticates with KEY as key A).
+            reader (MFRC522 or AsyncMFRC522): The reader to use (default None, which creates one).
+            **kwargs: The arguments of MFRC522 when no reader is given.
+        """
+        if isinstance(reader, AsyncMFRC522):
+            self.MFRC522 = reader
+        else:
+            self.MFRC522 = AsyncMFRC522(reader, **kwargs)
+        self.KEY = KEY
+        self.keyring = keyring
+
+    def close(self):
+        """
+        Close the MFRC522 instance to free up resources.
+        """
+        self.MFRC522.Close()
+
+    async def read_id(self):
+        """
+        Wait for a card and read its ID.
+
+        Returns:
+            int: The tag ID as an integer.
+        """
+        id = await self.read_id_no_block()
+        while not id:
+            await asyncio.sleep(self.POLL_INTERVAL)
+            id = await self.read_id_no_block()
+        return id
+
+    async def read_id_no_block(self):
+        """
+        Attempt to read the ID of a card.
+
+        Returns:
+            int: The tag ID as an integer, or None if the operation fails.
+        """
+        (status, TagType) = await self.MFRC522.Request(self.MFRC522.PICC_REQIDL)
+        if status != self.MFRC522.MI_OK:
+            return None
+        (status, uid, sak) = await self.MFRC522.SelectCard()
+        if status != self.MFRC522.MI_OK:
+            return None
+        return self._uid_to_num(uid)
+
+    async def read(self, trailer_block=11):
+        """
+        Wait for a card and read the data blocks of one sector.
+
+        Args:
+            trailer_block (int): The block number of the sector trailer (default 11).
+
+        Returns:
+            tuple: A tuple containing the tag ID (as an integer) and the data read (as a string).
+        """
+        id, text = await self.read_no_block(trailer_block)
+        while not id:
+            await asyncio.sleep(self.POLL_INTERVAL)
+            id, text = await self.read_no_block(trailer_block)
+        return id, text
+
+    async def read_no_block(self, trailer_block=11):
+        """
+        Attempt to read the data blocks of one sector.
+
+        Args:
+            trailer_block (int): The block number of the sector trailer (default 11).
+
+        Returns:
+            tuple: A tuple containing the tag ID (as an integer) and the data read (as a string),
+                or (None, None) if the operation fails.
+        """
+        if not self._check_trailer_block(trailer_block):
+            raise ValueError("Invalid Trailer Block {trailer_block}")
+
+        tag = await self._select_no_block()
+        if tag is None:
+            return None, None
+
+        data = bytearray()
+        try:
+            for block_num in range(trailer_block - 3, trailer_block):
+                block = await tag.read_block(block_num)
+                if block:
+                    data += block
+        finally:
+            await tag.release(halt=False)
+        # One character per byte
+        return tag.id, data.decode('latin-1')
+
+    async def write(self, text, trailer_block=11):
+        """
+        Wait for a card and write text to the data blocks of one sector.
+
+        Args:
+            text (str): The data to write.
+            trailer_block (int): The block number of the sector trailer (default 11).
+
+        Returns:
+            tuple: A tuple containing the tag ID (as an integer) and the data written (as a string).
+        """
+        id, text_in = await self.write_no_block(text, trailer_block)
+        while not id:
+            await asyncio.sleep(self.POLL_INTERVAL)
+            id, text_in = await self.write_no_block(text, trailer_block)
+        return id, text_in
+
+    async def write_no_block(self, text, trailer_block=11):
+        """
+        Attempt to write text to the data blocks of one sector.
+
+        Args:
+            text (str): The data to write.
+            trailer_block (int): The block number of the sector trailer (default 11).
+
+        Returns:
+            tuple: A tuple containing the tag ID (as an integer) and the data written (as a string),
+                or (None, None) if the operation fails.
+        """
+        if not self._check_trailer_block(trailer_block):
+            raise ValueError("Invalid Trailer Block {trailer_block}")
+
+        text = str(text)
+        tag = await self._select_no_block()
+        if tag is None:
+            return None, None
+
+        data = bytearray(text.ljust(3 * 16).encode('ascii'))
+        try:
+            for i, block_num in enumerate(range(trailer_block - 3, trailer_block)):
+                if await tag.write_block(block_num, data[(i*16):(i+1)*16]) != self.MFRC522.MI_OK:
+                    return None, None
+        finally:
+            await tag.release(halt=False)
+        return tag.id, text[0:3 * 16]
+
+    async def tags(self, halt=True):
+        """
+        Iterate over the cards presented to the reader.
+
+        Each card is selected once and yielded as an AsyncTag. The session with a card ends when
+        the loop asks for the next one, and the card is halted so it is not yielded again while
+        it stays in the field.
+
+        Args:
+            halt (bool): Put each card into the HALT state when moving on to the next one.
+
+        Yields:
+            AsyncTag: The selected card.
+        """
+        while True:
+            tag = await self._select_no_block()
+            if tag is None:
+                await asyncio.sleep(self.POLL_INTERVAL)
+                continue
+            try:
+                yield tag
+            finally:
+                await tag.release(halt)
+
+    @asynccontextmanager
+    async def session(self, halt=True):
+        """
+        Keep a card selected across several operations, see BasicMFRC522.session.
+
+        Args:
+            halt (bool): Put the card into the HALT state when the session ends.
+
+        Yields:
+            AsyncTag: The selected card.
+        """
+        tag = await self._select_no_block()
+        while tag is None:
+            await asyncio.sleep(self.POLL_INTERVAL)
+            tag = await self._select_no_block()
+        try:
+            yield tag
+        finally:
+            await tag.release(halt)
+
+    async def _select_no_block(self):
+        """
+        Attempt to select a card.
+
+        Returns:
+            AsyncTag: The selected card, or None if the operation fails.
+        """
+        (status, TagType) = await self.MFRC522.Request(self.MFRC522.PICC_REQIDL)
+        if status != self.MFRC522.MI_OK:
+            return None
+        (status, uid, sak) = await self.MFRC522.SelectCard()
+        if status != self.MFRC522.MI_OK:
+            return None
+        return AsyncTag(self, uid, sak)
+
+    async def _authenticate(self, uid, trailer_block):
+        """
+        Authenticate a sector with KEY, or with the candidate keys of the key ring, see BasicMFRC522._authenticate.
+
+        Returns:
+            int: The status of the authentication.
+        """
+        if self.keyring is None:
+            return await self.MFRC522.Authenticate(self.MFRC522.PICC_AUTHENT1A, trailer_block, self.KEY, uid)
+
+        sector = self._sector_of(trailer_block)
+        attempts = 0
+        for auth_mode, key in self.keyring.candidates(uid, sector):
+            if attempts and not await self._reselect(uid):
+                break
+            attempts += 1
+            status = await self.MFRC522.Authenticate(auth_mode, trailer_block, key, uid)
+            if status == self.MFRC522.MI_OK:
+                self.keyring.remember(uid, sector, auth_mode, key, attempts)
+                return status
+        self.keyring.failed(uid, sector)
+        return self.MFRC522.MI_ERR
+
+    async def _reselect(self, uid):
+        """
+        Wake up and select a card again after it fell back to IDLE.
+
+        Returns:
+            bool: True if the same card was selected again.
+        """
+        self.MFRC522.StopCrypto1()
+        (status, TagType) = await self.MFRC522.Request(self.MFRC522.PICC_REQALL)
+        if status != self.MFRC522.MI_OK:
+            return False
+        (status, sak) = await self.MFRC522.SelectUID(uid)
+        return status == self.MFRC522.MI_OK
+
+    # The card layout and conversion helpers do no I/O and are shared with BasicMFRC522
+    _sector_of = BasicMFRC522._sector_of
+    _check_trailer_block = BasicMFRC522._check_trailer_block
+    _uid_to_num = BasicMFRC522._uid_to_num
@@ -0,0 +1,385 @@
+import asyncio
+from time import monotonic
+from .MFRC522 import MFRC522
+
+
+class AsyncMFRC522:
+    """
+    An asyncio front end for an MFRC522 reader.
+
+    Register accesses stay synchronous, as one SPI transfer takes a few microseconds. Every wait for
+    the chip or the card is awaited instead: the interrupt request register is polled between
+    `asyncio.sleep` calls, or, with an IRQ pin, the falling edge is handed to the event loop. One
+    event loop can drive several readers without blocking other coroutines.
+
+    Attributes the class does not define, such as the register and command constants, are looked
+    up on the wrapped MFRC522, and so are the methods of SYNC_METHODS, which do no I/O. Any other
+    method of MFRC522 would block the event loop and raises AttributeError; call it on MFRC522
+    when that is intended.
+
+    Attributes:
+        MFRC522 (MFRC522): The wrapped synchronous reader.
+    """
+
+    # Methods of MFRC522 without an awaitable version that can be called from a coroutine
+    SYNC_METHODS = frozenset(('ValueBlock', 'ParseValueBlock', 'CheckCRC', 'gpio_pins'))
+
+    def __init__(self, reader=None, **kwargs):
+        """
+        Initializes an AsyncMFRC522 instance.
+
+        Args:
+            reader (MFRC522): The reader to drive (default None, which creates an MFRC522 with kwargs).
+            **kwargs: The arguments of MFRC522 when no reader is given.
+        """
+        self.MFRC522 = reader if reader is not None else MFRC522(**kwargs)
+        self._loop = None
+        self._irq = None
+        if self.MFRC522.pin_irq is not None:
+            self.MFRC522.gpio.add_event_callback(self.MFRC522.pin_irq, self._irq_callback)
+
+    def __getattr__(self, name):
+        if name == 'MFRC522':
+            raise AttributeError(name)
+        value = getattr(self.MFRC522, name)
+        if callable(value) and name not in self.SYNC_METHODS:
+            raise AttributeError("{} has no awaitable {}, call it on the wrapped MFRC522".format(
+                type(self).__name__, name))
+        return value
+
+    def Close(self):
+        """
+        Close the wrapped MFRC522.
+        """
+        self.MFRC522.Close()
+
+    def _irq_callback(self, channel):
+        """
+        GPIO edge callback for the IRQ pin, run on the GPIO thread; wakes the coroutine in _wait_irq.
+        """
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._irq.set)
+
+    def _bind_loop(self):
+        # asyncio.Event binds to a loop on Python < 3.10, so create it in the running one
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._irq = asyncio.Event()
+            self._loop = loop
+
+    async def _wait_irq(self, reg, mask, timeout):
+        """
+        Wait until any of the bits in mask is set in an interrupt request register.
+
+        Without an IRQ pin the register is polled with asyncio sleeps that double up to
+        POLL_SLEEP_MAX. With an IRQ pin the coroutine waits for the next falling edge, bounded by
+        25 ms so a missed edge degrades to slow polling.
+
+        Args:
+            reg (int): the interrupt request register to poll.
+            mask (int): the bits to wait for.
+            timeout (float): the software time limit in seconds.
+
+        Returns:
+            tuple: The last value read from the register and whether the time limit was hit.
+        """
+        start = monotonic()
+        delay = 0.0001
+        self.MFRC522._polls = 0
+        while True:
+            n = self.MFRC522.ReadReg(reg)
+            self.MFRC522._polls += 1
+            if n & mask:
+                return n, False
+            if monotonic() - start >= timeout:
+                return n, True
+            if self.MFRC522.pin_irq is not None:
+                try:
+                    await asyncio.wait_for(self._irq.wait(), 0.025)
+                except asyncio.TimeoutError:
+                    pass
+                self._irq.clear()
+            else:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MFRC522.POLL_SLEEP_MAX)
+
+    async def MFRC522_ToCard(self, command, sendData, timeout=None, maxLen=None):
+        """
+        Executes a command on the MFRC522 and communicates with the tag or card.
+
+        Args:
+            command (int): The command to execute.
+            sendData (list): A list of bytes to send to the tag or card.
+            timeout (float): The hardware timeout in milliseconds (default None, which uses timeouts['default']).
+            maxLen (int): The most bytes of the answer to read (default None, which uses MAX_LEN).
+
+        Returns:
+            tuple: The status, the bytes received and the number of bits received.
+        """
+        reader = self.MFRC522
+        if timeout is None:
+            timeout = reader.timeouts['default']
+
+        if reader.metrics is not None:
+            mark = reader._metrics_mark()
+
+        self._bind_loop()
+        self._irq.clear()
+        (irqEn, waitIRq) = reader._start_command(command, sendData, timeout)
+        (n, timedOut) = await self._wait_irq(reader.CommIrqReg, waitIRq | 0x01, timeout / 1000.0 + 0.025)
+        result = reader._finish_command(command, irqEn, n, timedOut, maxLen)
+        if reader.metrics is not None:
+            reader._record_command(command, sendData, mark, result[0])
+        return result
+
+    async def TransceiveCRC(self, sendData, timeout=None, rxCRC=True, maxLen=None):
+        """
+        Transceives a frame with its CRC_A, see MFRC522.TransceiveCRC.
+        """
+        frame = await self._crc_frame(sendData, rxCRC)
+        return await self.MFRC522_ToCard(self.MFRC522.PCD_TRANSCEIVE, frame, timeout, maxLen)
+
+    async def CalulateCRC(self, pIndata):
+        """
+        Calculates the CRC_A of the data, see MFRC522.CalulateCRC. With crc='chip' the wait for
+        the coprocessor is awaited.
+
+        Returns:
+            list: The two CRC bytes.
+        """
+        reader = self.MFRC522
+        if reader.crc_mode != 'chip':
+            return reader.CalulateCRC(pIndata)
+        self._bind_loop()
+        self._irq.clear()
+        reader._start_crc(pIndata)
+        await self._wait_irq(reader.DivIrqReg, 0x04, 0.025)
+        return reader._crc_result()
+
+    async def _crc_frame(self, sendData, rxCRC):
+        """
+        Prepares a frame for TransceiveCRC, see MFRC522._crc_frame.
+        """
+        if self.MFRC522.crc_mode != 'chip':
+            return self.MFRC522._crc_frame(sendData, rxCRC)
+        return bytes(sendData) + bytes(await self.CalulateCRC(sendData))
+
+    async def Request(self, reqMode):
+        """
+        Sends a request command to a tag or card, see MFRC522.Request.
+
+        Returns:
+            tuple: The status and the number of bits received.
+        """
+        reader = self.MFRC522
+        reader.SetFrameCRC(False, False)
+        reader.SetBitFraming(0x07)
+
+        (status, backData, backBits) = await self.MFRC522_ToCard(
+            reader.PCD_TRANSCEIVE, [reqMode], reader.timeouts['request'])
+        if status == reader.MI_COLLERR:
+            status = reader.MI_OK
+        if status != reader.MI_OK or backBits != 0x10:
+            status = reader.MI_ERR
+        return (status, backBits)
+
+    async def Anticoll(self):
+        """
+        Runs the anticollision loop of cascade level 1, see MFRC522.Anticoll.
+
+        Returns:
+            tuple: The status and the UID bytes followed by their BCC.
+        """
+        reader = self.MFRC522
+        reader.SetFrameCRC(False, False)
+        reader.SetBitFraming(0x00)
+
+        (status, backData, backBits) = await self.MFRC522_ToCard(
+            reader.PCD_TRANSCEIVE, [reader.PICC_ANTICOLL, 0x20], reader.timeouts['anticoll'])
+        return (reader._check_anticoll(status, backData), backData)
+
+    async def SelectCard(self):
+        """
+        Runs the full anticollision and selects one card, see MFRC522.SelectCard.
+
+        Returns:
+            tuple: The status, the UID and the final SAK byte.
+        """
+        return await self._run_cascade(self.MFRC522._cascade())
+
+    async def SelectUID(self, uid):
+        """
+        Selects a card with a known UID, see MFRC522.SelectUID.
+
+        Returns:
+            tuple: The status and the final SAK byte.
+        """
+        (status, uid, sak) = await self._run_cascade(self.MFRC522._cascade(uid))
+        return (status, sak)
+
+    async def _run_cascade(self, steps):
+        """
+        Drives the steps of MFRC522._cascade with awaited transceives.
+        """
+        answer = None
+        try:
+            while True:
+                (frame, framing) = steps.send(answer)
+                answer = await self._cascade_transceive(frame, framing)
+        except StopIteration as stop:
+            return stop.value
+
+    async def _cascade_transceive(self, frame, framing):
+        """
+        Sends one frame of the cascade, see MFRC522._cascade_transceive.
+        """
+        reader = self.MFRC522
+        if framing is None:
+            reader.SetBitFraming(0x00)
+            (status, backData, backLen) = await self.TransceiveCRC(frame, reader.timeouts['select'])
+        else:
+            reader.SetFrameCRC(False, False)
+            reader.SetBitFraming(framing)
+            (status, backData, backLen) = await self.MFRC522_ToCard(
+                reader.PCD_TRANSCEIVE, frame, reader.timeouts['anticoll'])
+        coll = reader.ReadReg(reader.CollReg) if status == reader.MI_COLLERR else 0
+        return (status, backData, backLen, coll)
+
+    async def SelectTag(self, serNum):
+        """
+        Selects a tag or card, see MFRC522.SelectTag.
+
+        Returns:
+            int: The SAK byte, or 0 if the card was not selected.
+        """
+        reader = self.MFRC522
+        buf = [reader.PICC_SElECTTAG, 0x70] + list(serNum[:5])
+        (status, backData, backLen) = await self.TransceiveCRC(buf, reader.timeouts['select'])
+        return reader._check_select(status, backData, backLen)
+
+    async def Authenticate(self, authMode, BlockAddr, Sectorkey, serNum):
+        """
+        Authenticates a sector with a key, see MFRC522.Authenticate.
+
+        Returns:
+            int: The status of the authentication.
+        """
+        reader = self.MFRC522
+        buff = reader._auth_frame(authMode, BlockAddr, Sectorkey, serNum)
+        (status, backData, backLen) = await self.MFRC522_ToCard(reader.PCD_AUTHENT, buff, reader.timeouts['auth'])
+        return reader._check_auth(status)
+
+    def StopCrypto1(self):
+        """
+        Switches off Crypto1, see MFRC522.StopCrypto1.
+        """
+        self.MFRC522.StopCrypto1()
+
+    async def ReadTag(self, blockAddr, into=None):
+        """
+        Reads one block, see MFRC522.ReadTag.
+
+        Returns:
+            bytes: The 16 bytes of the block, into when it is given, or None.
+        """
+        reader = self.MFRC522
+        (status, backData, backLen) = await self.TransceiveCRC([reader.PICC_READ, blockAddr], reader.timeouts['read'])
+        block = reader._check_read(status, backData, blockAddr)
+        if block is None or into is None:
+            return block
+        into[:16] = block
+        return into
+
+    async def WriteTag(self, blockAddr, writeData):
+        """
+        Writes one block, see MFRC522.WriteTag.
+
+        Returns:
+            int: The status of the write, MI_OK if the card acknowledged both phases.
+        """
+        reader = self.MFRC522
+        buf = writeData[:16]
+        if len(buf) != 16:
+            raise ValueError("A block is written with 16 bytes, got {}".format(len(buf)))
+        (status, backData, backLen) = await self.TransceiveCRC(
+            [reader.PICC_WRITE, blockAddr], reader.timeouts['write'], rxCRC=False)
+        status = reader._check_ack(status, backData, backLen)
+
+        if status == reader.MI_OK:
+            (status, backData, backLen) = await self.TransceiveCRC(
+                buf, reader.timeouts['write'], rxCRC=False)
+            status = reader._check_ack(status, backData, backLen)
+            if status != reader.MI_OK:
+                reader.logger.error("Error while writing")
+        return status
+
+    async def Increment(self, blockAddr, value):
+        """
+        Adds to the value of a value block, see MFRC522.Increment.
+
+        Returns:
+            int: The status of the command.
+        """
+        return await self._value_command(self.MFRC522.PICC_INCREMENT, blockAddr, value)
+
+    async def Decrement(self, blockAddr, value):
+        """
+        Subtracts from the value of a value block, see MFRC522.Decrement.
+
+        Returns:
+            int: The status of the command.
+        """
+        return await self._value_command(self.MFRC522.PICC_DECREMENT, blockAddr, value)
+
+    async def Restore(self, blockAddr):
+        """
+        Copies the value of a value block into the transfer buffer, see MFRC522.Restore.
+
+        Returns:
+            int: The status of the command.
+        """
+        return await self._value_command(self.MFRC522.PICC_RESTORE, blockAddr, 0)
+
+    async def Transfer(self, blockAddr):
+        """
+        Writes the transfer buffer to a block, see MFRC522.Transfer.
+
+        Returns:
+            int: The status of the write, MI_OK if the card acknowledged.
+        """
+        reader = self.MFRC522
+        (status, backData, backLen) = await self.TransceiveCRC(
+            [reader.PICC_TRANSFER, blockAddr], reader.timeouts['write'], rxCRC=False)
+        return reader._check_ack(status, backData, backLen)
+
+    async def _value_command(self, command, blockAddr, value):
+        """
+        Runs the two phases of INCREMENT, DECREMENT or RESTORE, see MFRC522._value_command.
+        """
+        reader = self.MFRC522
+        operand = reader._value_operand(value)
+        (status, backData, backLen) = await self.TransceiveCRC(
+            [command, blockAddr], reader.timeouts['write'], rxCRC=False)
+        status = reader._check_ack(status, backData, backLen)
+        if status != reader.MI_OK:
+            return status
+        (status, backData, backLen) = await self.TransceiveCRC(operand, reader.timeouts['value'], rxCRC=False)
+        return reader._check_value(status)
+
+    async def HaltTag(self, wait=True):
+        """
+        Puts the selected tag or card into the HALT state, see MFRC522.HaltTag.
+
+        Returns:
+            int: MI_OK if the card accepted the command.
+        """
+        reader = self.MFRC522
+        if not wait:
+            frame = await self._crc_frame([reader.PICC_HALT, 0x00], False)
+            (status, backData, backLen) = await self.MFRC522_ToCard(reader.PCD_TRANSMIT, frame, reader.timeouts['halt'])
+            return status
+        (status, backData, backLen) = await self.TransceiveCRC([reader.PICC_HALT, 0x00], reader.timeouts['halt'])
+        if status == reader.MI_NOTAGERR:
+            return reader.MI_OK
+        return reader.MI_ERR
@@ -0,0 +1,180 @@
+from .Tag import Tag
+
+
+class AsyncTag(Tag):
+    """
+    A MIFARE Classic card kept selected by AsyncBasicMFRC522, with awaitable operations.
+
+    Like Tag, reads and writes authenticate the sector of the block on demand and reuse the
+    authentication while the following blocks stay in the same sector.
+
+    Attributes:
+        uid (list): The UID of the card, as returned by Anticoll.
+        id (int): The UID as an integer.
+        sak (int): The SAK byte returned when the card was selected.
+    """
+
+    async def authenticate(self, block_addr, key=None, auth_mode=None):
+        """
+        Authenticate the sector containing a block.
+
+        Without a key and auth mode the reader's KEY, or its key ring, is used.
+
+        Args:
+            block_addr (int): Any block of the sector to authenticate.
+            key (list): The key to use (default None, which uses the reader's KEY).
+            auth_mode (int): PICC_AUTHENT1A or PICC_AUTHENT1B (default None, which uses key A).
+
+        Returns:
+            int: The status of the authentication.
+        """
+        trailer_block = self.trailer_block(block_addr)
+        if key is None and auth_mode is None:
+            status = await self.reader._authenticate(self.uid, trailer_block)
+        else:
+            if key is None:
+                key = self.reader.KEY
+            if auth_mode is None:
+                auth_mode = self.MFRC522.PICC_AUTHENT1A
+            status = await self.MFRC522.Authenticate(auth_mode, trailer_block, key, self.uid)
+
+        if status == self.MFRC522.MI_OK:
+            self._auth = trailer_block
+        else:
+            # A failed authentication sends the card back to IDLE, select it again
+            self._auth = None
+            await self.reader._reselect(self.uid)
+        return status
+
+    async def read_block(self, block_addr, into=None):
+        """
+        Read one block, authenticating its sector first if needed.
+
+        Args:
+            block_addr (int): The block number to read.
+            into (bytearray or memoryview): A writable buffer of 16 bytes to read into (default None).
+
+        Returns:
+            bytes: The 16 bytes of the block, into when it is given, or None if the operation fails.
+        """
+        if await self._ensure_auth(block_addr) != self.MFRC522.MI_OK:
+            return None
+        return await self.MFRC522.ReadTag(block_addr, into)
+
+    async def write_block(self, block_addr, data):
+        """
+        Write one block, authenticating its sector first if needed.
+
+        Args:
+            block_addr (int): The block number to write.
+            data (list or bytes-like): The 16 bytes to write.
+
+        Returns:
+            int: The status of the write.
+        """
+        if await self._ensure_auth(block_addr) != self.MFRC522.MI_OK:
+            return self.MFRC522.MI_ERR
+        return await self.MFRC522.WriteTag(block_addr, data)
+
+    async def read_value(self, block_addr):
+        """
+        Read a value block.
+
+        Args:
+            block_addr (int): The value block.
+
+        Returns:
+            int: The value, or None if the read fails or the block is not a value block.
+        """
+        parsed = self.MFRC522.ParseValueBlock(await self.read_block(block_addr))
+        return parsed[0] if parsed is not None else None
+
+    async def write_value(self, block_addr, value):
+        """
+        Format a block as a value block holding a value.
+
+        Args:
+            block_addr (int): The block.
+            value (int): The signed 32-bit value.
+
+        Returns:
+            int: The status of the write.
+        """
+        return await self.write_block(block_addr, self.MFRC522.ValueBlock(value, block_addr))
+
+    async def increment(self, block_addr, value):
+        """
+        INCREMENT a value block into the transfer buffer, see MFRC522.Increment.
+
+        Returns:
+            int: The status of the command.
+        """
+        if await self._ensure_auth(block_addr) != self.MFRC522.MI_OK:
+            return self.MFRC522.MI_ERR
+        return await self.MFRC522.Increment(block_addr, value)
+
+    async def decrement(self, block_addr, value):
+        """
+        DECREMENT a value block into the transfer buffer, see MFRC522.Decrement.
+
+        Returns:
+            int: The status of the command.
+        """
+        if await self._ensure_auth(block_addr) != self.MFRC522.MI_OK:
+            return self.MFRC522.MI_ERR
+        return await self.MFRC522.Decrement(block_addr, value)
+
+    async def restore(self, block_addr):
+        """
+        RESTORE a value block into the transfer buffer, see MFRC522.Restore.
+
+        Returns:
+            int: The status of the command.
+        """
+        if await self._ensure_auth(block_addr) != self.MFRC522.MI_OK:
+            return self.MFRC522.MI_ERR
+        return await self.MFRC522.Restore(block_addr)
+
+    async def transfer(self, block_addr):
+        """
+        TRANSFER the transfer buffer to a block, see MFRC522.Transfer.
+
+        Returns:
+            int: The status of the write.
+        """
+        if await self._ensure_auth(block_addr) != self.MFRC522.MI_OK:
+            return self.MFRC522.MI_ERR
+        return await self.MFRC522.Transfer(block_addr)
+
+    async def adjust_value(self, block_addr, delta, transfer_block=None):
+        """
+        Add to or subtract from a value block on the card, see Tag.adjust_value.
+
+        Returns:
+            int: The status of the operation.
+        """
+        plan = self._value_plan(block_addr, delta, transfer_block)
+        if plan is None:
+            return self.MFRC522.MI_OK
+        (command, args, target) = plan
+        status = await getattr(self, command)(block_addr, *args)
+        if status != self.MFRC522.MI_OK:
+            return status
+        return await self.transfer(target)
+
+    async def release(self, halt=True):
+        """
+        End the session with the card.
+
+        Args:
+            halt (bool): Put the card into the HALT state so it is not selected again while it stays in the field.
+        """
+        if halt:
+            await self.MFRC522.HaltTag()
+        self.MFRC522.StopCrypto1()
+        self._auth = None
+
+    async def _ensure_auth(self, block_addr):
+        if self._auth == self.trailer_block(block_addr):
+            return self.MFRC522.MI_OK
+        return await self.authenticate(block_addr)
@@ -1,5 +1,8 @@
 from . import MFRC522
-from time import sleep
+from .Tag import Tag
+from .TagEvent import TagArrived, TagDeparted
+from contextlib import contextmanager
+from time import sleep, monotonic
 
 class BasicMFRC522:
     """
@@ -8,16 +11,36 @@ class BasicMFRC522:
     Attributes:
         MFRC522 (module): The MFRC522 module used for communication with the RFID reader.
         KEY (list): The default authentication key used for reading and writing data.
+        keyring (KeyRing): The candidate keys tried instead of KEY, or None.
+        codec (PayloadCodec): The encoding of read_sectors and write_sectors, or None.
+        diff_write (bool): Whether writes skip the blocks that already hold the new data.
+        written_blocks (list): The data blocks the last write or clear sent a WRITE to.
     """
-    def __init__(self, KEY=[0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF]):
+    def __init__(self, KEY=[0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF], keyring=None, reader=None, codec=None,
+                 diff_write=False, **kwargs):
         """
         Initializes a BasicMFRC522 instance.
 
         Args:
             KEY (list): The authentication key used for reading and writing data.
+            keyring (KeyRing): Candidate keys to try per sector, with a cache of the key that worked
+                for each card (default None, which authenticates with KEY as key A).
+            reader (MFRC522): The reader to use (default None, which creates one).
+            codec (PayloadCodec): Encode the data of read_sectors and write_sectors with this codec,
+                which stores text as UTF-8 or bytes as is, compressed and with a CRC, in only the
+                blocks it needs (default None, which keeps the ASCII text layout).
+            diff_write (bool): Read the data blocks in the authenticated session before writing
+                them and only write those whose content changes, which saves a WRITE exchange and
+                EEPROM wear per unchanged block (default False).
+            **kwargs: The arguments of MFRC522 (bus, device, pin_rst, pin_irq, ...) when no reader is given.
         """
-        self.MFRC522 = MFRC522()  # Create an instance of the MFRC522 class
+        # Create an instance of the MFRC522 class
+        self.MFRC522 = reader if reader is not None else MFRC522(**kwargs)
         self.KEY = KEY  # Set the authentication key
+        self.keyring = keyring
+        self.codec = codec
+        self.diff_write = diff_write
+        self.written_blocks = []
 
     def close(self):
         """ 
@@ -45,12 +68,24 @@ class BasicMFRC522:
         """
         Read data from multiple sectors of the RFID tag.
 
+        With a codec, the card is selected once and the blocks are read up to the end of the
+        payload only, which the header of the first block gives; a card without a valid payload
+        raises ValueError.
+
         Args:
             trailer_blocks (list): The list of block numbers of the sector trailers.
 
         Returns:
-            tuple: A tuple containing the tag ID (as an integer) and the concatenated data read from all sectors (as a string).
+            tuple: A tuple containing the tag ID (as an integer) and the concatenated data read from all sectors (as a string),
+                or the decoded data (as a string or bytes) with a codec.
         """
+        if self.codec is not None:
+            id, payload = self._read_payload_no_block(trailer_blocks)
+            while not id:
+                sleep(0.2)  # Wait 200ms before retrying to reduce CPU usage
+                id, payload = self._read_payload_no_block(trailer_blocks)
+            return id, self.codec.decode(payload)
+
         text_all = ''
         for trailer_block in trailer_blocks:
             id, text = self.read_sector(trailer_block)
@@ -82,8 +117,8 @@ class BasicMFRC522:
         if status != self.MFRC522.MI_OK:
             return None
 
-        # Anticollision, return UID if successful
-        (status, uid) = self.MFRC522.Anticoll()
+        # Anticollision and selection through all cascade levels, return UID if successful
+        (status, uid, sak) = self.MFRC522.SelectCard()
         if status != self.MFRC522.MI_OK:
             return None
 
@@ -112,22 +147,19 @@ class BasicMFRC522:
         if status != self.MFRC522.MI_OK:
             return None, None
 
-        # Anticollision, return UID if successful
-        (status, uid) = self.MFRC522.Anticoll()
+        # Anticollision and selection through all cascade levels, return UID if successful
+        (status, uid, sak) = self.MFRC522.SelectCard()
         if status != self.MFRC522.MI_OK:
             return None, None
 
         # Convert UID to integer and store as the tag ID
         id = self._uid_to_num(uid)
 
-        # Select the RFID tag
-        self.MFRC522.SelectTag(uid)
-
         # Authenticate with the tag using the provided key
-        status = self.MFRC522.Authenticate(self.MFRC522.PICC_AUTHENT1A, trailer_block, self.KEY, uid)
+        status = self._authenticate(uid, trailer_block)
 
         # Initialize variables for storing data and text read from the tag
-        data = []
+        data = bytearray()
         text_read = ''
 
         try:
@@ -138,9 +170,9 @@ class BasicMFRC522:
                     if block:
                         data += block
 
-                # Convert data to string
+                # Convert data to string, one character per byte
                 if data:
-                    text_read = ''.join(chr(i) for i in data)
+                    text_read = data.decode('latin-1')
 
             # Stop cryptographic communication with the tag
             self.MFRC522.StopCrypto1()
@@ -154,7 +186,300 @@ class BasicMFRC522:
 
             # Return None, None if an exception occurs
             return None, None
-        
+
+    def read_bytes(self, trailer_blocks=[11]):
+        """
+        Read the data blocks of one or more sectors as bytes, waiting for a card.
+
+        Args:
+            trailer_blocks (list): The block numbers of the sector trailers (default [11]).
+
+        Returns:
+            tuple: A tuple containing the tag ID (as an integer) and the data read (as bytes, 48 per sector).
+        """
+        id, data = self.read_bytes_no_block(trailer_blocks)
+        while not id:
+            sleep(0.2)  # Wait 200ms before retrying to reduce CPU usage
+            id, data = self.read_bytes_no_block(trailer_blocks)
+        return id, data
+
+    def read_bytes_no_block(self, trailer_blocks=[11]):
+        """
+        Attempt to read the data blocks of one or more sectors as bytes.
+
+        The card is selected once for all the sectors, and each block is read straight into its
+        place in one preallocated buffer.
+
+        Args:
+            trailer_blocks (list): The block numbers of the sector trailers (default [11]).
+
+        Returns:
+            tuple: A tuple containing the tag ID (as an integer) and the data read (as bytes, 48 per sector),
+                or (None, None) if the operation fails.
+        """
+        blocks = self._data_blocks(trailer_blocks)
+
+        tag = self._select_no_block()
+        if tag is None:
+            return None, None
+
+        data = bytearray(16 * len(blocks))
+        view = memoryview(data)
+        try:
+            for i, block_num in enumerate(blocks):
+                if tag.read_block(block_num, view[i * 16:(i + 1) * 16]) is None:
+                    return None, None
+        finally:
+            tag.release(halt=False)
+        return tag.id, bytes(data)
+
+    def _read_payload_no_block(self, trailer_blocks):
+        """
+        Attempt to read a payload written with the codec, stopping at its last block.
+
+        Args:
+            trailer_blocks (list): The block numbers of the sector trailers.
+
+        Returns:
+            tuple: The tag ID and the payload (as bytes), or (None, None) if the operation fails.
+        """
+        blocks = self._data_blocks(trailer_blocks)
+
+        tag = self._select_no_block()
+        if tag is None:
+            return None, None
+
+        data = bytearray(16 * len(blocks))
+        view = memoryview(data)
+        try:
+            count = len(blocks)
+            length = len(data)
+            i = 0
+            while i < count:
+                if tag.read_block(blocks[i], view[i * 16:(i + 1) * 16]) is None:
+                    return None, None
+                if i == 0:
+                    # The header gives the length of the payload, so only its blocks are read
+                    length = self.codec.encoded_length(view[:16])
+                    count = (length + 15) // 16
+                    if count > len(blocks):
+                        raise ValueError("The payload of {} bytes does not fit in the sectors read".format(length))
+                i += 1
+        finally:
+            tag.release(halt=False)
+        return tag.id, bytes(view[:length])
+
+    @contextmanager
+    def session(self, halt=True):
+        """
+        Keep a card selected across several operations.
+
+        Waits for a card, selects it once and yields a Tag whose reads and writes only
+        authenticate again when they move to another sector.
+
+        Args:
+            halt (bool): Put the card into the HALT state when the session ends.
+
+        Yields:
+            Tag: The selected card.
+        """
+        tag = self._select_no_block()
+        while tag is None:
+            sleep(0.2)  # Wait 200ms before retrying to reduce CPU usage
+            tag = self._select_no_block()
+        try:
+            yield tag
+        finally:
+            tag.release(halt)
+
+    def inventory(self, max_cards=32):
+        """
+        Find every card in the field in one pass.
+
+        Each card found by the anticollision is halted, so the next request only wakes the cards
+        not found yet. Cards that were already halted before the pass do not answer and are not
+        listed. Use select() to work with a card afterwards.
+
+        Args:
+            max_cards (int): The maximum number of cards to look for (default 32).
+
+        Returns:
+            list: A list of (uid, sak) tuples, one per card.
+        """
+        cards = []
+        retries = 2
+        failed = False
+        while len(cards) < max_cards:
+            (status, TagType) = self.MFRC522.Request(self.MFRC522.PICC_REQIDL)
+            if status != self.MFRC522.MI_OK:
+                # Cards left in READY by a failed anticollision ignore one request and fall back to IDLE
+                if failed:
+                    failed = False
+                    continue
+                break
+            (status, uid, sak) = self.MFRC522.SelectCard()
+            if status != self.MFRC522.MI_OK:
+                # A card answered the request but the anticollision failed, try again
+                if not retries:
+                    break
+                retries -= 1
+                failed = True
+                continue
+            failed = False
+            self.MFRC522.HaltTag(wait=False)
+            cards.append((uid, sak))
+        return cards
+
+    def select(self, uid):
+        """
+        Wake up and select a card with a known UID, for example one listed by inventory().
+
+        Args:
+            uid (list): The UID of the card, as returned by SelectCard.
+
+        Returns:
+            Tag: The selected card, or None if it did not answer.
+        """
+        (status, TagType) = self.MFRC522.Request(self.MFRC522.PICC_REQALL)
+        if status != self.MFRC522.MI_OK:
+            return None
+        (status, sak) = self.MFRC522.SelectUID(uid)
+        if status != self.MFRC522.MI_OK:
+            return None
+        return Tag(self, uid, sak)
+
+    def watch(self, interval=0.05, arrive_count=1, depart_count=3):
+        """
+        Watch the reader and yield an event whenever a card arrives or departs.
+
+        A new card is identified once with a full anticollision and then halted. While it stays
+        on the reader, each poll only wakes it with WUPA and selects it by its known UID, so a
+        card resting on the reader is reported once and costs a few short frames per poll.
+
+        Args:
+            interval (float): Seconds between two polls (default 0.05).
+            arrive_count (int): Consecutive polls a card must be seen before TagArrived (default 1).
+            depart_count (int): Consecutive polls a card must be missing before TagDeparted (default 3).
+
+        Yields:
+            TagEvent: TagArrived or TagDeparted.
+        """
+        if arrive_count < 1 or depart_count < 1:
+            raise ValueError("arrive_count and depart_count must be at least 1")
+
+        uid = None  # The card being tracked
+        reported = False  # Whether TagArrived was yielded for it
+        hits = misses = 0
+        while True:
+            if uid is None:
+                uid = self._identify()
+                hits = 1 if uid is not None else 0
+            elif self._confirm_presence(uid):
+                hits += 1
+                misses = 0
+            else:
+                misses += 1
+                # A candidate that has not been reported yet is dropped on the first miss
+                if not reported or misses >= depart_count:
+                    if reported:
+                        yield TagDeparted(uid, self._uid_to_num(uid), monotonic())
+                    uid, reported, hits, misses = None, False, 0, 0
+
+            if uid is not None and not reported and hits >= arrive_count:
+                reported = True
+                yield TagArrived(uid, self._uid_to_num(uid), monotonic())
+            sleep(interval)
+
+    def dump_card(self, size=None, file=None):
+        """
+        Read the whole memory of a MIFARE Classic 1K or 4K card.
+
+        Args:
+            size (int): The memory size of the card in bytes (1024 or 4096), or None to detect it from the SAK.
+            file (str or file): A path or binary file object the image is streamed to sector by sector.
+
+        Returns:
+            tuple: A tuple containing the tag ID (as an integer), the card image (as bytes) and the status
+                of each sector (as a list of MI_OK/MI_ERR).
+        """
+        id, image, sector_status = self.dump_card_no_block(size, file)
+        while not id:
+            sleep(0.2)  # Wait 200ms before retrying to reduce CPU usage
+            id, image, sector_status = self.dump_card_no_block(size, file)
+        return id, image, sector_status
+
+    def dump_card_no_block(self, size=None, file=None):
+        """
+        Attempt to read the whole memory of a MIFARE Classic 1K or 4K card.
+
+        The card is selected once and every sector is authenticated in turn within that session.
+        Blocks of sectors that cannot be authenticated or read are left as zeros in the image.
+        The 64 READ frames and 16 authentications of a 1K card take about 140 ms on the air at
+        106 kbit/s, the only bit rate of MIFARE Classic, to which the SPI traffic adds.
+
+        Args:
+            size (int): The memory size of the card in bytes (1024 or 4096), or None to detect it from the SAK.
+            file (str or file): A path or binary file object the image is streamed to sector by sector.
+
+        Returns:
+            tuple: A tuple containing the tag ID (as an integer), the card image (as bytes) and the status
+                of each sector (as a list of MI_OK/MI_ERR), or (None, None, None) if the operation fails.
+        """
+        if size not in (None, 1024, 4096):
+            raise ValueError("Invalid card size {}".format(size))
+
+        # Send request to RFID tag
+        (status, TagType) = self.MFRC522.Request(self.MFRC522.PICC_REQIDL)
+        if status != self.MFRC522.MI_OK:
+            return None, None, None
+
+        # Anticollision and selection through all cascade levels, return UID if successful
+        (status, uid, sak) = self.MFRC522.SelectCard()
+        if status != self.MFRC522.MI_OK:
+            return None, None, None
+
+        # Convert UID to integer and store as the tag ID
+        id = self._uid_to_num(uid)
+
+        # SAK 0x18 identifies a 4K card
+        if size is None:
+            size = 4096 if (sak & 0x18) == 0x18 else 1024
+
+        image = bytearray(size)
+        sector_status = []
+        selected = True
+        out = open(file, 'wb') if isinstance(file, str) else file
+
+        try:
+            for first, count in self._sector_layout(size):
+                status = self.MFRC522.MI_ERR
+                if selected:
+                    trailer_block = first + count - 1
+                    status = self._authenticate(uid, trailer_block)
+                    if status == self.MFRC522.MI_OK:
+                        for block_num in range(first, first + count):
+                            block = self.MFRC522.ReadTag(block_num)
+                            if block is None:
+                                status = self.MFRC522.MI_ERR
+                                break
+                            image[block_num * 16:(block_num + 1) * 16] = bytes(block)
+
+                    # A failed authentication or read sends the card back to IDLE, select it again
+                    if status != self.MFRC522.MI_OK:
+                        status = self.MFRC522.MI_ERR
+                        selected = self._reselect(uid)
+
+                sector_status.append(status)
+                if out is not None:
+                    out.write(image[first * 16:(first + count) * 16])
+        finally:
+            # Stop cryptographic communication with the tag
+            self.MFRC522.StopCrypto1()
+            if isinstance(file, str):
+                out.close()
+
+        return id, bytes(image), sector_status
+
     def write_sector(self, text, trailer_block):
         """
         Write data to a sector of the RFID tag.
@@ -182,18 +507,39 @@ class BasicMFRC522:
         """
         Write data to multiple sectors of the RFID tag.
 
+        With a codec, the data is encoded and written with one card selection to the first blocks
+        of the sectors, as many as the payload needs; the blocks after it are left alone. Data
+        that does not fit raises ValueError.
+
         Args:
-            text (str): The data to write.
+            text (str or bytes-like): The data to write; bytes need a codec.
             trailer_blocks (list): The list of block numbers of the sector trailers.
 
         Returns:
-            tuple: A tuple containing the tag ID (as an integer) and the concatenated data written to all sectors (as a string).
+            tuple: A tuple containing the tag ID (as an integer) and the concatenated data written to all sectors (as a string),
+                or the data given with a codec.
         """
+        if self.codec is not None:
+            blocks = self._data_blocks(trailer_blocks)
+            payload = self.codec.encode(text)
+            count = (len(payload) + 15) // 16
+            if count > len(blocks):
+                raise ValueError("The payload of {} bytes does not fit in {} sectors".format(
+                    len(payload), len(trailer_blocks)))
+            data = bytearray(16 * count)
+            data[:len(payload)] = payload
+            id = self._write_blocks_no_block(memoryview(data), blocks[:count])
+            while not id:
+                sleep(0.2)  # Wait 200ms before retrying to reduce CPU usage
+                id = self._write_blocks_no_block(memoryview(data), blocks[:count])
+            return id, text
+
         # Split the input text into chunks of 48 characters
         text_formated_list = self._split_string(text)
 
         # Initialize an empty string to store the concatenated data
         text_all = ''
+        written_blocks = []
 
         # Iterate through the trailer_blocks list
         for i in range(0, len(trailer_blocks)):
@@ -203,10 +549,12 @@ class BasicMFRC522:
 
                 # Concatenate the written data to the text_all string
                 text_all += text
+                written_blocks += self.written_blocks
             except IndexError:
                 # Ignore any index errors that may occur if there are fewer chunks than trailer blocks
                 pass
 
+        self.written_blocks = written_blocks
         # Return the tag ID and the concatenated data
         return id, text_all
 
@@ -214,6 +562,9 @@ class BasicMFRC522:
         """
         Attempt to write data to the RFID tag.
 
+        With diff_write the data blocks are read first and only those that change are written;
+        written_blocks lists the blocks written.
+
         Args:
             text (str): The data to write.
             trailer_block (int): The block number of the sector trailer.
@@ -222,6 +573,7 @@ class BasicMFRC522:
         Returns:
             tuple: A tuple containing the tag ID (as an integer) and the data written (as a string), or (None, None) if the operation fails.
         """
+        self.written_blocks = []
         if not self._check_trailer_block(trailer_block):
             raise ValueError("Invalid Trailer Block {trailer_block}")
 
@@ -233,33 +585,26 @@ class BasicMFRC522:
         if status != self.MFRC522.MI_OK:
             return None, None
 
-        # Anticollision, return UID if success
-        (status, uid) = self.MFRC522.Anticoll()
+        # Anticollision and selection through all cascade levels, return UID if successful
+        (status, uid, sak) = self.MFRC522.SelectCard()
         if status != self.MFRC522.MI_OK:
             return None, None
 
         # Convert UID to integer and store as id
         id = self._uid_to_num(uid)
 
-        # Select the RFID tag using the UID
-        self.MFRC522.SelectTag(uid)
-
         # Authenticate with the sector trailer block using the default key
-        status = self.MFRC522.Authenticate(self.MFRC522.PICC_AUTHENT1A, trailer_block, self.KEY, uid)
+        status = self._authenticate(uid, trailer_block)
 
-        # Read the sector trailer block
-        self.MFRC522.ReadTag(trailer_block)
+        # Read the sector trailer block, unless the data blocks are read for the diff
+        if not self.diff_write:
+            self.MFRC522.ReadTag(trailer_block)
 
         try:
             if status == self.MFRC522.MI_OK:
-                # Prepare the data to be written
-                data = bytearray()
-                data.extend(bytearray(text.ljust(len(block_addr) * 16).encode('ascii')))
-                i = 0
-                for block_num in block_addr:
-                    # Write the data to the corresponding data blocks
-                    self.MFRC522.WriteTag(block_num, data[(i*16):(i+1)*16])
-                    i += 1
+                # Prepare the data to be written, and write each block from a view of it
+                data = memoryview(text.ljust(len(block_addr) * 16).encode('ascii'))
+                self.written_blocks = self._write_sector_blocks(block_addr, data)
 
             # Stop encryption
             self.MFRC522.StopCrypto1()
@@ -271,6 +616,110 @@ class BasicMFRC522:
             self.MFRC522.StopCrypto1()
             return None, None
 
+    def write_bytes(self, data, trailer_blocks=[11]):
+        """
+        Write bytes to the data blocks of one or more sectors, waiting for a card.
+
+        Args:
+            data (bytes-like): The data to write, at most 48 bytes per sector.
+            trailer_blocks (list): The block numbers of the sector trailers (default [11]).
+
+        Returns:
+            tuple: A tuple containing the tag ID (as an integer) and the data written (as bytes, padded with zeros
+                to 48 bytes per sector).
+        """
+        id, written = self.write_bytes_no_block(data, trailer_blocks)
+        while not id:
+            sleep(0.2)  # Wait 200ms before retrying to reduce CPU usage
+            id, written = self.write_bytes_no_block(data, trailer_blocks)
+        return id, written
+
+    def write_bytes_no_block(self, data, trailer_blocks=[11]):
+        """
+        Attempt to write bytes to the data blocks of one or more sectors.
+
+        The card is selected once for all the sectors. Data shorter than the sectors is padded
+        with zeros; each block is sent from a view of the data, without copying it.
+
+        Args:
+            data (bytes-like): The data to write, at most 48 bytes per sector. A list of ints is
+                accepted too.
+            trailer_blocks (list): The block numbers of the sector trailers (default [11]).
+
+        Returns:
+            tuple: A tuple containing the tag ID (as an integer) and the data written (as bytes, padded with zeros
+                to 48 bytes per sector), or (None, None) if the operation fails.
+        """
+        blocks = self._data_blocks(trailer_blocks)
+        if isinstance(data, (list, tuple)):
+            data = bytes(data)
+        view = memoryview(data).cast('B')
+        size = 48 * len(trailer_blocks)
+        if len(view) > size:
+            raise ValueError("{} bytes do not fit in {} sectors".format(len(view), len(trailer_blocks)))
+        if len(view) < size:
+            padded = bytearray(size)
+            padded[:len(view)] = view
+            view = memoryview(padded)
+
+        id = self._write_blocks_no_block(view, blocks)
+        if not id:
+            return None, None
+        return id, bytes(view)
+
+    def _write_blocks_no_block(self, data, blocks):
+        """
+        Attempt to write consecutive 16-byte slices of a buffer to blocks, with one card selection.
+
+        With diff_write each block is read first and only written if it changes; written_blocks
+        lists the blocks written.
+
+        Args:
+            data (memoryview): The data, 16 bytes per block.
+            blocks (list): The block numbers to write, in order.
+
+        Returns:
+            int: The tag ID as an integer, or None if the operation fails.
+        """
+        self.written_blocks = []
+        tag = self._select_no_block()
+        if tag is None:
+            return None
+        try:
+            for i, block_num in enumerate(blocks):
+                block = data[i * 16:(i + 1) * 16]
+                if self.diff_write and tag.read_block(block_num) == block:
+                    continue
+                if tag.write_block(block_num, block) != self.MFRC522.MI_OK:
+                    return None
+                self.written_blocks.append(block_num)
+        finally:
+            tag.release(halt=False)
+        return tag.id
+
+    def _write_sector_blocks(self, block_addr, data):
+        """
+        Write consecutive 16-byte slices of a buffer to the data blocks of the authenticated sector.
+
+        With diff_write each block is read first, in the same authenticated session, and only
+        written if its content changes; a block that cannot be read is written.
+
+        Args:
+            block_addr (tuple): The block numbers to write, in order.
+            data (memoryview): The data, 16 bytes per block.
+
+        Returns:
+            list: The block numbers written successfully.
+        """
+        written = []
+        for i, block_num in enumerate(block_addr):
+            block = data[i * 16:(i + 1) * 16]
+            if self.diff_write and self.MFRC522.ReadTag(block_num) == block:
+                continue
+            if self.MFRC522.WriteTag(block_num, block) == self.MFRC522.MI_OK:
+                written.append(block_num)
+        return written
+
     def clear_sector(self, trailer_block):
         """
         Clear a sector of the RFID tag by writing zeros to all data blocks.
@@ -303,8 +752,11 @@ class BasicMFRC522:
             int: The tag ID as an integer.
         """
         # Iterate through the trailer_blocks list and clear each sector
+        written_blocks = []
         for i in trailer_blocks:
             id = self.clear_sector(i)
+            written_blocks += self.written_blocks
+        self.written_blocks = written_blocks
 
         # Return the tag ID
         return id
@@ -313,12 +765,16 @@ class BasicMFRC522:
         """
         Clear a sector of the RFID tag by writing zeros to all data blocks.
 
+        With diff_write the blocks that are already zero are not written; written_blocks lists
+        the blocks written.
+
         Args:
             trailer_block (int): The block number of the sector trailer.
 
         Returns:
             int: The tag ID as an integer, or None if the operation fails.
         """
+        self.written_blocks = []
         if not self._check_trailer_block(trailer_block):
             raise ValueError("Invalid Trailer Block {trailer_block}")
 
@@ -329,33 +785,30 @@ class BasicMFRC522:
         if status != self.MFRC522.MI_OK:
             return None
 
-        # Anticollision, return UID if success
-        (status, uid) = self.MFRC522.Anticoll()
+        # Anticollision and selection through all cascade levels, return UID if successful
+        (status, uid, sak) = self.MFRC522.SelectCard()
         if status != self.MFRC522.MI_OK:
             return None
 
         # Convert UID to integer and store as id
         id = self._uid_to_num(uid)
 
-        # Select the RFID tag using the UID
-        self.MFRC522.SelectTag(uid)
-
         # Authenticate with the sector trailer block using the default key
-        status = self.MFRC522.Authenticate(self.MFRC522.PICC_AUTHENT1A, trailer_block, self.KEY, uid)
+        status = self._authenticate(uid, trailer_block)
 
-        # Read the sector trailer block
-        self.MFRC522.ReadTag(trailer_block)
+        # Read the sector trailer block, unless the data blocks are read for the diff
+        if not self.diff_write:
+            self.MFRC522.ReadTag(trailer_block)
 
         # Determine the block addresses of the data blocks in the sector
 
         try:
             if status == self.MFRC522.MI_OK:
                 # Prepare data with all zeros
-                data = [0x00]*16
+                data = memoryview(bytes(16 * len(block_addr)))
 
                 # Write zeros to each data block in the sector
-                for block_num in block_addr:
-                    self.MFRC522.WriteTag(block_num, data)
+                self.written_blocks = self._write_sector_blocks(block_addr, data)
 
             # Stop encryption
             self.MFRC522.StopCrypto1()
@@ -367,6 +820,288 @@ class BasicMFRC522:
             self.MFRC522.StopCrypto1()
             return None
 
+    def read_value(self, block_addr):
+        """
+        Read a value block, waiting for a card.
+
+        Args:
+            block_addr (int): The value block.
+
+        Returns:
+            tuple: A tuple containing the tag ID (as an integer) and the value.
+        """
+        id, value = self.read_value_no_block(block_addr)
+        while not id:
+            sleep(0.2)  # Wait 200ms before retrying to reduce CPU usage
+            id, value = self.read_value_no_block(block_addr)
+        return id, value
+
+    def read_value_no_block(self, block_addr):
+        """
+        Attempt to read a value block.
+
+        Args:
+            block_addr (int): The value block.
+
+        Returns:
+            tuple: A tuple containing the tag ID (as an integer) and the value, or (None, None) if the operation fails
+                or the block is not a value block.
+        """
+        self._check_data_block(block_addr)
+        tag = self._select_no_block()
+        if tag is None:
+            return None, None
+        try:
+            value = tag.read_value(block_addr)
+        finally:
+            tag.release(halt=False)
+        if value is None:
+            return None, None
+        return tag.id, value
+
+    def write_value(self, block_addr, value=0):
+        """
+        Format a block as a value block, waiting for a card.
+
+        Args:
+            block_addr (int): The block.
+            value (int): The signed 32-bit value (default 0).
+
+        Returns:
+            int: The tag ID as an integer.
+        """
+        id = self.write_value_no_block(block_addr, value)
+        while not id:
+            sleep(0.2)  # Wait 200ms before retrying to reduce CPU usage
+            id = self.write_value_no_block(block_addr, value)
+        return id
+
+    def write_value_no_block(self, block_addr, value=0):
+        """
+        Attempt to format a block as a value block.
+
+        Args:
+            block_addr (int): The block.
+            value (int): The signed 32-bit value (default 0).
+
+        Returns:
+            int: The tag ID as an integer, or None if the operation fails.
+        """
+        self._check_data_block(block_addr)
+        tag = self._select_no_block()
+        if tag is None:
+            return None
+        try:
+            if tag.write_value(block_addr, value) != self.MFRC522.MI_OK:
+                return None
+        finally:
+            tag.release(halt=False)
+        return tag.id
+
+    def adjust_value(self, block_addr, delta, transfer_block=None):
+        """
+        Add to or subtract from a value block on the card, waiting for a card.
+
+        Only the selection is retried: an adjustment that failed after the card was selected is
+        not sent again, as it may have been applied.
+
+        Args:
+            block_addr (int): The value block.
+            delta (int or list): The amount to add, negative to subtract, or a list of amounts.
+            transfer_block (int): The block that receives the result (default None, the value block).
+
+        Returns:
+            int: The tag ID as an integer, or None if the adjustment failed.
+        """
+        self._check_data_block(block_addr)
+        tag = self._select_no_block()
+        while tag is None:
+            sleep(0.2)  # Wait 200ms before retrying to reduce CPU usage
+            tag = self._select_no_block()
+        return self._adjust_value(tag, block_addr, delta, transfer_block)
+
+    def adjust_value_no_block(self, block_addr, delta, transfer_block=None):
+        """
+        Attempt to add to or subtract from a value block on the card.
+
+        The value is changed by the card: one INCREMENT or DECREMENT with the sum of the
+        amounts, then one TRANSFER, without reading the block or writing it from the host.
+
+        Args:
+            block_addr (int): The value block.
+            delta (int or list): The amount to add, negative to subtract, or a list of amounts.
+            transfer_block (int): The block that receives the result (default None, the value block).
+
+        Returns:
+            int: The tag ID as an integer, or None if the operation fails.
+        """
+        self._check_data_block(block_addr)
+        tag = self._select_no_block()
+        if tag is None:
+            return None
+        return self._adjust_value(tag, block_addr, delta, transfer_block)
+
+    def _adjust_value(self, tag, block_addr, delta, transfer_block):
+        try:
+            if tag.adjust_value(block_addr, delta, transfer_block) != self.MFRC522.MI_OK:
+                return None
+        finally:
+            tag.release(halt=False)
+        return tag.id
+
+    def _check_data_block(self, block_addr):
+        # Value blocks are data blocks: not the manufacturer block, nor a sector trailer
+        if block_addr <= 0 or self._check_trailer_block(block_addr):
+            raise ValueError("Invalid value block {}".format(block_addr))
+
+    def _select_no_block(self):
+        """
+        Attempt to select a card.
+
+        Returns:
+            Tag: The selected card, or None if the operation fails.
+        """
+        # Send request to RFID tag
+        (status, TagType) = self.MFRC522.Request(self.MFRC522.PICC_REQIDL)
+        if status != self.MFRC522.MI_OK:
+            return None
+
+        # Anticollision and selection through all cascade levels, return UID if successful
+        (status, uid, sak) = self.MFRC522.SelectCard()
+        if status != self.MFRC522.MI_OK:
+            return None
+        return Tag(self, uid, sak)
+
+    def _identify(self):
+        """
+        Wake up any card in the field, read its UID and halt it.
+
+        Returns:
+            list: The UID of the card, or None if no card answered.
+        """
+        (status, TagType) = self.MFRC522.Request(self.MFRC522.PICC_REQALL)
+        if status != self.MFRC522.MI_OK:
+            return None
+        (status, uid, sak) = self.MFRC522.SelectCard()
+        if status != self.MFRC522.MI_OK:
+            return None
+        self.MFRC522.HaltTag(wait=False)
+        return uid
+
+    def _confirm_presence(self, uid):
+        """
+        Check that a halted card is still in the field, and halt it again.
+
+        The card is woken with WUPA and selected by its known UID, which skips the anticollision.
+
+        Args:
+            uid (list): The UID of the card, as returned by SelectCard.
+
+        Returns:
+            bool: True if the card answered.
+        """
+        (status, TagType) = self.MFRC522.Request(self.MFRC522.PICC_REQALL)
+        if status != self.MFRC522.MI_OK or self.MFRC522.SelectUID(uid)[0] != self.MFRC522.MI_OK:
+            return False
+        self.MFRC522.HaltTag(wait=False)
+        return True
+
+    def _authenticate(self, uid, trailer_block):
+        """
+        Authenticate a sector with KEY, or with the candidate keys of the key ring.
+
+        With a key ring the cached key of the card and sector is tried first. The card falls back
+        to IDLE after each rejected key, so it is selected again before the next candidate.
+
+        Args:
+            uid (list): The UID of the card, as returned by SelectCard.
+            trailer_block (int): The block number of the sector trailer.
+
+        Returns:
+            int: The status of the authentication.
+        """
+        if self.keyring is None:
+            return self.MFRC522.Authenticate(self.MFRC522.PICC_AUTHENT1A, trailer_block, self.KEY, uid)
+
+        sector = self._sector_of(trailer_block)
+        attempts = 0
+        for auth_mode, key in self.keyring.candidates(uid, sector):
+            if attempts and not self._reselect(uid):
+                break
+            attempts += 1
+            status = self.MFRC522.Authenticate(auth_mode, trailer_block, key, uid)
+            if status == self.MFRC522.MI_OK:
+                self.keyring.remember(uid, sector, auth_mode, key, attempts)
+                return status
+        self.keyring.failed(uid, sector)
+        return self.MFRC522.MI_ERR
+
+    def _reselect(self, uid):
+        """
+        Wake up and select a card again after it fell back to IDLE.
+
+        Args:
+            uid (list): The UID of the card, as returned by SelectCard.
+
+        Returns:
+            bool: True if the same card was selected again.
+        """
+        self.MFRC522.StopCrypto1()
+        (status, TagType) = self.MFRC522.Request(self.MFRC522.PICC_REQALL)
+        if status != self.MFRC522.MI_OK:
+            return False
+        # Only the card with this UID answers the SELECT, so no anticollision is needed
+        (status, sak) = self.MFRC522.SelectUID(uid)
+        return status == self.MFRC522.MI_OK
+
+    def _sector_layout(self, size):
+        """
+        List the sectors of a MIFARE Classic card.
+
+        Args:
+            size (int): The memory size of the card in bytes (1024 or 4096).
+
+        Returns:
+            list: A list of (first block, block count) tuples, one per sector.
+        """
+        # 4K cards have 32 sectors of 4 blocks followed by 8 sectors of 16 blocks
+        sectors = [(sector * 4, 4) for sector in range(min(size // 64, 32))]
+        if size == 4096:
+            sectors += [(128 + sector * 16, 16) for sector in range(8)]
+        return sectors
+
+    def _sector_of(self, block_addr):
+        """
+        Return the sector number of a block.
+
+        Args:
+            block_addr (int): The block number.
+
+        Returns:
+            int: The sector number.
+        """
+        # 4K cards use 16-block sectors above block 127
+        if block_addr < 128:
+            return block_addr // 4
+        return 32 + (block_addr - 128) // 16
+
+    def _data_blocks(self, trailer_blocks):
+        """
+        List the data blocks of sectors, in order.
+
+        Args:
+            trailer_blocks (list): The block numbers of the sector trailers.
+
+        Returns:
+            list: The block numbers of the three data blocks before each trailer.
+        """
+        blocks = []
+        for trailer_block in trailer_blocks:
+            if not self._check_trailer_block(trailer_block):
+                raise ValueError("Invalid Trailer Block {}".format(trailer_block))
+            blocks += range(trailer_block - 3, trailer_block)
+        return blocks
+
     def _check_trailer_block(self, trailer_block):
         if (trailer_block+1)%4 == 0:
             return True
@@ -384,8 +1119,8 @@ class BasicMFRC522:
             int: The UID as an integer.
         """
         n = 0
-        for i in range(0, 5):
-            n = n * 256 + uid[i]
+        for byte in uid:
+            n = n * 256 + byte
         return n
 
     def _split_string(self, string):
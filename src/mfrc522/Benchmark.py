@@ -0,0 +1,233 @@
+import argparse
+import io
+import json
+import sys
+import time
+from collections import OrderedDict
+from .BasicMFRC522 import BasicMFRC522
+from .Emulator import Emulator, EmulatedClassic, EmulatedIsoDep, EmulatedUltralight
+from .IsoDep import IsoDep
+from .MFRC522 import MFRC522
+from .SimpleMFRC522 import SimpleMFRC522
+from .Ultralight import Ultralight
+
+
+class Benchmark:
+    """
+    Runs the high-level operations of the library against an Emulator and measures them.
+
+    For each operation the SPI transfers and bytes, the emulated time (SPI bus and air time, plus
+    the host's own time with realtime=True) and the host time are averaged over `repeat` runs.
+    The cards are taken out of the field and put back before every run, as if a new card was
+    presented. Run `python -m mfrc522.Benchmark --help` for the command line.
+
+    Attributes:
+        OPERATIONS (tuple): The names of the operations, in the order they run.
+    """
+
+    OPERATIONS = (
+        'read_id',
+        'read',
+        'write',
+        'read_sectors',
+        'write_sectors',
+        'read_bytes',
+        'write_bytes',
+        'write_unchanged',
+        'adjust_value',
+        'dump_card',
+        'inventory',
+        'no_card',
+        'ultralight_id',
+        'ntag_read_all',
+        'isodep_read_106',
+        'isodep_read_424',
+    )
+
+    def __init__(self, repeat=10, realtime=False, **kwargs):
+        """
+        Initializes a Benchmark.
+
+        Args:
+            repeat (int): The number of runs of each operation (default 10).
+            realtime (bool): Run the Emulator in real time, see Emulator (default False).
+            **kwargs: Arguments of MFRC522 for the reader under test (crc, pin_irq, reg_cache, ...).
+        """
+        if repeat < 1:
+            raise ValueError("repeat must be at least 1")
+        self.repeat = repeat
+        self.realtime = realtime
+        self.kwargs = kwargs
+
+    def run(self, operations=None):
+        """
+        Run operations and measure them.
+
+        Args:
+            operations (list): The names of the operations to run (default None, all of them).
+
+        Returns:
+            OrderedDict: For each operation, the mean SPI 'transfers' and 'bytes', 'emulated_ms'
+                and 'host_ms' per run, and the number of runs that returned no result as 'failures'.
+        """
+        results = OrderedDict()
+        for name in operations or self.OPERATIONS:
+            if name not in self.OPERATIONS:
+                raise ValueError("Unknown operation {}".format(name))
+            (cards, action) = getattr(self, '_' + name)()
+            results[name] = self._measure(cards, action)
+        return results
+
+    @staticmethod
+    def report(results, file=None):
+        """
+        Print results as a table.
+
+        Args:
+            results (dict): The results of run().
+            file (file): The text stream to print to (default None, standard output).
+        """
+        file = file or sys.stdout
+        print("{:<16}{:>10}{:>10}{:>14}{:>10}{:>10}".format(
+            'operation', 'transfers', 'bytes', 'emulated ms', 'host ms', 'failures'), file=file)
+        for name, r in results.items():
+            print("{:<16}{:>10.1f}{:>10.1f}{:>14.3f}{:>10.3f}{:>10}".format(
+                name, r['transfers'], r['bytes'], r['emulated_ms'], r['host_ms'], r['failures']), file=file)
+
+    def _measure(self, cards, action):
+        chip = Emulator(cards, realtime=self.realtime)
+        reader = chip.reader(**self.kwargs)
+        basic = BasicMFRC522(reader=reader)
+        simple = SimpleMFRC522(reader=reader)
+
+        totals = {'transfers': 0, 'bytes': 0, 'emulated_ms': 0.0, 'host_ms': 0.0, 'failures': 0}
+        for _ in range(self.repeat):
+            chip.reset_cards()
+            (transfers, nbytes, clock) = (chip.transfers, chip.bytes, chip.clock)
+            start = time.perf_counter()
+            result = action(simple, basic)
+            totals['host_ms'] += (time.perf_counter() - start) * 1000.0
+            totals['emulated_ms'] += (chip.clock - clock) * 1000.0
+            totals['transfers'] += chip.transfers - transfers
+            totals['bytes'] += chip.bytes - nbytes
+            if not result:
+                totals['failures'] += 1
+        reader.Close()
+
+        for key in ('transfers', 'bytes', 'emulated_ms', 'host_ms'):
+            totals[key] /= self.repeat
+        return totals
+
+    # Operations: each returns the cards in the field and the action, called with the
+    # SimpleMFRC522 and BasicMFRC522 of the reader under test
+
+    def _read_id(self):
+        return [EmulatedClassic()], lambda simple, basic: simple.read_id()
+
+    def _read(self):
+        return [EmulatedClassic()], lambda simple, basic: simple.read()[0]
+
+    def _write(self):
+        return [EmulatedClassic()], lambda simple, basic: simple.write('benchmark')[0]
+
+    def _read_sectors(self):
+        return [EmulatedClassic()], lambda simple, basic: basic.read_sectors([11, 15, 19])[0]
+
+    def _write_sectors(self):
+        return [EmulatedClassic()], lambda simple, basic: basic.write_sectors('x' * 144, [11, 15, 19])[0]
+
+    def _read_bytes(self):
+        return [EmulatedClassic()], lambda simple, basic: basic.read_bytes([11, 15, 19])[0]
+
+    def _write_bytes(self):
+        return [EmulatedClassic()], lambda simple, basic: basic.write_bytes(bytes(144), [11, 15, 19])[0]
+
+    def _write_unchanged(self):
+        # Writing what the card already holds: with diff_write only the reads are sent
+        def action(simple, basic):
+            basic.diff_write = True
+            try:
+                return basic.write_bytes(bytes(144), [11, 15, 19])[0]
+            finally:
+                basic.diff_write = False
+        return [EmulatedClassic()], action
+
+    def _adjust_value(self):
+        card = EmulatedClassic()
+        card.blocks[4] = list(MFRC522.ValueBlock(1000, 4))
+        return [card], lambda simple, basic: basic.adjust_value_no_block(4, -25)
+
+    def _dump_card(self):
+        return [EmulatedClassic()], lambda simple, basic: basic.dump_card_no_block(file=io.BytesIO())[0]
+
+    def _inventory(self):
+        cards = [EmulatedClassic(uid=[0xDE, 0xAD, 0xBE, i]) for i in range(3)]
+        cards.append(EmulatedUltralight())
+        return cards, lambda simple, basic: len(basic.inventory()) == 4
+
+    def _no_card(self):
+        return [], lambda simple, basic: basic.read_id_no_block() is None
+
+    def _ultralight_id(self):
+        return [EmulatedUltralight.ntag(213)], lambda simple, basic: basic.read_id_no_block()
+
+    def _ntag_read_all(self):
+        def action(simple, basic):
+            tag = Ultralight.select(basic.MFRC522)
+            return tag is not None and tag.read_all() is not None
+        return [EmulatedUltralight.ntag(216)], action
+
+    def _isodep_read_106(self):
+        return self._isodep_read(106)
+
+    def _isodep_read_424(self):
+        return self._isodep_read(424)
+
+    def _isodep_read(self, bit_rate):
+        # A 2 KB file read with READ BINARY, 250 bytes per APDU
+        def action(simple, basic):
+            card = IsoDep.select(basic.MFRC522)
+            if card is None or card.activate(bit_rate) != MFRC522.MI_OK:
+                return False
+            data = bytearray()
+            for offset in range(0, 2048, 250):
+                answer = card.transceive([0x00, 0xB0, offset >> 8, offset & 0xFF, min(250, 2048 - offset)])
+                if answer is None or answer[-2:] != b'\x90\x00':
+                    return False
+                data += answer[:-2]
+            card.deselect()
+            return len(data) == 2048
+        return [EmulatedIsoDep()], action
+
+
+def main(argv=None):
+    """
+    Command line entry point: `python -m mfrc522.Benchmark [operation ...]`.
+    """
+    parser = argparse.ArgumentParser(prog='python -m mfrc522.Benchmark',
+                                     description='Benchmark the mfrc522 library against the chip emulator.')
+    parser.add_argument('operations', nargs='*', help='operations to run (default: all of them): ' +
+                        ', '.join(Benchmark.OPERATIONS))
+    parser.add_argument('--repeat', type=int, default=10, help='runs per operation (default 10)')
+    parser.add_argument('--realtime', action='store_true', help='let the emulated clock follow real time')
+    parser.add_argument('--crc', choices=('host', 'chip', 'frame'), default='host', help='CRC mode of the reader')
+    parser.add_argument('--reg-cache', action='store_true', help='enable the register cache')
+    parser.add_argument('--spd', default='1000000', help="SPI clock in Hz, or 'auto' (default 1000000)")
+    parser.add_argument('--irq', action='store_true', help='wire the IRQ pin (implies --realtime)')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args(argv)
+
+    kwargs = {'crc': args.crc, 'reg_cache': args.reg_cache,
+              'spd': args.spd if args.spd == 'auto' else int(args.spd)}
+    if args.irq:
+        kwargs['pin_irq'] = 18
+    benchmark = Benchmark(args.repeat, args.realtime or args.irq, **kwargs)
+    results = benchmark.run(args.operations or None)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        Benchmark.report(results)
+
+
+if __name__ == '__main__':
+    main()
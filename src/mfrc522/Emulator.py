@@ -0,0 +1,1309 @@
+import threading
+import time
+from .MFRC522 import MFRC522
+
+# Carrier frequency and the duration of one bit at 106 kbit/s
+FC = 13.56e6
+BIT_TIME = 128 / FC
+
+# 4-bit answers of MIFARE cards
+ACK = 0x0A
+NAK = 0x04
+
+
+def _crc_a(data, preset=0x6363):
+    crc = preset
+    for b in data:
+        b ^= crc & 0xFF
+        b = (b ^ (b << 4)) & 0xFF
+        crc = ((crc >> 8) ^ (b << 8) ^ (b << 3) ^ (b >> 4)) & 0xFFFF
+    return crc
+
+
+def _with_crc(data):
+    crc = _crc_a(data)
+    return list(data) + [crc & 0xFF, crc >> 8]
+
+
+def _bits(data, nbits=None):
+    # LSB first, as sent over the air
+    bits = [(b >> i) & 1 for b in data for i in range(8)]
+    return bits if nbits is None else bits[:nbits]
+
+
+def _pack(bits, offset=0):
+    bits = [0] * offset + list(bits)
+    out = []
+    for i in range(0, len(bits), 8):
+        v = 0
+        for j, bit in enumerate(bits[i:i + 8]):
+            v |= bit << j
+        out.append(v)
+    return out
+
+
+class _Response:
+    """
+    The answer of a card: the bits sent back and the time the card takes before answering.
+    """
+
+    def __init__(self, bits, delay=0.0):
+        self.bits = bits
+        self.delay = delay
+
+    @classmethod
+    def data(cls, data, crc=False, delay=0.0):
+        return cls(_bits(_with_crc(data) if crc else list(data)), delay)
+
+    @classmethod
+    def nibble(cls, value, delay=0.0):
+        return cls(_bits([value], 4), delay)
+
+
+class EmulatedCard:
+    """
+    An ISO 14443-3 type A card in the field of an Emulator: REQA/WUPA, the bit-oriented
+    anticollision through cascade levels 1 to 3, SELECT and HALT.
+
+    Subclasses implement the commands of the ACTIVE state in active().
+
+    Attributes:
+        uid (list): The 4, 7 or 10 byte UID.
+        state (int): IDLE, READY, ACTIVE or HALT.
+        rates (tuple): The divisor codes (0 to 3 for 106 to 848 kbit/s) of the reader to card and
+            card to reader bit rates the card expects.
+    """
+
+    IDLE, READY, ACTIVE, HALT = range(4)
+    ATQA = [0x04, 0x00]
+    SAK = 0x08
+    rates = (0, 0)
+
+    def __init__(self, uid):
+        """
+        Initializes an EmulatedCard.
+
+        Args:
+            uid (list): The 4, 7 or 10 byte UID.
+        """
+        self.uid = list(uid)
+        if len(self.uid) == 4:
+            self._levels = [self.uid]
+        elif len(self.uid) == 7:
+            self._levels = [[0x88] + self.uid[:3], self.uid[3:]]
+        elif len(self.uid) == 10:
+            self._levels = [[0x88] + self.uid[:3], [0x88] + self.uid[3:6], self.uid[6:]]
+        else:
+            raise ValueError("Invalid UID length {}".format(len(self.uid)))
+        self.power_on()
+
+    def power_on(self):
+        """
+        Reset the card as if it just entered the field.
+        """
+        self.state = self.IDLE
+        self._halted = False
+        self._level = 0
+        self.deselect()
+
+    def deselect(self):
+        """
+        Called when the card leaves the ACTIVE state; drops the session state of subclasses.
+        """
+
+    def handle(self, frame, nbits, chip):
+        """
+        Process a frame sent by the reader.
+
+        Args:
+            frame (list): The bytes sent, including the CRC if one was appended.
+            nbits (int): The number of bits sent.
+            chip (Emulator): The reader.
+
+        Returns:
+            _Response: The answer, or None if the card stays silent.
+        """
+        if nbits == 7 and len(frame) == 1:
+            if frame[0] == 0x26 and self.state == self.IDLE or \
+                    frame[0] == 0x52 and self.state in (self.IDLE, self.HALT):
+                self.state = self.READY
+                self._level = 0
+                return _Response.data(self.ATQA)
+            if self.state in (self.READY, self.ACTIVE):
+                self._to_idle()
+            return None
+        if self.state in (self.IDLE, self.HALT):
+            return None
+        if self.state == self.READY:
+            return self._anticoll(frame)
+        return self.active(frame, chip)
+
+    def active(self, frame, chip):
+        """
+        Process a frame in the ACTIVE state.
+
+        Returns:
+            _Response: The answer, or None if the card stays silent.
+        """
+        if self._check_crc(frame) and frame[:2] == [0x50, 0x00]:
+            self.halt()
+            return None
+        self._to_idle()
+        return None
+
+    def halt(self):
+        """
+        Put the card into the HALT state.
+        """
+        self._halted = True
+        self.state = self.HALT
+        self.deselect()
+
+    def _to_idle(self):
+        # A card that was halted goes back to HALT, so only WUPA wakes it
+        self.state = self.HALT if self._halted else self.IDLE
+        self.deselect()
+
+    def _anticoll(self, frame):
+        if len(frame) < 2 or frame[0] not in (0x93, 0x95, 0x97):
+            self._to_idle()
+            return None
+        level = (0x93, 0x95, 0x97).index(frame[0])
+        if level != self._level:
+            self._to_idle()
+            return None
+        field = list(self._levels[level])
+        field.append(field[0] ^ field[1] ^ field[2] ^ field[3])
+
+        if frame[1] == 0x70 and len(frame) == 9:
+            if frame[2:7] != field or not self._check_crc(frame):
+                self._to_idle()
+                return None
+            if level + 1 < len(self._levels):
+                self._level += 1
+                return _Response.data([0x04], crc=True)
+            self.state = self.ACTIVE
+            self._halted = False
+            return _Response.data([self.SAK], crc=True)
+
+        # Answer with the UID bits after the ones the reader already knows, if they match
+        known = ((frame[1] >> 4) - 2) * 8 + (frame[1] & 0x0F)
+        if known < 0 or known > 32:
+            self._to_idle()
+            return None
+        bits = _bits(field)
+        if _bits(frame[2:])[:known] != bits[:known]:
+            return None
+        return _Response(bits[known:])
+
+    @staticmethod
+    def _check_crc(frame):
+        return len(frame) >= 3 and _with_crc(frame[:-2])[-2:] == frame[-2:]
+
+
+class EmulatedClassic(EmulatedCard):
+    """
+    A MIFARE Classic 1K or 4K card.
+
+    Authentication checks the key against the sector trailer but does not run Crypto1: the
+    session counts as encrypted once the reader sets MFCrypto1On, and ends when it is cleared.
+    READ, WRITE and the value block commands follow the card's two-phase protocol. Access bits
+    are not enforced.
+
+    Attributes:
+        blocks (list): The 16-byte blocks of the card.
+    """
+
+    # EEPROM programming time of WRITE and TRANSFER, in seconds
+    WRITE_TIME = 0.004
+
+    def __init__(self, uid=(0xDE, 0xAD, 0xBE, 0xEF), size=1024, keys=None):
+        """
+        Initializes an EmulatedClassic.
+
+        Args:
+            uid (list): The 4 or 7 byte UID (default DE AD BE EF).
+            size (int): 1024 or 4096 bytes (default 1024).
+            keys (dict): (key A, key B) per sector number (default None, which uses FF FF FF FF FF FF).
+        """
+        if size not in (1024, 4096):
+            raise ValueError("Invalid card size {}".format(size))
+        if len(uid) not in (4, 7):
+            raise ValueError("Invalid UID length {}".format(len(uid)))
+        self.size = size
+        super().__init__(uid)
+        if size == 4096:
+            self.ATQA = [0x02, 0x00]
+            self.SAK = 0x18
+        elif len(self.uid) == 7:
+            self.ATQA = [0x44, 0x00]
+
+        self.blocks = [[0] * 16 for _ in range(size // 16)]
+        u = self.uid
+        if len(u) == 4:
+            self.blocks[0] = u + [u[0] ^ u[1] ^ u[2] ^ u[3], self.SAK, 0x04, 0x00] + [0x62] * 8
+        else:
+            self.blocks[0] = u + [self.SAK, 0x44, 0x00] + [0x62] * 6
+        for sector in range(16 if size == 1024 else 40):
+            (key_a, key_b) = (keys or {}).get(sector, ([0xFF] * 6, [0xFF] * 6))
+            self.blocks[self._trailer(sector)] = list(key_a) + [0xFF, 0x07, 0x80, 0x69] + list(key_b)
+
+    def deselect(self):
+        self._sector = None
+        self._pending = None
+        self._transfer = None
+
+    def authenticate(self, auth_mode, block, key, uid):
+        """
+        Run the MFAuthent command of the reader against the card.
+
+        Args:
+            auth_mode (int): 0x60 for key A, 0x61 for key B.
+            block (int): A block of the sector to authenticate.
+            key (list): The 6-byte key.
+            uid (list): The 4 UID bytes sent by the reader.
+
+        Returns:
+            bool: True if the key is valid; otherwise the card falls back to IDLE.
+        """
+        uid4 = self.uid[:4] if len(self.uid) == 4 else self.uid[3:7]
+        if self.state != self.ACTIVE or list(uid) != uid4 or block >= len(self.blocks):
+            self._to_idle()
+            return False
+        sector = self._sector_of(block)
+        trailer = self.blocks[self._trailer(sector)]
+        if list(key) != (trailer[0:6] if auth_mode == 0x60 else trailer[10:16]):
+            self._to_idle()
+            return False
+        self._sector = sector
+        return True
+
+    def active(self, frame, chip):
+        if self._sector is not None and not chip.crypto1:
+            self._to_idle()
+            return None
+        if self._pending is not None:
+            return self._second_phase(frame)
+        if not self._check_crc(frame):
+            self._to_idle()
+            return None
+        if frame[:2] == [0x50, 0x00] and len(frame) == 4:
+            self.halt()
+            return None
+        if self._sector is None:
+            self._to_idle()
+            return None
+
+        (cmd, block) = (frame[0], frame[1])
+        if len(frame) != 4 or block >= len(self.blocks) or self._sector_of(block) != self._sector:
+            return _Response.nibble(NAK)
+        if cmd == 0x30:
+            return _Response.data(self.blocks[block], crc=True)
+        if cmd == 0xA0 and block != 0:
+            self._pending = ('write', block)
+            return _Response.nibble(ACK)
+        if cmd in (0xC0, 0xC1, 0xC2) and self._value(block) is not None:
+            self._pending = ({0xC0: 'decrement', 0xC1: 'increment', 0xC2: 'restore'}[cmd], block)
+            return _Response.nibble(ACK)
+        if cmd == 0xB0 and self._transfer is not None:
+            (value, addr) = self._transfer
+            self._transfer = None
+            v = list((value & 0xFFFFFFFF).to_bytes(4, 'little'))
+            self.blocks[block] = v + [x ^ 0xFF for x in v] + v + [addr, addr ^ 0xFF, addr, addr ^ 0xFF]
+            return _Response.nibble(ACK, self.WRITE_TIME)
+        return _Response.nibble(NAK)
+
+    def _second_phase(self, frame):
+        (kind, block) = self._pending
+        self._pending = None
+        if not self._check_crc(frame):
+            return _Response.nibble(NAK)
+        payload = frame[:-2]
+        if kind == 'write':
+            if len(payload) != 16:
+                return _Response.nibble(NAK)
+            self.blocks[block] = list(payload)
+            return _Response.nibble(ACK, self.WRITE_TIME)
+        if len(payload) != 4:
+            return _Response.nibble(NAK)
+        # The value operations answer nothing; the result waits in the transfer buffer
+        value = self._value(block)
+        operand = int.from_bytes(bytes(payload), 'little', signed=True)
+        if kind == 'increment':
+            value += operand
+        elif kind == 'decrement':
+            value -= operand
+        self._transfer = (value, self.blocks[block][12])
+        return None
+
+    def _value(self, block):
+        b = self.blocks[block]
+        if b[0:4] != b[8:12] or [x ^ 0xFF for x in b[0:4]] != b[4:8]:
+            return None
+        if b[12] != b[14] or b[13] != b[15] or b[12] ^ 0xFF != b[13]:
+            return None
+        return int.from_bytes(bytes(b[0:4]), 'little', signed=True)
+
+    @staticmethod
+    def _sector_of(block):
+        return block // 4 if block < 128 else 32 + (block - 128) // 16
+
+    @staticmethod
+    def _trailer(sector):
+        return sector * 4 + 3 if sector < 32 else 128 + (sector - 32) * 16 + 15
+
+
+class EmulatedUltralight(EmulatedCard):
+    """
+    A MIFARE Ultralight or NTAG21x card: 4-byte pages, READ of four pages, WRITE and
+    COMPATIBILITY WRITE of one page, and for NTAG GET_VERSION and FAST_READ.
+
+    The static lock bits of page 2 protect pages 3 to 15; the one-time programmable bits of
+    page 3 and the lock bits can only be set.
+
+    Attributes:
+        pages (list): The 4-byte pages of the card.
+        version (list): The 8-byte answer to GET_VERSION, or None for a card without it.
+    """
+
+    ATQA = [0x44, 0x00]
+    SAK = 0x00
+
+    # EEPROM programming time of a page, in seconds
+    WRITE_TIME = 0.0041
+
+    # Pages, GET_VERSION storage size byte and capability container data area size
+    NTAG = {
+        213: (45, 0x0F, 0x12),
+        215: (135, 0x11, 0x3E),
+        216: (231, 0x13, 0x6D),
+    }
+
+    def __init__(self, uid=(0x04, 0x11, 0x22, 0x33, 0x44, 0x55, 0x66), pages=16, version=None):
+        """
+        Initializes an EmulatedUltralight.
+
+        Args:
+            uid (list): The 7 byte UID (default 04 11 22 33 44 55 66).
+            pages (int): The number of pages (default 16, a MIFARE Ultralight).
+            version (list): The answer to GET_VERSION (default None, a card without GET_VERSION
+                and FAST_READ).
+        """
+        if len(uid) != 7:
+            raise ValueError("Invalid UID length {}".format(len(uid)))
+        super().__init__(uid)
+        self.version = list(version) if version is not None else None
+        u = self.uid
+        self.pages = [[0] * 4 for _ in range(pages)]
+        self.pages[0] = u[0:3] + [0x88 ^ u[0] ^ u[1] ^ u[2]]
+        self.pages[1] = u[3:7]
+        self.pages[2] = [u[3] ^ u[4] ^ u[5] ^ u[6], 0x48, 0x00, 0x00]
+
+    @classmethod
+    def ntag(cls, model=213, uid=(0x04, 0x11, 0x22, 0x33, 0x44, 0x55, 0x66)):
+        """
+        Create an NTAG213, NTAG215 or NTAG216 with an empty NDEF capability container.
+
+        Args:
+            model (int): 213, 215 or 216 (default 213).
+            uid (list): The 7 byte UID.
+
+        Returns:
+            EmulatedUltralight: The card.
+        """
+        if model not in cls.NTAG:
+            raise ValueError("Invalid NTAG model {}".format(model))
+        (pages, storage, cc_size) = cls.NTAG[model]
+        card = cls(uid, pages, [0x00, 0x04, 0x04, 0x02, 0x01, 0x00, storage, 0x03])
+        card.pages[3] = [0xE1, 0x10, cc_size, 0x00]
+        card.pages[4] = [0x03, 0x00, 0xFE, 0x00]
+        return card
+
+    def active(self, frame, chip):
+        if self._pending is not None:
+            page = self._pending
+            self._pending = None
+            if not self._check_crc(frame) or len(frame) != 18:
+                return _Response.nibble(NAK)
+            return self._write(page, frame[:4])
+        if not self._check_crc(frame):
+            self._to_idle()
+            return None
+
+        cmd = frame[0]
+        count = len(self.pages)
+        if cmd == 0x50 and frame[:2] == [0x50, 0x00] and len(frame) == 4:
+            self.halt()
+            return None
+        if cmd == 0x30 and len(frame) == 4:
+            if frame[1] >= count:
+                return _Response.nibble(NAK)
+            # The read rolls over to page 0 at the end of the memory
+            data = []
+            for i in range(4):
+                data += self.pages[(frame[1] + i) % count]
+            return _Response.data(data, crc=True)
+        if cmd == 0xA2 and len(frame) == 8:
+            return self._write(frame[1], frame[2:6])
+        if cmd == 0xA0 and len(frame) == 4:
+            if not self._writable(frame[1]):
+                return _Response.nibble(NAK)
+            self._pending = frame[1]
+            return _Response.nibble(ACK)
+        if self.version is not None:
+            if cmd == 0x60 and len(frame) == 3:
+                return _Response.data(self.version, crc=True)
+            if cmd == 0x3A and len(frame) == 5:
+                (start, end) = (frame[1], frame[2])
+                if start > end or end >= count:
+                    return _Response.nibble(NAK)
+                data = []
+                for page in self.pages[start:end + 1]:
+                    data += page
+                return _Response.data(data, crc=True)
+        # An unknown command, or GET_VERSION on a MIFARE Ultralight, ends the session
+        self._to_idle()
+        return None
+
+    def deselect(self):
+        self._pending = None
+
+    def _writable(self, page):
+        if page < 2 or page >= len(self.pages):
+            return False
+        if 3 <= page < 8:
+            return not self.pages[2][2] & (1 << page)
+        if 8 <= page < 16:
+            return not self.pages[2][3] & (1 << (page - 8))
+        return True
+
+    def _write(self, page, data):
+        if not self._writable(page):
+            return _Response.nibble(NAK)
+        if page == 2:
+            # Only the lock bytes can be written, and their bits only set
+            self.pages[2][2] |= data[2]
+            self.pages[2][3] |= data[3]
+        elif page == 3:
+            self.pages[3] = [a | b for a, b in zip(self.pages[3], data)]
+        else:
+            self.pages[page] = list(data)
+        return _Response.nibble(ACK, self.WRITE_TIME)
+
+
+class EmulatedIsoDep(EmulatedCard):
+    """
+    An ISO/IEC 14443-4 card, such as a MIFARE DESFire: RATS and ATS, PPS to the bit rates of
+    TA, and the block protocol with chaining both ways, R(NAK) retransmission, S(WTX) and
+    S(DESELECT).
+
+    apdu() answers the commands; the default holds one binary file, read with READ BINARY and
+    written with UPDATE BINARY. An APDU that takes longer than the frame waiting time is
+    answered after an S(WTX) request.
+
+    Attributes:
+        data (bytearray): The content of the binary file.
+        apdu_time (float): The time the card takes to process an APDU, in seconds.
+        apdus (list): The APDUs received, in order.
+    """
+
+    ATQA = [0x44, 0x03]
+    SAK = 0x20
+
+    # Frame sizes of FSDI/FSCI 0 to 8
+    FRAME_SIZES = (16, 24, 32, 40, 48, 64, 96, 128, 256)
+
+    def __init__(self, uid=(0x04, 0x52, 0x61, 0x7A, 0x12, 0x34, 0x80), data=None, fsci=8, ta=0x77,
+                 fwi=8, historical=(0x80,)):
+        """
+        Initializes an EmulatedIsoDep.
+
+        Args:
+            uid (list): The 7 byte UID.
+            data (bytes-like): The content of the binary file (default 2048 counting bytes).
+            fsci (int): The frame size the card accepts, as coded in the ATS (default 8, 256 bytes).
+            ta (int): The TA(1) byte of the ATS, the supported bit rates (default 0x77, up to
+                848 kbit/s both ways).
+            fwi (int): The frame waiting time integer (default 8, 77 ms).
+            historical (list): The historical bytes of the ATS.
+        """
+        super().__init__(uid)
+        self.data = bytearray(data) if data is not None else bytearray(i & 0xFF for i in range(2048))
+        self.fsci = fsci
+        self.ta = ta
+        self.fwi = fwi
+        self.historical = list(historical)
+        self.apdu_time = 0.0
+        self.apdus = []
+
+    @property
+    def ats(self):
+        """
+        list: The answer to RATS, without CRC.
+        """
+        body = [0x70 | self.fsci, self.ta, self.fwi << 4, 0x02] + self.historical
+        return [len(body) + 1] + body
+
+    @property
+    def fwt(self):
+        """
+        float: The frame waiting time, in seconds.
+        """
+        return 256 * 16 / FC * (1 << self.fwi)
+
+    def apdu(self, command):
+        """
+        Process a command APDU.
+
+        Args:
+            command (bytes): The APDU.
+
+        Returns:
+            bytes: The response APDU, with its status word.
+        """
+        if len(command) < 4:
+            return b'\x67\x00'
+        (ins, offset) = (command[1], (command[2] << 8) | command[3])
+        if ins == 0xA4:
+            return b'\x90\x00'
+        if ins == 0xB0 and len(command) == 5:
+            length = command[4] or 256
+            if offset >= len(self.data):
+                return b'\x6B\x00'
+            return bytes(self.data[offset:offset + length]) + b'\x90\x00'
+        if ins == 0xD6 and len(command) >= 5 and len(command) == 5 + command[4]:
+            if offset + command[4] > len(self.data):
+                return b'\x6B\x00'
+            self.data[offset:offset + command[4]] = command[5:]
+            return b'\x90\x00'
+        return b'\x6D\x00'
+
+    def active(self, frame, chip):
+        if not self._check_crc(frame):
+            # Transmission errors are left to the reader to recover from
+            if self._protocol:
+                return None
+            self._to_idle()
+            return None
+        frame = frame[:-2]
+        pcb = frame[0]
+        if not self._protocol:
+            if pcb == 0x50 and frame == [0x50, 0x00]:
+                self.halt()
+                return None
+            if pcb == 0xE0 and len(frame) == 2:
+                self._fsd = self.FRAME_SIZES[min(frame[1] >> 4, 8)]
+                self._protocol = True
+                self._pps = True
+                return self._send(self.ats)
+            self._to_idle()
+            return None
+
+        if self._pps and pcb & 0xF0 == 0xD0 and len(frame) == 3 and frame[1] == 0x11:
+            (dri, dsi) = (frame[2] & 0x03, (frame[2] >> 2) & 0x03)
+            if dri and not self.ta & (1 << (dri - 1)) or dsi and not self.ta & (0x10 << (dsi - 1)):
+                return None
+            self._pps = False
+            # The answer still goes at the old bit rates
+            response = self._send([pcb])
+            self.rates = (dri, dsi)
+            return response
+        self._pps = False
+
+        if pcb & 0xE2 == 0x02:
+            return self._i_block(frame)
+        if pcb & 0xE6 == 0xA2:
+            if pcb & 0x10:
+                # R(NAK): send the last block again, or tell the reader its block was lost
+                if pcb & 0x01 == self._bn:
+                    return self._send(self._last)
+                return self._send([0xA2 | self._bn])
+            if pcb & 0x01 != self._bn and self._answer:
+                self._bn ^= 1
+                return self._next_block()
+            return self._send(self._last)
+        if pcb == 0xC2 and len(frame) == 1:
+            response = self._send([0xC2])
+            self.halt()
+            return response
+        if pcb == 0xF2 and len(frame) == 2 and self._waiting:
+            self._waiting = False
+            return self._next_block(self.apdu_time)
+        return None
+
+    def deselect(self):
+        self.rates = (0, 0)
+        self._protocol = False
+        self._pps = False
+        self._fsd = 16
+        # The block number of the card starts at 1, the reader's at 0
+        self._bn = 1
+        self._command = bytearray()
+        self._answer = b''
+        self._last = []
+        self._waiting = False
+
+    def _i_block(self, frame):
+        pcb = frame[0]
+        if pcb & 0x01 == self._bn and self._last == [0xA2 | self._bn]:
+            # The reader did not get the R(ACK) of this block and sent it again
+            return self._send(self._last)
+        self._bn = pcb & 0x01
+        self._command += bytes(frame[1:])
+        if pcb & 0x10:
+            return self._send([0xA2 | self._bn])
+        command = bytes(self._command)
+        self._command = bytearray()
+        self.apdus.append(command)
+        self._answer = self.apdu(command)
+        if self.apdu_time > self.fwt:
+            # Ask for enough time, in multiples of the frame waiting time
+            self._waiting = True
+            wtxm = min(int(self.apdu_time / self.fwt) + 1, 59)
+            return self._send([0xF2, wtxm])
+        return self._next_block(self.apdu_time)
+
+    def _next_block(self, delay=0.0):
+        size = self._fsd - 3
+        (chunk, self._answer) = (self._answer[:size], self._answer[size:])
+        pcb = 0x02 | self._bn | (0x10 if self._answer else 0x00)
+        return self._send([pcb] + list(chunk), delay)
+
+    def _send(self, block, delay=0.0):
+        self._last = list(block)
+        return _Response.data(block, crc=True, delay=delay)
+
+
+class EmulatedGPIO:
+    """
+    A stand-in for RPi.GPIO wired to an Emulator.
+
+    Driving any output pin low and back high hard-resets the chip, like the NRSTPD pin. A pin
+    with edge detection is wired to the chip's IRQ output. Without a chip the pins are wired
+    to nothing.
+    """
+
+    BOARD = 10
+    BCM = 11
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+
+    def __init__(self, chip):
+        """
+        Initializes an EmulatedGPIO.
+
+        Args:
+            chip (Emulator): The chip wired to the pins, or None.
+        """
+        self.chip = chip
+        self._mode = None
+        self._outputs = {}
+        self._callbacks = {}
+
+    def getmode(self):
+        return self._mode
+
+    def setmode(self, mode):
+        self._mode = mode
+
+    def setup(self, pin, direction, pull_up_down=None, initial=None):
+        if direction == self.OUT:
+            self._outputs[pin] = initial if initial is not None else self.LOW
+
+    def output(self, pin, value):
+        if self.chip is not None and not self._outputs.get(pin, self.HIGH) and value:
+            self.chip.hard_reset()
+        self._outputs[pin] = value
+
+    def input(self, pin):
+        if pin in self._callbacks:
+            return self.HIGH if self.chip is None or self.chip.irq_line() else self.LOW
+        return self._outputs.get(pin, self.LOW)
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        self._callbacks[pin] = [callback] if callback is not None else []
+        if self.chip is not None:
+            self.chip.on_irq_edge = self._edge
+
+    def add_event_callback(self, pin, callback):
+        self._callbacks.setdefault(pin, []).append(callback)
+
+    def remove_event_detect(self, pin):
+        self._callbacks.pop(pin, None)
+        if not self._callbacks and self.chip is not None:
+            self.chip.on_irq_edge = None
+
+    def cleanup(self, pins=None):
+        if pins is None:
+            pins = list(self._outputs) + list(self._callbacks)
+            self._mode = None
+        for pin in pins if isinstance(pins, (list, tuple)) else [pins]:
+            self._outputs.pop(pin, None)
+            self._callbacks.pop(pin, None)
+
+    def _edge(self):
+        for pin, callbacks in list(self._callbacks.items()):
+            for callback in list(callbacks):
+                callback(pin)
+
+
+class Emulator:
+    """
+    A software model of an MFRC522 and the cards in its field, used in place of spidev.SpiDev.
+
+    The model covers the register file with the Set1/Set2 interrupt registers, the 64-byte FIFO,
+    the Transceive, Transmit, MFAuthent, CalcCRC and SoftReset commands, the timer with TAuto,
+    bit-oriented framing with collisions between cards, CRC_A in the chip, and the IRQ output.
+
+    Time is kept in `clock`, in seconds. Every SPI transfer costs SPI_OVERHEAD plus its bits at
+    max_speed_hz, and frames cost their air time at the bit rates set in TxModeReg and RxModeReg
+    (106 to 848 kbit/s). With realtime=True the clock also follows the host's real time between
+    transfers, so host sleeps and IRQ pins behave as on hardware. With realtime=False the clock only moves with the transfers, and polling an
+    interrupt request register skips to the next chip event: runs are deterministic and measure
+    the SPI traffic and the bus and air time of an ideal host.
+
+    Attributes:
+        cards (list): The EmulatedCard instances in the field.
+        gpio (EmulatedGPIO): The GPIO stand-in wired to the reset and IRQ pins.
+        clock (float): The emulated time in seconds.
+        transfers (int): The number of SPI transfers.
+        bytes (int): The number of SPI bytes transferred.
+        spi_limit_hz (int): The fastest SPI clock the wiring carries, or None for no limit. Bytes
+            of faster transfers are sampled one bit late, both ways.
+    """
+
+    # Time spent by the host and the SPI driver per transfer, in seconds
+    SPI_OVERHEAD = 20e-6
+
+    # Frame delay time between the end of a frame and the answer of the card, in seconds
+    FRAME_DELAY = 86e-6
+
+    # Register values after reset
+    RESET_VALUES = {
+        0x01: 0x20, 0x02: 0x80, 0x04: 0x14, 0x07: 0x21, 0x0B: 0x08, 0x0C: 0x10,
+        0x0E: 0xA0, 0x11: 0x3F, 0x14: 0x80, 0x16: 0x10, 0x17: 0x84, 0x18: 0x84,
+        0x19: 0x4D, 0x1C: 0x62, 0x1F: 0xEB, 0x21: 0xFF, 0x22: 0xFF, 0x24: 0x26,
+        0x26: 0x48, 0x27: 0x88, 0x28: 0x20, 0x29: 0x20, 0x37: 0x92,
+    }
+
+    def __init__(self, cards=None, realtime=True):
+        """
+        Initializes an Emulator.
+
+        Args:
+            cards (list): The cards in the field (default None, no card).
+            realtime (bool): Let the clock follow the host's real time (default True).
+        """
+        self.cards = list(cards or [])
+        self.realtime = realtime
+        self.max_speed_hz = 1000000
+        self.spi_limit_hz = None
+        self.mode = 0
+        self.transfers = 0
+        self.bytes = 0
+        self.clock = 0.0
+        self.gpio = EmulatedGPIO(self)
+        self.on_irq_edge = None
+        self._last_real = time.perf_counter()
+        self._lock = threading.RLock()
+        self._timer = None
+        self._line = True
+        self.hard_reset()
+
+    def reader(self, **kwargs):
+        """
+        Create an MFRC522 driving this chip.
+
+        Args:
+            **kwargs: The arguments of MFRC522 other than spi and gpio. The reader uses the SPI
+                interface unless a transport over an EmulatedSerial or EmulatedI2C is given.
+
+        Returns:
+            MFRC522: The reader.
+        """
+        if kwargs.get('transport') is None:
+            kwargs['spi'] = self
+        return MFRC522(gpio=self.gpio, **kwargs)
+
+    def reset_cards(self):
+        """
+        Take the cards out of the field and put them back, so they are all IDLE again.
+        """
+        with self._lock:
+            for card in self.cards:
+                card.power_on()
+
+    @property
+    def crypto1(self):
+        """
+        bool: Whether MFCrypto1On is set in Status2Reg.
+        """
+        return bool(self._regs[0x08] & 0x08)
+
+    # spidev.SpiDev API
+
+    def open(self, bus, device):
+        self.bus = bus
+        self.device = device
+
+    def close(self):
+        pass
+
+    def xfer2(self, data, *args):
+        with self._lock:
+            out = self._transfer(list(data))
+            self._update_line()
+            self._arm()
+            return out
+
+    xfer = xfer2
+
+    def writebytes(self, data):
+        self.xfer2(data)
+
+    # Chip
+
+    def hard_reset(self):
+        """
+        Reset every register, as the NRSTPD pin does.
+        """
+        with self._lock:
+            self._soft_reset()
+
+    def uart_baudrate(self):
+        """
+        Returns:
+            float: The UART data rate set in SerialSpeedReg.
+        """
+        value = self._regs[0x1F]
+        (t0, t1) = (value >> 5, value & 0x1F)
+        if t0 == 0:
+            return 27.12e6 / (t1 + 1)
+        return 27.12e6 / ((t1 + 33) * (1 << (t0 - 1)))
+
+    def irq_line(self):
+        """
+        Returns:
+            bool: The level of the IRQ output; IRqInv in CommIEnReg makes it active low.
+        """
+        active = bool(self._regs[0x04] & self._regs[0x02] & 0x7F or
+                      self._regs[0x05] & self._regs[0x03] & 0x7F)
+        return not active if self._regs[0x02] & 0x80 else active
+
+    def _soft_reset(self):
+        self._regs = [0] * 64
+        for reg, value in self.RESET_VALUES.items():
+            self._regs[reg] = value
+        self._fifo = []
+        self._pending = []
+
+    def _transfer(self, data):
+        self.transfers += 1
+        self.bytes += len(data)
+        out = [0] * len(data)
+        if not data:
+            return out
+        garbled = self.spi_limit_hz is not None and self.max_speed_hz > self.spi_limit_hz
+        if garbled:
+            data = [((b << 1) | (b >> 7)) & 0xFF for b in data]
+        if data[0] & 0x80:
+            self._skip_to_event((data[0] >> 1) & 0x3F)
+        self._advance(self.SPI_OVERHEAD + len(data) * 8.0 / max(self.max_speed_hz, 1))
+        if data[0] & 0x80:
+            for i in range(len(data) - 1):
+                out[i + 1] = self._read((data[i] >> 1) & 0x3F)
+        else:
+            addr = (data[0] >> 1) & 0x3F
+            for value in data[1:]:
+                self._write(addr, value)
+        if garbled:
+            out = [((b << 1) | (b >> 7)) & 0xFF for b in out]
+        return out
+
+    def _skip_to_event(self, reg):
+        # Without real time, an ideal host polls the IRQ registers exactly when the next event happens
+        if not self.realtime and reg in (0x04, 0x05):
+            if self._pending and self._pending[0][0] > self.clock:
+                self.clock = self._pending[0][0]
+
+    def _advance(self, seconds):
+        # Move the clock by the bus time of a transaction and run the chip events that are due
+        if self.realtime:
+            real = time.perf_counter()
+            self.clock += real - self._last_real
+            self._last_real = real
+        self.clock += seconds
+        self._fire()
+
+    def _fire(self):
+        while self._pending and self._pending[0][0] <= self.clock:
+            (at, event) = self._pending.pop(0)
+            event()
+
+    def _schedule(self, at, event):
+        self._pending.append((at, event))
+        self._pending.sort(key=lambda e: e[0])
+
+    def _update_line(self):
+        line = self.irq_line()
+        if self._line and not line and self.on_irq_edge is not None:
+            self._line = line
+            self.on_irq_edge()
+        self._line = line
+
+    def _arm(self):
+        # With an IRQ pin the chip must raise its interrupts without being polled
+        if not self.realtime or self.on_irq_edge is None or not self._pending or self._timer:
+            return
+        self._timer = threading.Timer(max(self._pending[0][0] - self.clock, 0), self._tick)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _tick(self):
+        with self._lock:
+            self._timer = None
+            self._advance(0)
+            self._update_line()
+            self._arm()
+
+    def _read(self, reg):
+        regs = self._regs
+        if reg == 0x09:
+            return self._fifo.pop(0) if self._fifo else 0
+        if reg == 0x0A:
+            return len(self._fifo)
+        if reg in (0x04, 0x05):
+            return regs[reg] & 0x7F
+        if reg == 0x07:
+            status = 0x01
+            if len(self._fifo) >= 64 - regs[0x0B]:
+                status |= 0x02
+            if len(self._fifo) <= regs[0x0B]:
+                status |= 0x04
+            if regs[0x04] & regs[0x02] & 0x7F or regs[0x05] & regs[0x03] & 0x7F:
+                status |= 0x10
+            return status
+        if reg == 0x0C:
+            return (regs[0x0C] & 0x07) | 0x10
+        return regs[reg]
+
+    def _write(self, reg, value):
+        regs = self._regs
+        value &= 0xFF
+        if reg == 0x09:
+            if len(self._fifo) < 64:
+                self._fifo.append(value)
+            else:
+                regs[0x06] |= 0x10
+        elif reg == 0x0A:
+            if value & 0x80:
+                self._fifo = []
+                regs[0x06] &= ~0x10
+        elif reg in (0x04, 0x05):
+            # Set1/Set2: bit 7 selects whether the other bits written are set or cleared
+            if value & 0x80:
+                regs[reg] |= value & 0x7F
+            else:
+                regs[reg] &= ~(value & 0x7F)
+        elif reg == 0x08:
+            # Only MFCrypto1On can be written
+            regs[0x08] = (regs[0x08] & ~0x08) | (value & 0x08)
+        elif reg == 0x01:
+            self._command(value & 0x0F)
+        elif reg == 0x0D:
+            regs[0x0D] = value
+            if value & 0x80 and regs[0x01] & 0x0F == 0x0C:
+                self._transmit()
+        elif reg == 0x14:
+            if regs[0x14] & 0x03 and not value & 0x03:
+                # Switching the antenna off powers the cards down
+                for card in self.cards:
+                    card.power_on()
+            regs[0x14] = value
+        elif reg != 0x37:
+            regs[reg] = value
+
+    def _command(self, command):
+        regs = self._regs
+        self._pending = []
+        if command == 0x0F:
+            self._soft_reset()
+            return
+        regs[0x01] = (regs[0x01] & 0xF0) | command
+        if command == 0x03:
+            preset = (0x0000, 0x6363, 0xA671, 0xFFFF)[regs[0x11] & 0x03]
+            crc = _crc_a(self._fifo, preset)
+            self._fifo = []
+            regs[0x22] = crc & 0xFF
+            regs[0x21] = crc >> 8
+            regs[0x05] |= 0x04
+        elif command == 0x0E:
+            self._authenticate()
+        elif command == 0x04:
+            self._transmit()
+
+    def _active_card(self):
+        for card in self.cards:
+            if card.state == EmulatedCard.ACTIVE:
+                return card
+        return None
+
+    def _authenticate(self):
+        frame = self._fifo
+        self._fifo = []
+        card = self._active_card()
+        if card is not None and hasattr(card, 'authenticate') and len(frame) >= 12 and \
+                card.authenticate(frame[0], frame[1], frame[2:8], frame[8:12]):
+            def done():
+                self._regs[0x08] |= 0x08
+                self._regs[0x04] |= 0x10
+                self._regs[0x01] &= 0xF0
+            # Three passes of the authentication, about 0.8 ms
+            self._schedule(self.clock + 0.0008, done)
+        else:
+            self._start_timer(self.clock + 0.0004)
+
+    def _timer_period(self):
+        prescaler = ((self._regs[0x2A] & 0x0F) << 8) | self._regs[0x2B]
+        reload = (self._regs[0x2C] << 8) | self._regs[0x2D]
+        return (2 * prescaler + 1) * (reload + 1) / FC
+
+    def _start_timer(self, start):
+        if self._regs[0x2A] & 0x80:
+            def expire():
+                self._regs[0x04] |= 0x01
+            self._schedule(start + self._timer_period(), expire)
+
+    def _transmit(self):
+        regs = self._regs
+        frame = list(self._fifo)
+        self._fifo = []
+        last = regs[0x0D] & 0x07
+        nbits = len(frame) * 8 if last == 0 else (len(frame) - 1) * 8 + last
+        if regs[0x12] & 0x80:
+            frame = _with_crc(frame)
+            nbits = len(frame) * 8
+        regs[0x06] &= 0x10
+        # TxSpeed and RxSpeed divide the bit time by 1, 2, 4 or 8
+        rates = ((regs[0x12] >> 4) & 0x03, (regs[0x13] >> 4) & 0x03)
+        end = self.clock + nbits * BIT_TIME / (1 << rates[0]) * 9 / 8
+        self._schedule(end, self._transmitted)
+
+        responses = []
+        if regs[0x14] & 0x03:
+            for card in self.cards:
+                # A card only hears frames sent at the bit rates it expects
+                if card.rates != rates:
+                    continue
+                response = card.handle(frame, nbits, self)
+                if response is not None:
+                    responses.append(response)
+        if regs[0x01] & 0x0F != 0x0C or not responses:
+            self._start_timer(end)
+            return
+        delay = max(r.delay for r in responses)
+        length = max(len(r.bits) for r in responses)
+        self._schedule(end + self.FRAME_DELAY + delay + length * BIT_TIME / (1 << rates[1]) * 9 / 8,
+                       lambda: self._receive(responses))
+
+    def _transmitted(self):
+        self._regs[0x04] |= 0x40
+        if self._regs[0x01] & 0x0F == 0x04:
+            self._regs[0x04] |= 0x10
+            self._regs[0x01] &= 0xF0
+
+    def _receive(self, responses):
+        regs = self._regs
+        align = (regs[0x0D] >> 4) & 0x07
+        # ValuesAfterColl cleared zeroes every bit from the first collision on
+        values_after_coll = bool(regs[0x0E] & 0x80)
+        bits = []
+        coll = None
+        for i in range(max(len(r.bits) for r in responses)):
+            values = set(r.bits[i] for r in responses if i < len(r.bits))
+            if len(values) > 1 and coll is None:
+                coll = i
+            if coll is not None and not values_after_coll:
+                bits.append(0)
+            else:
+                bits.append(1 if len(values) > 1 else values.pop())
+
+        data = _pack(bits, align)
+        error = 0
+        if coll is not None:
+            error |= 0x08
+            # CollPos counts from bit 0 of the first received byte, where RxAlign put the first
+            # received bit, 1 for the first bit and 0 for the 32nd (datasheet 9.3.1.15, CollReg)
+            regs[0x0E] = (regs[0x0E] & 0x80) | ((align + coll + 1) & 0x1F)
+        else:
+            regs[0x0E] = (regs[0x0E] & 0x80) | 0x20
+        if regs[0x13] & 0x80 and coll is None:
+            if len(bits) % 8 == 0 and len(data) >= 2 and _with_crc(data[:-2])[-2:] == data[-2:]:
+                data = data[:-2]
+                bits = bits[:-16]
+            else:
+                error |= 0x04
+        regs[0x0C] = (regs[0x0C] & 0xF8) | ((align + len(bits)) % 8)
+        for b in data:
+            if len(self._fifo) < 64:
+                self._fifo.append(b)
+            else:
+                error |= 0x10
+        regs[0x06] |= error
+        regs[0x04] |= 0x20
+        if error:
+            regs[0x04] |= 0x02
+
+
+class EmulatedSerial:
+    """
+    A stand-in for a pyserial Serial port wired to the UART of an Emulator.
+
+    Bytes sent at a rate more than 3% away from the chip's SerialSpeedReg rate are lost, and so
+    are answers read back at the wrong rate, as framing errors would lose them on a real line.
+    """
+
+    def __init__(self, chip):
+        """
+        Initializes an EmulatedSerial.
+
+        Args:
+            chip (Emulator): The chip wired to the port.
+        """
+        self.chip = chip
+        self.baudrate = 9600
+        self.timeout = 0.1
+        self._answers = []
+        self._addr = None
+
+    def write(self, data):
+        chip = self.chip
+        with chip._lock:
+            chip.transfers += 1
+            chip.bytes += len(data)
+            for b in bytes(data):
+                rate = chip.uart_baudrate()
+                chip._advance(10.0 / self.baudrate)
+                if abs(self.baudrate - rate) > rate * 0.03:
+                    self._addr = None
+                    continue
+                if self._addr is not None:
+                    # Data byte of a write; the address byte is echoed at the rate it came in
+                    (addr, self._addr) = (self._addr, None)
+                    chip._write(addr, b)
+                    self._answers.append((addr, rate))
+                elif b & 0x80:
+                    chip._skip_to_event(b & 0x3F)
+                    self._answers.append((chip._read(b & 0x3F), rate))
+                else:
+                    self._addr = b & 0x3F
+            chip._update_line()
+            chip._arm()
+        return len(data)
+
+    def read(self, size=1):
+        chip = self.chip
+        with chip._lock:
+            (answers, self._answers) = (self._answers[:size], self._answers[size:])
+            chip.bytes += len(answers)
+            chip._advance(10.0 * len(answers) / self.baudrate)
+            return bytes(b for b, rate in answers if abs(self.baudrate - rate) <= rate * 0.03)
+
+    def reset_input_buffer(self):
+        self._answers = []
+
+    def close(self):
+        pass
+
+
+class _I2cMessage:
+    """
+    A message of a combined I2C transaction, with the API of smbus2.i2c_msg.
+    """
+
+    def __init__(self, address, data, read):
+        self.addr = address
+        self.buf = list(data)
+        self.len = len(self.buf)
+        self.is_read = read
+
+    @classmethod
+    def write(cls, address, data):
+        return cls(address, data, False)
+
+    @classmethod
+    def read(cls, address, length):
+        return cls(address, [0] * length, True)
+
+    def __iter__(self):
+        return iter(self.buf)
+
+
+class EmulatedI2C:
+    """
+    A stand-in for an smbus2 SMBus wired to the I2C interface of an Emulator, at 400 kHz.
+
+    Every byte written after the register address goes to that register, and reads return the
+    same register repeatedly, as for FIFODataReg. A wrong device address raises IOError, as a
+    missing acknowledge does.
+    """
+
+    i2c_msg = _I2cMessage
+    SPEED_HZ = 400000
+
+    def __init__(self, chip, address=0x28):
+        """
+        Initializes an EmulatedI2C.
+
+        Args:
+            chip (Emulator): The chip on the bus.
+            address (int): The 7-bit address of the chip (default 0x28).
+        """
+        self.chip = chip
+        self.address = address
+        self._reg = 0
+
+    def write_byte_data(self, address, reg, value):
+        self.i2c_rdwr(_I2cMessage.write(address, [reg, value]))
+
+    def read_byte_data(self, address, reg):
+        return self.read_i2c_block_data(address, reg, 1)[0]
+
+    def write_i2c_block_data(self, address, reg, data):
+        self.i2c_rdwr(_I2cMessage.write(address, [reg] + list(data)))
+
+    def read_i2c_block_data(self, address, reg, length):
+        message = _I2cMessage.read(address, length)
+        self.i2c_rdwr(_I2cMessage.write(address, [reg]), message)
+        return list(message)
+
+    def i2c_rdwr(self, *messages):
+        chip = self.chip
+        with chip._lock:
+            chip.transfers += 1
+            for message in messages:
+                if message.addr != self.address:
+                    raise IOError("No acknowledge from I2C address {:#x}".format(message.addr))
+                chip.bytes += message.len
+                # Start or repeated start, address byte and one acknowledged byte per data byte
+                chip._advance(9.0 * (message.len + 1) / self.SPEED_HZ)
+                if message.is_read:
+                    chip._skip_to_event(self._reg)
+                    message.buf = [chip._read(self._reg) for _ in range(message.len)]
+                elif message.buf:
+                    self._reg = message.buf[0] & 0x3F
+                    for value in message.buf[1:]:
+                        chip._write(self._reg, value)
+            chip._update_line()
+            chip._arm()
+
+    def close(self):
+        pass
@@ -0,0 +1,111 @@
+from .Transport import Transport
+
+# smbus2 is only needed to open a bus by number and to batch transfers
+try:
+    from smbus2 import SMBus, i2c_msg
+except ImportError:
+    SMBus = None
+    i2c_msg = None
+
+
+class I2cTransport(Transport):
+    """
+    The I2C interface, over an object with the smbus2 SMBus API.
+
+    A register is written with its address followed by the data bytes, which all go to that
+    register, and read by writing its address and reading with a repeated start. Batches are
+    sent as one combined transaction (i2c_rdwr) when the bus offers message objects, so a batch
+    or a register program costs one ioctl; otherwise each register takes its own transaction.
+    SMBus block transfers are limited to 32 bytes, so longer FIFO transfers are split.
+
+    Attributes:
+        bus (object): The I2C bus.
+        address (int): The 7-bit address of the MFRC522, set by its EA and D1-D6 pins.
+    """
+
+    BLOCK_SIZE = 32
+
+    def __init__(self, bus=1, address=0x28):
+        """
+        Initializes an I2cTransport.
+
+        Args:
+            bus (int or object): The number of the I2C bus, opened with smbus2, or an object with
+                the smbus2 SMBus API (default 1).
+            address (int): The 7-bit address of the MFRC522 (default 0x28).
+        """
+        if isinstance(bus, int):
+            if SMBus is None:
+                raise ImportError("smbus2 is required to open an I2C bus by number")
+            bus = SMBus(bus)
+        self.bus = bus
+        self.address = address
+        # A bus may bring its own message objects, as the emulator does
+        self._msg = getattr(bus, 'i2c_msg', i2c_msg)
+
+    def write_reg(self, addr, val):
+        self._count(3)
+        self.bus.write_byte_data(self.address, addr, val)
+
+    def read_reg(self, addr):
+        self._count(3)
+        return self.bus.read_byte_data(self.address, addr)
+
+    def write_regs(self, pairs):
+        if self._msg is None or not hasattr(self.bus, 'i2c_rdwr'):
+            return Transport.write_regs(self, pairs)
+        if pairs:
+            self._count(3 * len(pairs))
+            self.bus.i2c_rdwr(*[self._msg.write(self.address, [addr, val]) for addr, val in pairs])
+
+    def read_regs(self, addrs):
+        if self._msg is None or not hasattr(self.bus, 'i2c_rdwr'):
+            return Transport.read_regs(self, addrs)
+        if not addrs:
+            return []
+        messages = []
+        for addr in addrs:
+            messages.append(self._msg.write(self.address, [addr]))
+            messages.append(self._msg.read(self.address, 1))
+        self._count(4 * len(addrs))
+        self.bus.i2c_rdwr(*messages)
+        return [list(message)[0] for message in messages[1::2]]
+
+    def write_fifo(self, addr, data):
+        data = list(data)
+        for i in range(0, len(data), self.BLOCK_SIZE):
+            block = data[i:i + self.BLOCK_SIZE]
+            self._count(len(block) + 2)
+            self.bus.write_i2c_block_data(self.address, addr, block)
+
+    def read_fifo(self, addr, count):
+        data = []
+        while count > 0:
+            n = min(count, self.BLOCK_SIZE)
+            self._count(n + 3)
+            data += self.bus.read_i2c_block_data(self.address, addr, n)
+            count -= n
+        return data
+
+    def run_program(self, program, data=None):
+        if self._msg is None or not hasattr(self.bus, 'i2c_rdwr'):
+            return Transport.run_program(self, program, data)
+        # The whole program as one combined transaction
+        messages = []
+        reads = []
+        for addr, val in program.steps:
+            if val is program.DATA:
+                if data:
+                    messages.append(self._msg.write(self.address, [addr] + list(data)))
+            elif val is None:
+                messages.append(self._msg.write(self.address, [addr]))
+                messages.append(self._msg.read(self.address, 1))
+                reads.append(messages[-1])
+            else:
+                messages.append(self._msg.write(self.address, [addr, val]))
+        self._count(sum(message.len + 1 for message in messages))
+        self.bus.i2c_rdwr(*messages)
+        return [list(message)[0] for message in reads]
+
+    def close(self):
+        self.bus.close()
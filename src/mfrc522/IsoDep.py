@@ -0,0 +1,280 @@
+import time
+
+
+class IsoDep:
+    """
+    An ISO/IEC 14443-4 (ISO-DEP) card, such as a MIFARE DESFire, driven through an MFRC522.
+
+    activate() sends RATS, reads the frame size, bit rates and frame waiting time the card gives
+    in its ATS, and switches both directions to the highest bit rate the card and the caller
+    allow with PPS; the MFRC522 sends and receives at 106, 212, 424 or 848 kbit/s. transceive()
+    exchanges APDUs with the block protocol: commands longer than a frame are sent as chained
+    I-blocks, chained answers are acknowledged block by block, lost blocks are recovered with
+    R(NAK), and waiting time extensions (S(WTX)) are granted.
+
+    A frame goes through the 64-byte FIFO in one piece, so the reader announces a frame size
+    (FSD) of 64 bytes, and sends frames of at most 64 bytes even to cards that accept more.
+
+    Attributes:
+        reader (MFRC522): The reader the card was selected with.
+        uid (list): The UID of the card, as returned by SelectCard.
+        id (int): The UID as an integer.
+        sak (int): The SAK byte returned when the card was selected.
+        ats (bytes): The answer to RATS, set by rats().
+        historical (bytes): The historical bytes of the ATS.
+        fsc (int): The largest frame the card accepts, in bytes.
+        fwt (float): The frame waiting time, in milliseconds.
+        bit_rates (list): The bit rates the card supports in both directions, in kbit/s.
+    """
+
+    # Commands and protocol control bytes
+    RATS = 0xE0
+    PPS = 0xD0
+    I_BLOCK = 0x02
+    R_ACK = 0xA2
+    R_NAK = 0xB2
+    S_DESELECT = 0xC2
+    S_WTX = 0xF2
+    CHAINING = 0x10
+
+    # Frame sizes of FSDI/FSCI 0 to 8, and the FSDI of the FIFO size
+    FRAME_SIZES = (16, 24, 32, 40, 48, 64, 96, 128, 256)
+    FSDI = 5
+
+    # TA(1) bits of the bit rates above 106 kbit/s, card to reader (DS) and reader to card (DR)
+    DS_BITS = {212: 0x10, 424: 0x20, 848: 0x40}
+    DR_BITS = {212: 0x01, 424: 0x02, 848: 0x04}
+    DIVISORS = {106: 0, 212: 1, 424: 2, 848: 3}
+
+    # 256 * 16 / fc, the unit of the frame waiting time, and the extra time a reader allows,
+    # in milliseconds
+    FWT_UNIT = 4096 / 13560.0
+    DELTA_FWT = 49152 / 13560.0
+
+    # R(NAK) sent after a block is lost, before giving up
+    RETRIES = 2
+
+    def __init__(self, reader, uid, sak=0x20):
+        """
+        Initializes an IsoDep for a card that was just selected.
+
+        Args:
+            reader (MFRC522): The reader the card was selected with.
+            uid (list): The UID of the card, as returned by SelectCard.
+            sak (int): The SAK byte returned by SelectCard (default 0x20).
+        """
+        self.reader = reader
+        self.uid = list(uid)
+        self.id = 0
+        for b in self.uid:
+            self.id = self.id * 256 + b
+        self.sak = sak
+        self.ats = None
+        self.historical = b''
+        self.fsc = 32
+        self.fwt = self.FWT_UNIT * (1 << 4)
+        self.bit_rates = [106]
+        self._bn = 0
+
+    @classmethod
+    def select(cls, reader):
+        """
+        Select a card in the field, at 106 kbit/s.
+
+        Args:
+            reader (MFRC522): The reader.
+
+        Returns:
+            IsoDep: The selected card, or None if no card answered or it does not support
+                ISO/IEC 14443-4 (SAK bit 0x20 cleared).
+        """
+        reader.SetBitRate(106)
+        (status, TagType) = reader.Request(reader.PICC_REQIDL)
+        if status != reader.MI_OK:
+            return None
+        (status, uid, sak) = reader.SelectCard()
+        if status != reader.MI_OK or not sak & 0x20:
+            return None
+        return cls(reader, uid, sak)
+
+    def activate(self, bit_rate=424):
+        """
+        Send RATS, then PPS to the highest bit rate supported by the card up to bit_rate.
+
+        Args:
+            bit_rate (int): The highest bit rate to use in kbit/s: 106, 212, 424 or 848
+                (default 424).
+
+        Returns:
+            int: The status of the activation, MI_OK once the card can take APDUs.
+        """
+        if bit_rate not in self.DIVISORS:
+            raise ValueError("Invalid bit rate {}".format(bit_rate))
+        if self.rats() is None:
+            return self.reader.MI_ERR
+        rate = max(r for r in self.bit_rates if r <= bit_rate)
+        if rate == 106:
+            return self.reader.MI_OK
+        return self.pps(rate)
+
+    def rats(self):
+        """
+        Send RATS with an FSD of 64 bytes and CID 0, and read the ATS.
+
+        Sets ats, historical, fsc, fwt and bit_rates.
+
+        Returns:
+            bytes: The ATS, or None if the card did not answer.
+        """
+        reader = self.reader
+        (status, backData, backLen) = reader.TransceiveCRC([self.RATS, self.FSDI << 4],
+                                                           reader.timeouts['activate'],
+                                                           maxLen=reader.FIFO_SIZE)
+        ats = reader.CheckCRC(status, backData)
+        if not ats or ats[0] != len(ats):
+            return None
+
+        # T0 tells which of TA(1), TB(1) and TC(1) follow; the others take their default values
+        t0 = ats[1] if len(ats) > 1 else 0x02
+        fields = {}
+        pos = 2
+        for bit in (0x10, 0x20, 0x40):
+            if t0 & bit:
+                if pos >= len(ats):
+                    return None
+                fields[bit] = ats[pos]
+                pos += 1
+        (ta, tb) = (fields.get(0x10, 0x00), fields.get(0x20, 0x40))
+        self.ats = bytes(ats)
+        self.historical = self.ats[pos:]
+        self.fsc = self.FRAME_SIZES[min(t0 & 0x0F, 8)]
+        fwi = tb >> 4 if tb >> 4 != 15 else 4
+        sfgi = tb & 0x0F if tb & 0x0F != 15 else 0
+        self.fwt = self.FWT_UNIT * (1 << fwi)
+        self.bit_rates = [106] + [rate for rate in (212, 424, 848)
+                                  if ta & self.DS_BITS[rate] and ta & self.DR_BITS[rate]]
+        self._bn = 0
+
+        # The card may need a guard time before the next frame
+        if sfgi:
+            time.sleep(self.FWT_UNIT * (1 << sfgi) / 1000.0)
+        return self.ats
+
+    def pps(self, tx, rx=None):
+        """
+        Switch to other bit rates with PPS, then set them on the reader.
+
+        Must be the first frame after the ATS.
+
+        Args:
+            tx (int): The reader to card bit rate in kbit/s.
+            rx (int): The card to reader bit rate in kbit/s (default None, the same as tx).
+
+        Returns:
+            int: The status of the PPS.
+        """
+        rx = tx if rx is None else rx
+        if tx not in self.DIVISORS or rx not in self.DIVISORS:
+            raise ValueError("Invalid bit rate {}/{}".format(tx, rx))
+        reader = self.reader
+        frame = [self.PPS, 0x11, (self.DIVISORS[rx] << 2) | self.DIVISORS[tx]]
+        (status, backData, backLen) = reader.TransceiveCRC(frame, self.fwt + self.DELTA_FWT)
+        answer = reader.CheckCRC(status, backData)
+        if answer is None or bytes(answer) != bytes([self.PPS]):
+            return reader.MI_ERR
+        reader.SetBitRate(tx, rx)
+        return reader.MI_OK
+
+    def transceive(self, apdu):
+        """
+        Send a command APDU and receive the response APDU.
+
+        Args:
+            apdu (list or bytes-like): The command APDU.
+
+        Returns:
+            bytes: The response APDU with its status word, or None if the exchange failed.
+        """
+        data = memoryview(bytes(apdu))
+        size = min(self.fsc, self.reader.FIFO_SIZE) - 3
+        # Send the command in as many I-blocks as the frame size requires
+        start = 0
+        while True:
+            chunk = data[start:start + size]
+            start += size
+            last = start >= len(data)
+            pcb = self.I_BLOCK | self._bn | (0x00 if last else self.CHAINING)
+            block = self._exchange(bytes([pcb]) + chunk)
+            if block is None:
+                return None
+            if last:
+                break
+            if block[0] & 0xF6 != self.R_ACK or block[0] & 0x01 != self._bn:
+                return None
+            self._bn ^= 1
+
+        # Acknowledge the chained blocks of the answer
+        answer = bytearray()
+        while True:
+            pcb = block[0]
+            if pcb & 0xE2 != self.I_BLOCK or pcb & 0x01 != self._bn:
+                return None
+            self._bn ^= 1
+            # Skip the CID and NAD bytes the card may add
+            answer += block[1 + bool(pcb & 0x08) + bool(pcb & 0x04):]
+            if not pcb & self.CHAINING:
+                return bytes(answer)
+            block = self._exchange(bytes([self.R_ACK | self._bn]))
+            if block is None:
+                return None
+
+    def deselect(self):
+        """
+        Send S(DESELECT), which puts the card into the HALT state, and go back to 106 kbit/s.
+
+        Returns:
+            int: The status of the deselection.
+        """
+        reader = self.reader
+        (status, backData, backLen) = reader.TransceiveCRC([self.S_DESELECT], self.fwt + self.DELTA_FWT)
+        answer = reader.CheckCRC(status, backData)
+        reader.SetBitRate(106)
+        if answer is None or bytes(answer) != bytes([self.S_DESELECT]):
+            return reader.MI_ERR
+        return reader.MI_OK
+
+    def _exchange(self, block):
+        """
+        Send a block and return the answer of the card, granting S(WTX) requests and recovering
+        lost blocks with R(NAK).
+
+        Returns:
+            bytes: The answer without CRC, or None.
+        """
+        reader = self.reader
+        (frame, timeout) = (block, self.fwt)
+        retries = self.RETRIES
+        while True:
+            (status, backData, backLen) = reader.TransceiveCRC(frame, timeout + self.DELTA_FWT,
+                                                               maxLen=reader.FIFO_SIZE)
+            answer = reader.CheckCRC(status, backData)
+            timeout = self.fwt
+            if not answer:
+                if retries == 0:
+                    return None
+                retries -= 1
+                frame = bytes([self.R_NAK | self._bn])
+                continue
+            pcb = answer[0]
+            if pcb & 0xF7 == self.S_WTX and len(answer) >= 2:
+                # Answer with the same multiplier, and wait that many frame waiting times
+                wtxm = answer[-1] & 0x3F
+                frame = bytes([self.S_WTX, wtxm])
+                timeout = self.fwt * max(wtxm, 1)
+                continue
+            if frame[0] == self.R_NAK | self._bn and pcb & 0xF6 == self.R_ACK and \
+                    pcb & 0x01 != self._bn and block[0] & 0xE2 == self.I_BLOCK:
+                # The card did not get the I-block
+                frame = block
+                continue
+            return answer
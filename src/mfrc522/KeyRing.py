@@ -0,0 +1,145 @@
+from collections import OrderedDict
+
+
+class KeyRing:
+    """
+    A set of candidate MIFARE Classic keys with a cache of the key that worked per card and sector.
+
+    Candidates are tried in order: the cached key for the UID and sector first, then the key A
+    candidates, then the key B candidates. Per-sector overrides replace the candidate lists for
+    that sector.
+
+    Attributes:
+        keys_a (list): The ordered key A candidates.
+        keys_b (list): The ordered key B candidates.
+        sector_keys (dict): Per-sector overrides, mapping a sector number to (keys_a, keys_b).
+        hits (int): Authentications that succeeded with the cached key.
+        misses (int): Authentications that had no cached key or whose cached key failed.
+    """
+
+    PICC_AUTHENT1A = 0x60
+    PICC_AUTHENT1B = 0x61
+
+    def __init__(self, keys_a=None, keys_b=None, cache_size=256):
+        """
+        Initializes a KeyRing.
+
+        Args:
+            keys_a (list): The key A candidates (default None, which uses the transport key FF FF FF FF FF FF).
+            keys_b (list): The key B candidates (default None, which tries no key B).
+            cache_size (int): The number of (UID, sector) entries kept in the cache.
+        """
+        if keys_a is None:
+            keys_a = [[0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF]]
+        self.keys_a = [list(key) for key in keys_a]
+        self.keys_b = [list(key) for key in (keys_b or [])]
+        self.sector_keys = {}
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def set_sector_keys(self, sector, keys_a=None, keys_b=None):
+        """
+        Override the candidate keys of one sector.
+
+        Args:
+            sector (int): The sector number.
+            keys_a (list): The key A candidates for the sector.
+            keys_b (list): The key B candidates for the sector.
+        """
+        self.sector_keys[sector] = ([list(key) for key in (keys_a or [])],
+                                    [list(key) for key in (keys_b or [])])
+
+    def candidates(self, uid, sector):
+        """
+        List the keys to try for a card and sector, most likely first.
+
+        Args:
+            uid (list): The UID of the card.
+            sector (int): The sector number.
+
+        Returns:
+            list: A list of (auth mode, key) tuples.
+        """
+        keys_a, keys_b = self.sector_keys.get(sector, (self.keys_a, self.keys_b))
+        result = [(self.PICC_AUTHENT1A, key) for key in keys_a]
+        result += [(self.PICC_AUTHENT1B, key) for key in keys_b]
+
+        cached = self._cache.get((tuple(uid), sector))
+        if cached is not None:
+            self._cache.move_to_end((tuple(uid), sector))
+            result = [cached] + [c for c in result if c != cached]
+        return result
+
+    def lookup(self, uid, sector):
+        """
+        Return the cached key for a card and sector.
+
+        Args:
+            uid (list): The UID of the card.
+            sector (int): The sector number.
+
+        Returns:
+            tuple: The (auth mode, key) tuple that worked last time, or None.
+        """
+        return self._cache.get((tuple(uid), sector))
+
+    def remember(self, uid, sector, auth_mode, key, attempts=1):
+        """
+        Record the key that authenticated a sector and update the hit/miss counters.
+
+        Args:
+            uid (list): The UID of the card.
+            sector (int): The sector number.
+            auth_mode (int): PICC_AUTHENT1A or PICC_AUTHENT1B.
+            key (list): The key that worked.
+            attempts (int): The number of keys tried, including the one that worked.
+        """
+        entry = (tuple(uid), sector)
+        if attempts == 1 and self._cache.get(entry) == (auth_mode, list(key)):
+            self.hits += 1
+        else:
+            self.misses += 1
+        self._cache[entry] = (auth_mode, list(key))
+        self._cache.move_to_end(entry)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def failed(self, uid, sector):
+        """
+        Record that no candidate authenticated a sector.
+
+        Args:
+            uid (list): The UID of the card.
+            sector (int): The sector number.
+        """
+        self.misses += 1
+        self.forget(uid, sector)
+
+    def forget(self, uid, sector=None):
+        """
+        Drop cached keys of a card.
+
+        Args:
+            uid (list): The UID of the card.
+            sector (int): The sector number (default None, which drops every sector of the card).
+        """
+        for entry in list(self._cache):
+            if entry[0] == tuple(uid) and (sector is None or entry[1] == sector):
+                del self._cache[entry]
+
+    def stats(self):
+        """
+        Return the cache counters.
+
+        Returns:
+            dict: The hits, misses, hit rate and number of cached entries.
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'cached': len(self._cache),
+        }
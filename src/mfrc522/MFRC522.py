@@ -1,11 +1,62 @@
-import RPi.GPIO as GPIO
-import spidev
 import logging
-from time import sleep
+import threading
+from time import sleep, monotonic
+from .Metrics import Metrics
+from .RegisterProgram import RegisterProgram
+from .TraceRecorder import TraceRecorder
+from .Transport import SpiTransport
+
+# RPi.GPIO and spidev are only needed for a real reader; readers built on an injected SPI device
+# and GPIO module, such as an Emulator, work without them
+try:
+    import RPi.GPIO as GPIO
+except ImportError:
+    GPIO = None
+try:
+    import spidev
+except ImportError:
+    spidev = None
+
+# Readers share one logger; where its records go is up to the application
+logging.getLogger('mfrc522Logger').addHandler(logging.NullHandler())
+
+
+def _crc_a_table():
+    # Byte-wise lookup table for the reflected CRC-16/CCITT polynomial (0x8408) used by CRC_A
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            if crc & 0x01:
+                crc = (crc >> 1) ^ 0x8408
+            else:
+                crc >>= 1
+        table.append(crc)
+    return table
+
+
+_CRC_A_TABLE = _crc_a_table()
+
+
+def crc_a(data):
+    """
+    Calculates the ISO/IEC 14443-3 CRC_A of a frame on the host.
+
+    Args:
+        data (list): The bytes of the frame.
+
+    Returns:
+        A list of two integers, the low and high byte of the CRC, in transmission order.
+    """
+    crc = 0x6363
+    for b in data:
+        crc = (crc >> 8) ^ _CRC_A_TABLE[(crc ^ b) & 0xFF]
+    return [crc & 0xFF, crc >> 8]
 
 
 class MFRC522:
     MAX_LEN = 16
+    FIFO_SIZE = 64
 
     # Proximity Coupling Device
     PCD_IDLE = 0x00
@@ -20,6 +71,8 @@ class MFRC522:
     PICC_REQIDL = 0x26
     PICC_REQALL = 0x52
     PICC_ANTICOLL = 0x93
+    PICC_ANTICOLL2 = 0x95
+    PICC_ANTICOLL3 = 0x97
     PICC_SElECTTAG = 0x93
     PICC_AUTHENT1A = 0x60
     PICC_AUTHENT1B = 0x61
@@ -35,6 +88,7 @@ class MFRC522:
     MI_OK = 0
     MI_NOTAGERR = 1
     MI_ERR = 2
+    MI_COLLERR = 3
 
     # MFRC522 Registers Addresses
     Reserved00 = 0x00
@@ -105,36 +159,151 @@ class MFRC522:
     Reserved33 = 0x3E
     Reserved34 = 0x3F
 
+    # Registers whose contents only change when the host writes them. The
+    # remaining registers (IRQ flags, FIFO, CommandReg, Status2Reg, CollReg,
+    # ControlReg, ...) are updated by the chip and must always be read back.
+    HOST_OWNED_REGS = frozenset([
+        CommIEnReg, DivlEnReg, WaterLevelReg, BitFramingReg,
+        ModeReg, TxModeReg, RxModeReg, TxControlReg, TxAutoReg, TxSelReg,
+        RxSelReg, RxThresholdReg, DemodReg, MifareReg, SerialSpeedReg,
+        ModWidthReg, RFCfgReg, GsNReg, CWGsPReg, ModGsPReg,
+        TModeReg, TPrescalerReg, TReloadRegH, TReloadRegL,
+    ])
+
+    # Hardware timer timeout per command class, in milliseconds. The timer starts when the
+    # frame has been sent and stops at the first bit of the answer, so these only have to
+    # cover the card's response time (EEPROM programming for WRITE).
+    TIMEOUTS = {
+        'request': 1,
+        'anticoll': 1,
+        'select': 1,
+        'auth': 10,
+        'read': 5,
+        'write': 10,
+        'value': 1,
+        'activate': 5,
+        'halt': 1,
+        'default': 15,
+    }
+
+    # TxModeReg/RxModeReg speed bits and ModWidthReg value of each bit rate, in kbit/s
+    BIT_RATES = {106: 0x00, 212: 0x10, 424: 0x20, 848: 0x30}
+    MOD_WIDTHS = {106: 0x26, 212: 0x15, 424: 0x0A, 848: 0x05}
+
+    # Host-side wait: poll back to back for POLL_SPIN seconds, then sleep between polls,
+    # doubling the sleep up to POLL_SLEEP_MAX seconds.
+    POLL_SPIN = 0.0005
+    POLL_SLEEP_MAX = 0.001
+
     serNum = []
 
-    def __init__(self, bus=0, device=0, spd=1000000, pin_mode=10, pin_rst=-1, debugLevel='WARNING'):
+    def __init__(self, bus=0, device=0, spd=1000000, pin_mode=10, pin_rst=-1, debugLevel='WARNING',
+                 reg_cache=False, pin_irq=None, timeouts=None, crc='host', metrics=False,
+                 spi=None, gpio=None, trace=None, transport=None):
         """
         Initializes the MFRC522 RFID reader.
 
         Args:
         - bus (int): the SPI bus number (default 0).
         - device (int): the SPI device number (default 0).
-        - spd (int): the SPI bus speed (default 1000000).
+        - spd (int or str): the SPI bus speed (default 1000000). 'auto' tests the link at rising
+          clocks and keeps the fastest reliable one with a margin, see SpiTransport.tune; the
+          clock in use is kept in the `spd` attribute.
         - pin_mode (int): the GPIO pin numbering mode (default 10).
         - pin_rst (int): the GPIO pin number for reset (default -1, which sets the pin based on pin_mode).
         - debugLevel (str): the logging debug level (default 'WARNING').
+        - reg_cache (bool): keep a shadow copy of the host-owned registers so read-modify-write
+          operations on them skip the SPI readback (default False).
+        - pin_irq (int): the GPIO pin wired to the chip's IRQ output. When set, command completion is
+          signalled by a falling edge on this pin instead of polling every millisecond (default None).
+        - timeouts (dict): overrides for the per-command timeouts in TIMEOUTS, in milliseconds
+          (default None). The active profiles are kept in the `timeouts` attribute.
+        - crc (str): where CRC_A is computed (default 'host'). 'host' uses a lookup table on the host,
+          'chip' uses the chip's CRC coprocessor, and 'frame' lets the chip append and check the CRC
+          on transmission and reception (TxModeReg/RxModeReg CRCEn).
+        - metrics (bool or Metrics): collect per-command latency histograms, poll counts, SPI
+          traffic and failures in the `metrics` attribute (default False). A Metrics instance may
+          be passed to share it between readers. When disabled, `metrics` is None and nothing is
+          recorded.
+        - spi (object): an object with the spidev.SpiDev API to use as is instead of opening
+          /dev/spidev<bus>.<device>; spd is still applied (default None).
+        - gpio (module): a module or object with the RPi.GPIO API to use instead of RPi.GPIO
+          (default None).
+        - trace (str or file): record every SPI transfer into this binary trace file, see
+          TraceRecorder; the trace is finished by Close (default None).
+        - transport (Transport): the host interface, such as a UartTransport or an I2cTransport
+          (default None, which uses SPI). bus, device, spd, spi and trace only apply to SPI.
+
+        Frames sent to the card may be lists of ints, bytes, bytearrays or memoryviews. The answers
+        are returned as bytes.
         """
-        # Initialize SPI communication
-        self.spi = spidev.SpiDev()
-        self.spi.open(bus, device)
-        self.spi.max_speed_hz = spd
+        if crc not in ('host', 'chip', 'frame'):
+            raise ValueError("Invalid CRC mode {}".format(crc))
+        self.crc_mode = crc
+        self._frame_crc = (False, False)
+
+        self.timeouts = dict(self.TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self._reload = None
+
+        # Shadow copies of HOST_OWNED_REGS, filled on write and invalidated on Reset
+        self.reg_cache = reg_cache
+        self._shadow = {}
+
+        # Register programs compiled for this reader, and the BitFramingReg value of the next
+        # transceive, written together with StartSend
+        self._programs = {}
+        self._framing = 0x00
+
+        # The answers of the card are read from the FIFO into this buffer, which is reused by
+        # every command
+        self.rx_buffer = bytearray(self.FIFO_SIZE)
+        self._rx = memoryview(self.rx_buffer)
+
+        # Initialize the host interface, SPI unless another transport is given
+        self.bus = bus
+        self.device = device
+        if transport is None:
+            if spi is None:
+                if spidev is None:
+                    raise ImportError("spidev is required unless an SPI device is passed as spi")
+                spi = spidev.SpiDev()
+                spi.open(bus, device)
+            if trace is not None:
+                spi = TraceRecorder(spi, trace)
+            spi.max_speed_hz = SpiTransport.SPEEDS[0] if spd == 'auto' else spd
+            transport = SpiTransport(spi)
+        elif spi is not None or trace is not None:
+            raise ValueError("spi and trace only apply to the SPI transport")
+        self.transport = transport
+        self.spi = getattr(transport, 'spi', None)
+        self.spd = self.spi.max_speed_hz if self.spi is not None else None
+
+        # The transport counts the bus traffic when metrics are on
+        self.metrics = None
+        if metrics:
+            self.metrics = metrics if isinstance(metrics, Metrics) else Metrics()
+            transport.metrics = self.metrics
+        self._polls = 0
+        self._last_error = None
 
         # Initialize logger for debugging
         self.logger = logging.getLogger('mfrc522Logger')
-        self.logger.addHandler(logging.StreamHandler())
         level = logging.getLevelName(debugLevel)
         self.logger.setLevel(level)
 
+        if gpio is None:
+            if GPIO is None:
+                raise ImportError("RPi.GPIO is required unless a GPIO module is passed as gpio")
+            gpio = GPIO
+        self.gpio = gpio
+
         # Set GPIO pin numbering mode if not already set
-        gpioMode = GPIO.getmode()
+        gpioMode = gpio.getmode()
 
         if gpioMode is None:
-            GPIO.setmode(pin_mode)
+            gpio.setmode(pin_mode)
         else:
             pin_mode = gpioMode
 
@@ -147,8 +316,24 @@ class MFRC522:
 
         self.StopAuth = self.StopCrypto1
         # Set up reset pin and initialize MFRC522 RFID reader
-        GPIO.setup(pin_rst, GPIO.OUT)
-        GPIO.output(pin_rst, 1)
+        self.pin_rst = pin_rst
+        gpio.setup(pin_rst, gpio.OUT)
+        gpio.output(pin_rst, 1)
+
+        # Set up the IRQ pin. The IRQ output is configured active low (IRqInv), so a
+        # completed command shows up as a falling edge.
+        self.pin_irq = pin_irq
+        self._irq_event = threading.Event()
+        if pin_irq is not None:
+            gpio.setup(pin_irq, gpio.IN, pull_up_down=gpio.PUD_UP)
+            gpio.add_event_detect(pin_irq, gpio.FALLING, callback=self._irq_callback)
+
+        # Pick the SPI clock before the chip is configured, as the steps that fail may garble
+        # register writes
+        if spd == 'auto' and self.spi is not None:
+            self.spd = transport.tune()
+            self.logger.info("SPI clock set to %d Hz", self.spd)
+
         self.Init()
 
     def Reset(self):
@@ -157,49 +342,297 @@ class MFRC522:
 
         This function sends the PCD_RESETPHASE command to the MFRC522 chip, which resets its internal state
         and clears all registers. After the reset, the chip is ready to accept new commands.
+        The register shadow cache is invalidated, as every register returns to its reset value.
         """
 
-        self.WriteReg(self.CommandReg, self.PCD_RESETPHASE)
+        self.transport.soft_reset(self.CommandReg, self.PCD_RESETPHASE)
+        self._shadow.clear()
+        self._reload = None
+        self._frame_crc = (False, False)
+        self._framing = 0x00
+        self.bit_rate = (106, 106)
 
     def WriteReg(self, addr, val):
         """
-        Write a value to a register of the MFRC522 chip using SPI communication.
+        Write a value to a register of the MFRC522 chip.
 
-        This method sends a write command to the MFRC522 chip using the SPI interface, specifying the
+        This method sends a write command to the MFRC522 chip through the transport, specifying the
         register address and the value to be written.
 
+        When the register cache is enabled, writes to a host-owned register that already holds
+        the value are skipped.
+
         Args:
             :param: (int): the address of the register to write to, in the range 0x00-0xFF.
             val (int): the value to write to the register, in the range 0x00-0xFF.
         """
-        val = self.spi.xfer2([(addr << 1) & 0x7E, val])
+        if addr == self.BitFramingReg:
+            self._framing = val & 0x7F
+        if self.reg_cache and addr in self.HOST_OWNED_REGS:
+            if self._shadow.get(addr) == val:
+                return
+            self._shadow[addr] = val
+        self.transport.write_reg(addr, val)
 
     def ReadReg(self, addr):
         """
-        Read the value of a register of the MFRC522 chip using SPI communication.
+        Read the value of a register of the MFRC522 chip.
 
-        This method sends a read command to the MFRC522 chip using the SPI interface, specifying the
+        This method sends a read command to the MFRC522 chip through the transport, specifying the
         register address.
 
+        When the register cache is enabled, host-owned registers are served from the shadow copy
+        once they have been written or read.
+
         Args:
             addr (int): the address of the register to read from, in the range 0x00-0xFF.
 
         Returns:
             The value read from the register.
         """
-        val = self.spi.xfer2([((addr << 1) & 0x7E) | 0x80, 0])
-        return val[1]
+        if self.reg_cache and addr in self.HOST_OWNED_REGS:
+            if addr in self._shadow:
+                return self._shadow[addr]
+            val = self.transport.read_reg(addr)
+            self._shadow[addr] = val
+            return val
+        return self.transport.read_reg(addr)
+
+    def WriteRegs(self, pairs):
+        """
+        Write several registers in as few bus transactions as the transport allows.
+
+        With the register cache enabled, writes that would not change a host-owned register are
+        dropped from the batch.
+
+        Args:
+            pairs (list): (address, value) tuples, written in order.
+        """
+        for addr, val in pairs:
+            if addr == self.BitFramingReg:
+                self._framing = val & 0x7F
+        if self.reg_cache:
+            batch = []
+            for addr, val in pairs:
+                if addr in self.HOST_OWNED_REGS:
+                    if self._shadow.get(addr) == val:
+                        continue
+                    self._shadow[addr] = val
+                batch.append((addr, val))
+            pairs = batch
+        self.transport.write_regs(pairs)
+
+    def ReadRegs(self, addrs):
+        """
+        Read several registers in as few bus transactions as the transport allows.
+
+        Args:
+            addrs (list): The register addresses.
+
+        Returns:
+            list: The values read, in the order of addrs.
+        """
+        return self.transport.read_regs(addrs)
+
+    def RunProgram(self, program, data=None):
+        """
+        Run a RegisterProgram, a fixed sequence of register writes and reads compiled once and
+        sent in as few bus transactions as the transport allows (one ioctl on SPI).
+
+        The register cache is updated with the host-owned registers the program writes or reads.
+
+        Args:
+            program (RegisterProgram): The program.
+            data (list): The bytes of the data step of the program, such as a FIFO load
+                (default None).
+
+        Returns:
+            list: The values read by the program, in order.
+        """
+        values = self.transport.run_program(program, data)
+        if program.writes or self.reg_cache:
+            i = 0
+            for addr, val in program.steps:
+                if val is None:
+                    if self.reg_cache and addr in self.HOST_OWNED_REGS:
+                        self._shadow[addr] = values[i]
+                    i += 1
+                elif val is not RegisterProgram.DATA:
+                    if addr == self.BitFramingReg:
+                        self._framing = val & 0x7F
+                    if self.reg_cache and addr in self.HOST_OWNED_REGS:
+                        self._shadow[addr] = val
+        return values
+
+    def _run(self, steps, data=None):
+        """
+        Run register program steps, compiling them on first use.
+
+        With the register cache enabled, writes that would not change a host-owned register are
+        left out, and the remaining sequence is compiled as its own program.
+
+        Args:
+            steps (list): The steps, see RegisterProgram.
+            data (list): The bytes of the data step (default None).
+
+        Returns:
+            list: The values read.
+        """
+        if self.reg_cache:
+            shadow = {}
+            kept = []
+            for addr, val in steps:
+                if val is not None and val is not RegisterProgram.DATA and addr in self.HOST_OWNED_REGS:
+                    if shadow.get(addr, self._shadow.get(addr)) == val:
+                        continue
+                    shadow[addr] = val
+                kept.append((addr, val))
+            steps = kept
+        key = tuple(steps)
+        program = self._programs.get(key)
+        if program is None:
+            program = self._programs[key] = RegisterProgram(key)
+        return self.RunProgram(program, data)
+
+    def WriteFIFO(self, data):
+        """
+        Load a sequence of bytes into the FIFO buffer.
+
+        On SPI the MFRC522 keeps writing to the same register for every byte that follows the
+        address byte, so the whole payload is sent behind one FIFODataReg address.
+
+        Args:
+            data (list or bytes-like): the bytes to push into the FIFO.
+        """
+        if len(data) == 0:
+            return
+        self.transport.write_fifo(self.FIFODataReg, data)
 
-    def Close(self):
+    def ReadFIFO(self, count, into=None):
         """
-        Close the MFRC522 chip by releasing the SPI interface and cleaning up the GPIO.
+        Drain a number of bytes from the FIFO buffer.
+
+        On SPI the FIFODataReg read address is repeated once per byte, followed by a
+        terminating 0x00, and the chip shifts out one FIFO byte per address.
+
+        Args:
+            count (int): the number of bytes to read from the FIFO.
+            into (bytearray or memoryview): a writable buffer of at least count bytes to read
+                into (default None, which reads into the reader's rx_buffer and copies out).
 
-        This method closes the SPI interface used to communicate with the MFRC522 chip, releasing any
+        Returns:
+            bytes: The bytes read, or a memoryview of the filled part of into.
+        """
+        if count <= 0:
+            return b'' if into is None else memoryview(into)[:0]
+        if into is not None:
+            view = memoryview(into)[:count]
+            self.transport.read_fifo_into(self.FIFODataReg, view)
+            return view
+        view = self._rx[:count] if count <= self.FIFO_SIZE else memoryview(bytearray(count))
+        self.transport.read_fifo_into(self.FIFODataReg, view)
+        return bytes(view)
+
+    def Close(self, cleanup=True):
+        """
+        Close the MFRC522 chip by releasing the host interface and cleaning up the GPIO.
+
+        This method closes the transport used to communicate with the MFRC522 chip, releasing any
         system resources associated with it. It also calls the `GPIO.cleanup()` function to release
-        any GPIO pins that were used to control the chip.
+        the reset and IRQ pins of this reader; pins used by other readers or by the application are
+        left alone.
+
+        Args:
+            cleanup (bool): Release the GPIO pins of the reader (default True). Pass False when the
+                reset pin is shared with readers that stay open.
+        """
+        if self.pin_irq is not None:
+            self.gpio.remove_event_detect(self.pin_irq)
+        self.transport.close()
+        if cleanup:
+            self.gpio.cleanup(self.gpio_pins())
+
+    def gpio_pins(self):
+        """
+        Return the GPIO pins used by the reader.
+
+        Returns:
+            list: The reset pin, followed by the IRQ pin if one is set.
         """
-        self.spi.close()
-        GPIO.cleanup()
+        pins = [self.pin_rst]
+        if self.pin_irq is not None:
+            pins.append(self.pin_irq)
+        return pins
+
+    def _irq_callback(self, channel):
+        """
+        GPIO edge callback for the IRQ pin; wakes the thread waiting in _wait_irq.
+        """
+        self._irq_event.set()
+
+    def _wait_irq(self, reg, mask, timeout):
+        """
+        Wait until any of the bits in mask is set in an interrupt request register.
+
+        Without an IRQ pin the register is polled back to back for POLL_SPIN seconds, then with
+        sleeps that double up to POLL_SLEEP_MAX. With an IRQ pin the thread blocks until the next
+        falling edge, bounded by 25 ms so a missed edge degrades to slow polling.
+
+        Args:
+            reg (int): the interrupt request register to poll.
+            mask (int): the bits to wait for.
+            timeout (float): the software time limit in seconds.
+
+        Returns:
+            tuple: The last value read from the register and whether the time limit was hit.
+        """
+        start = monotonic()
+        delay = 0.0001
+        self._polls = 0
+        while True:
+            n = self.ReadReg(reg)
+            self._polls += 1
+            if n & mask:
+                return n, False
+            now = monotonic()
+            if now - start >= timeout:
+                return n, True
+            if self.pin_irq is not None:
+                if self._irq_event.wait(0.025):
+                    self._irq_event.clear()
+            elif now - start >= self.POLL_SPIN:
+                sleep(delay)
+                delay = min(delay * 2, self.POLL_SLEEP_MAX)
+
+    def SetTimeout(self, timeout):
+        """
+        Program the chip timer, which ends the next command with TimerIRq when the card does not answer.
+
+        Args:
+            timeout (float): the timeout in milliseconds, in 25 us steps.
+        """
+        reload = self._timer_reload(timeout)
+        if reload != self._reload:
+            self.WriteReg(self.TReloadRegH, reload >> 8)
+            self.WriteReg(self.TReloadRegL, reload & 0xFF)
+            self._reload = reload
+
+    @staticmethod
+    def _timer_reload(timeout):
+        # With TPrescalerReg = 0xA9 the timer ticks every (2 * 169 + 1) / 13.56 MHz = 25 us
+        return min(max(int(timeout * 40), 1), 0xFFFF)
+
+    def SetBitFraming(self, framing):
+        """
+        Set the BitFramingReg value (TxLastBits and RxAlign) of the next transceive.
+
+        The value is written together with StartSend when the command starts, so setting it
+        costs no transfer of its own.
+
+        Args:
+            framing (int): The BitFramingReg value, without StartSend.
+        """
+        self._framing = framing & 0x7F
 
     def SetBitMask(self, reg, mask):
         """
@@ -243,8 +676,8 @@ class MFRC522:
 
         # Check if the least significant two bits are already set
         if (temp & 0x03) != 0x03:
-            # If not, turn on the antenna by setting the bits using a bit mask
-            self.SetBitMask(self.TxControlReg, 0x03)
+            # If not, turn on the antenna by setting the bits on the value already read
+            self.WriteReg(self.TxControlReg, temp | 0x03)
 
     def AntennaOff(self):
         """
@@ -254,80 +687,172 @@ class MFRC522:
         # Clear the least significant two bits of the TxControlReg register to turn off the antenna
         self.ClearBitMask(self.TxControlReg, 0x03)
 
-    def MFRC522_ToCard(self, command, sendData):
+    def MFRC522_ToCard(self, command, sendData, timeout=None, maxLen=None):
         """
         Executes a command on the MFRC522 and communicates with the tag or card.
 
         Args:
             command (int): The command to execute.
-            sendData (list): A list of bytes to send to the tag or card.
+            sendData (list or bytes-like): The bytes to send to the tag or card.
+            timeout (float): The hardware timeout in milliseconds, usually one of `timeouts`
+                (default None, which uses timeouts['default']).
+            maxLen (int): The most bytes of the answer to read from the FIFO, up to FIFO_SIZE
+                (default None, which reads up to MAX_LEN).
 
         Returns:
             tuple: A tuple containing:
                 - status (int): The status of the command execution.
-                - backData (list): A list of bytes received from the tag or card.
+                - backData (bytes): The bytes received from the tag or card.
                 - backLen (int): The length of the backData list.
         """
-        backData = []  # List to store response data
-        backLen = 0  # Length of response data
-        status = self.MI_ERR  # Default status
+        if timeout is None:
+            timeout = self.timeouts['default']
+        if self.metrics is not None:
+            mark = self._metrics_mark()
+
+        (irqEn, waitIRq) = self._start_command(command, sendData, timeout)
+
+        # Wait for command execution. The chip timer (TimerIRq) is the authoritative timeout,
+        # the host-side limit only guards against a chip that stopped responding.
+        (n, timedOut) = self._wait_irq(self.CommIrqReg, waitIRq | 0x01, timeout / 1000.0 + 0.025)
+
+        result = self._finish_command(command, irqEn, n, timedOut, maxLen)
+        if self.metrics is not None:
+            self._record_command(command, sendData, mark, result[0])
+        return result
+
+    def _metrics_mark(self):
+        """
+        Returns the start time and SPI counters of a command, for _record_command.
+        """
+        # The traffic of this reader's transport, as other readers may share the Metrics
+        return (monotonic(), self.transport.transfers, self.transport.bytes)
+
+    def _record_command(self, command, sendData, mark, status):
+        """
+        Records a command completed by MFRC522_ToCard in the metrics.
+
+        Args:
+            command (int): The PCD command.
+            sendData (list): The bytes loaded into the FIFO.
+            mark (tuple): The value of _metrics_mark before the command started.
+            status (int): The status of the command.
+        """
+        metrics = self.metrics
+        if status == self.MI_OK:
+            failure = None
+        elif status == self.MI_NOTAGERR:
+            failure = 'timeout'
+        elif self._last_error is None:
+            failure = 'host_timeout'
+        else:
+            failure = metrics.error_type(self._last_error)
+        name = metrics.command_name(command, sendData, not self._frame_crc[0])
+        metrics.record_command(name, monotonic() - mark[0], self._polls,
+                               self.transport.transfers - mark[1], self.transport.bytes - mark[2], failure)
+
+    def _start_command(self, command, sendData, timeout):
+        """
+        Loads the FIFO and starts a command; the first half of MFRC522_ToCard.
+
+        Args:
+            command (int): The command to execute.
+            sendData (list or bytes-like): The bytes to send to the tag or card.
+            timeout (float): The hardware timeout in milliseconds.
+
+        Returns:
+            tuple: The interrupt enable flags and the interrupt flags that signal completion.
+        """
         irqEn = 0x00  # Interrupt request enable flag
         waitIRq = 0x00  # Wait for interrupt request flag
-        lastBits = None  # Number of valid bits in last byte
-        n = 0  # Number of bytes received
 
         # Set interrupt request and wait flags based on command
         if command == self.PCD_AUTHENT:
-            irqEn = 0x12
+            # The card not answering ends MFAuthent with TimerIRq, which is reported as MI_NOTAGERR
+            irqEn = 0x13
             waitIRq = 0x10
         if command == self.PCD_TRANSCEIVE:
             irqEn = 0x77
             waitIRq = 0x30
+        if command == self.PCD_TRANSMIT:
+            # Transmit ends as soon as the frame is sent (TxIRq)
+            irqEn = 0x41
+            waitIRq = 0x40
+
+        # The whole preamble is one register program: program the timer when the timeout
+        # changes, enable interrupts, clear all pending interrupt flags (Set1 = 0), flush the
+        # FIFO buffer, put the MFRC522 into idle state, load the FIFO, start the command and, for
+        # a transceive, set StartSend with the bit framing. The IRQ and FIFO registers act on the
+        # bits written, and the bit framing is known, so no readback is needed.
+        steps = []
+        reload = self._timer_reload(timeout)
+        if reload != self._reload:
+            steps += [(self.TReloadRegH, reload >> 8), (self.TReloadRegL, reload & 0xFF)]
+        if self.pin_irq is None:
+            steps.append((self.CommIEnReg, irqEn | 0x80))
+        else:
+            # Only the completion and timer interrupts may drive the IRQ pin
+            steps += [(self.DivlEnReg, 0x80), (self.CommIEnReg, waitIRq | 0x81)]
+        steps += [(self.CommIrqReg, 0x7F), (self.FIFOLevelReg, 0x80), (self.CommandReg, self.PCD_IDLE),
+                  (self.FIFODataReg, RegisterProgram.DATA), (self.CommandReg, command)]
+        if command == self.PCD_TRANSCEIVE:
+            steps.append((self.BitFramingReg, self._framing | 0x80))
 
-        # Enable interrupts and reset FIFO buffer
-        self.WriteReg(self.CommIEnReg, irqEn | 0x80)
-        self.ClearBitMask(self.CommIrqReg, 0x80)
-        self.SetBitMask(self.FIFOLevelReg, 0x80)
-
-        # Put MFRC522 into idle state
-        self.WriteReg(self.CommandReg, self.PCD_IDLE)
+        # The command may complete before the program returns, so the edge is cleared first
+        self._irq_event.clear()
+        self._run(steps, sendData)
+        self._reload = reload
 
-        # Write data to FIFO buffer
-        for i in range(len(sendData)):
-            self.WriteReg(self.FIFODataReg, sendData[i])
+        return (irqEn, waitIRq)
 
-        # Start command execution
-        self.WriteReg(self.CommandReg, command)
+    def _finish_command(self, command, irqEn, n, timedOut, maxLen=None):
+        """
+        Checks the outcome of a command and reads the answer; the second half of MFRC522_ToCard.
 
-        # Set bit framing if command is transceive
-        if command == self.PCD_TRANSCEIVE:
-            self.SetBitMask(self.BitFramingReg, 0x80)
+        Args:
+            command (int): The command that was executed.
+            irqEn (int): The interrupt enable flags returned by _start_command.
+            n (int): The last value read from CommIrqReg.
+            timedOut (bool): Whether the host-side time limit was hit.
+            maxLen (int): The most bytes of the answer to read (default None, MAX_LEN).
 
-        # Wait for command execution (timeout)
-        i = 2000
-        while True:
-            n = self.ReadReg(self.CommIrqReg)
-            i -= 1
-            # Break if interrupt request received or timeout
-            if i == 0 or (n & 0x01) or (n & waitIRq):
-                break
-            sleep(0.001)
+        Returns:
+            tuple: The (status, backData, backLen) tuple of MFRC522_ToCard.
+        """
+        backData = b''  # Response data
+        backLen = 0  # Length of response data
+        status = self.MI_ERR  # Default status
+        lastBits = None  # Number of valid bits in last byte
 
-        # Clear bit framing if command is transceive
-        self.ClearBitMask(self.BitFramingReg, 0x80)
+        # Clear StartSend after a transceive, and read the error flags, as one register program.
+        # CRCErr (0x04) can only be raised when RxModeReg RxCRCEn is set. A transceive reads the
+        # FIFO level and the valid bits of the last byte in the same program.
+        steps = []
+        if command == self.PCD_TRANSCEIVE:
+            steps.append((self.BitFramingReg, self._framing))
+        if not timedOut:
+            steps.append((self.ErrorReg, None))
+            if command == self.PCD_TRANSCEIVE:
+                steps += [(self.FIFOLevelReg, None), (self.ControlReg, None)]
+        values = self._run(steps) if steps else []
 
         # Check for errors and update status accordingly
-        if i != 0:
-            if (self.ReadReg(self.ErrorReg) & 0x1B) == 0x00:
-                status = self.MI_OK
+        self._last_error = None
+        if not timedOut:
+            error = values[0] & 0x1F
+            self._last_error = error
+            # A bit collision (CollErr) alone still delivers the bits received before it,
+            # which the anticollision needs
+            if error == 0x00 or (error == 0x08 and command == self.PCD_TRANSCEIVE):
+                status = self.MI_OK if error == 0x00 else self.MI_COLLERR
 
                 if n & irqEn & 0x01:
                     status = self.MI_NOTAGERR
 
                 # Read response data if command is transceive
                 if command == self.PCD_TRANSCEIVE:
-                    n = self.ReadReg(self.FIFOLevelReg)
-                    lastBits = self.ReadReg(self.ControlReg) & 0x07
+                    n = values[1]
+                    lastBits = values[2] & 0x07
                     if lastBits != 0:
                         backLen = (n - 1) * 8 + lastBits
                     else:
@@ -335,11 +860,11 @@ class MFRC522:
 
                     if n == 0:
                         n = 1
-                    if n > self.MAX_LEN:
-                        n = self.MAX_LEN
+                    limit = self.MAX_LEN if maxLen is None else min(maxLen, self.FIFO_SIZE)
+                    if n > limit:
+                        n = limit
 
-                    for i in range(n):
-                        backData.append(self.ReadReg(self.FIFODataReg))
+                    backData = self.ReadFIFO(n)
             else:
                 status = self.MI_ERR
 
@@ -362,15 +887,20 @@ class MFRC522:
         backBits = None
         TagType = []
 
-        # Set the bit framing register to 0x07
-        self.WriteReg(self.BitFramingReg, 0x07)
+        # Short frames carry no CRC; 7 bits of the last byte are sent (TxLastBits = 7)
+        self.SetFrameCRC(False, False)
+        self.SetBitFraming(0x07)
 
         # Append the request mode to the TagType list
         TagType.append(reqMode)
 
         # Send the request to the card using the MFRC522_ToCard method
         (status, backData, backBits) = self.MFRC522_ToCard(
-            self.PCD_TRANSCEIVE, TagType)
+            self.PCD_TRANSCEIVE, TagType, self.timeouts['request'])
+
+        # Cards of different types answer with different ATQAs, which collide; they are still there
+        if status == self.MI_COLLERR:
+            status = self.MI_OK
 
         # If the status is not MI_OK or the back bits are not 0x10, set status to MI_ERR
         if ((status != self.MI_OK) | (backBits != 0x10)):
@@ -389,12 +919,11 @@ class MFRC522:
                 - size (int): The size of the UID in bits.
         """
         backData = []
-        serNumCheck = 0
-
         serNum = []
 
-        # Set the BitFramingReg to 0x00
-        self.WriteReg(self.BitFramingReg, 0x00)
+        # Anticollision frames carry no CRC and end on a byte boundary
+        self.SetFrameCRC(False, False)
+        self.SetBitFraming(0x00)
 
         # Append the PICC_ANTICOLL command and 0x20 to the serNum list
         serNum.append(self.PICC_ANTICOLL)
@@ -402,7 +931,23 @@ class MFRC522:
 
         # Call the MFRC522_ToCard method with PCD_TRANSCEIVE command and serNum data
         (status, backData, backBits) = self.MFRC522_ToCard(
-            self.PCD_TRANSCEIVE, serNum)
+            self.PCD_TRANSCEIVE, serNum, self.timeouts['anticoll'])
+
+        # Return the status and backData
+        return (self._check_anticoll(status, backData), backData)
+
+    def _check_anticoll(self, status, backData):
+        """
+        Checks the answer to an anticollision command.
+
+        Args:
+            status (int): The status returned by MFRC522_ToCard.
+            backData (bytes): The answer of the card.
+
+        Returns:
+            int: The status, MI_ERR if the answer is not 4 UID bytes followed by their BCC.
+        """
+        serNumCheck = 0
 
         # Check if the operation was successful
         if (status == self.MI_OK):
@@ -419,13 +964,14 @@ class MFRC522:
             else:
                 # If backData doesn't have 5 bytes, set the status to MI_ERR
                 status = self.MI_ERR
-
-        # Return the status and backData
-        return (status, backData)
+        return status
 
     def CalulateCRC(self, pIndata):
         """
-        Calculates the CRC value for the given input data using the MFRC522 chip.
+        Calculates the CRC value for the given input data.
+
+        The CRC is computed on the host unless the reader was created with crc='chip',
+        in which case the data is sent through the MFRC522's CRC coprocessor.
 
         Args:
             pIndata (list): A list of integers representing the input data for which to calculate the CRC.
@@ -433,33 +979,150 @@ class MFRC522:
         Returns:
             A list of two integers representing the calculated CRC value.
         """
+        if self.crc_mode != 'chip':
+            return crc_a(pIndata)
 
-        # Clear the CRC IRQ flag and set the FIFO level to maximum.
-        self.ClearBitMask(self.DivIrqReg, 0x04)
-        self.SetBitMask(self.FIFOLevelReg, 0x80)
+        self._start_crc(pIndata)
+
+        # Wait for the CRC calculation to complete.
+        self._wait_irq(self.DivIrqReg, 0x04, 0.025)
+        return self._crc_result()
+
+    def _start_crc(self, pIndata):
+        """
+        Starts the CalcCRC command of the coprocessor on the given data.
+        """
+        # Route only the CRC interrupt to the IRQ pin
+        if self.pin_irq is not None:
+            self.WriteReg(self.CommIEnReg, 0x80)
+            self.WriteReg(self.DivlEnReg, 0x84)
+
+        # Clear the CRC IRQ flag (Set2 = 0) and flush the FIFO buffer.
+        self.WriteReg(self.DivIrqReg, 0x04)
+        self.WriteReg(self.FIFOLevelReg, 0x80)
+        self._irq_event.clear()
 
         # Write the input data to the FIFO.
-        for i in range(len(pIndata)):
-            self.WriteReg(self.FIFODataReg, pIndata[i])
+        self.WriteFIFO(pIndata)
 
         # Start the CRC calculation command.
         self.WriteReg(self.CommandReg, self.PCD_CALCCRC)
 
-        # Wait for the CRC calculation to complete.
-        i = 0xFF
-        while True:
-            n = self.ReadReg(self.DivIrqReg)
-            i -= 1
-            if not ((i != 0) and not (n & 0x04)):
-                break
-            sleep(0.001)
+    def _crc_result(self):
+        """
+        Reads the result of the CalcCRC command.
 
+        Returns:
+            list: The two CRC bytes, least significant first.
+        """
         # Read the calculated CRC value from the chip.
         pOutData = []
         pOutData.append(self.ReadReg(self.CRCResultRegL))
         pOutData.append(self.ReadReg(self.CRCResultRegM))
         return pOutData
 
+    def SetFrameCRC(self, tx, rx):
+        """
+        Enables or disables the chip's CRC generation on transmission and CRC check on reception.
+
+        Only used with crc='frame'; the other modes always leave TxCRCEn and RxCRCEn cleared.
+
+        Args:
+            tx (bool): append CRC_A to transmitted frames (TxModeReg TxCRCEn).
+            rx (bool): check and strip CRC_A from received frames (RxModeReg RxCRCEn).
+        """
+        if self.crc_mode != 'frame' or (tx, rx) == self._frame_crc:
+            return
+        if tx != self._frame_crc[0]:
+            if tx:
+                self.SetBitMask(self.TxModeReg, 0x80)
+            else:
+                self.ClearBitMask(self.TxModeReg, 0x80)
+        if rx != self._frame_crc[1]:
+            if rx:
+                self.SetBitMask(self.RxModeReg, 0x80)
+            else:
+                self.ClearBitMask(self.RxModeReg, 0x80)
+        self._frame_crc = (tx, rx)
+
+    def SetBitRate(self, tx=106, rx=None):
+        """
+        Sets the bit rates of transmission and reception (TxModeReg TxSpeed, RxModeReg RxSpeed).
+
+        ModWidthReg is set for the transmission rate, and the CRC bits of crc='frame' are kept.
+        Cards are woken up and selected at 106 kbit/s; a higher rate is only used after the card
+        agreed to it, see IsoDep.
+
+        Args:
+            tx (int): The transmission bit rate in kbit/s: 106, 212, 424 or 848 (default 106).
+            rx (int): The reception bit rate in kbit/s (default None, the same as tx).
+        """
+        rx = tx if rx is None else rx
+        if tx not in self.BIT_RATES or rx not in self.BIT_RATES:
+            raise ValueError("Invalid bit rate {}/{}".format(tx, rx))
+        if (tx, rx) == self.bit_rate:
+            return
+        (txCRC, rxCRC) = self._frame_crc
+        self.WriteRegs([(self.TxModeReg, (0x80 if txCRC else 0x00) | self.BIT_RATES[tx]),
+                        (self.RxModeReg, (0x80 if rxCRC else 0x00) | self.BIT_RATES[rx]),
+                        (self.ModWidthReg, self.MOD_WIDTHS[tx])])
+        self.bit_rate = (tx, rx)
+
+    def CheckCRC(self, status, backData):
+        """
+        Checks the answer of a TransceiveCRC and strips its CRC_A, unless the chip already did
+        (crc='frame').
+
+        Args:
+            status (int): The status of the transceive.
+            backData (bytes): The answer.
+
+        Returns:
+            bytes: The answer without its CRC, or None if the transceive failed or the CRC is wrong.
+        """
+        if status != self.MI_OK:
+            return None
+        if self.crc_mode == 'frame':
+            return backData
+        if len(backData) < 3 or bytes(crc_a(backData[:-2])) != backData[-2:]:
+            return None
+        return backData[:-2]
+
+    def TransceiveCRC(self, sendData, timeout=None, rxCRC=True, maxLen=None):
+        """
+        Sends a frame protected by CRC_A to the tag or card and receives the answer.
+
+        With crc='frame' the chip appends the CRC and, if rxCRC is set, checks and strips the CRC
+        of the answer, so no CRC bytes cross the SPI bus. Otherwise the CRC is computed with
+        CalulateCRC and appended to the frame, and the answer is returned with its CRC bytes.
+
+        Args:
+            sendData (list or bytes-like): The frame without CRC.
+            timeout (float): The hardware timeout in milliseconds (default None).
+            rxCRC (bool): Whether the answer carries a CRC (False for 4-bit ACK/NAK answers).
+            maxLen (int): The most bytes of the answer to read, see MFRC522_ToCard (default None).
+
+        Returns:
+            tuple: The (status, backData, backLen) tuple of MFRC522_ToCard.
+        """
+        return self.MFRC522_ToCard(self.PCD_TRANSCEIVE, self._crc_frame(sendData, rxCRC), timeout, maxLen)
+
+    def _crc_frame(self, sendData, rxCRC):
+        """
+        Prepares a frame for TransceiveCRC, appending the CRC unless the chip does it.
+
+        Args:
+            sendData (list or bytes-like): The frame without CRC.
+            rxCRC (bool): Whether the answer carries a CRC.
+
+        Returns:
+            list: The bytes to load into the FIFO.
+        """
+        if self.crc_mode == 'frame':
+            self.SetFrameCRC(True, rxCRC)
+            return sendData
+        return bytes(sendData) + bytes(self.CalulateCRC(sendData))
+
     def SelectTag(self, serNum):
         """
         Selects a tag or card for communication.
@@ -482,23 +1145,194 @@ class MFRC522:
         for i in range(5):
             buf.append(serNum[i])
 
-        # Calculate the CRC values for the buffer and add them to the buffer
-        pOut = self.CalulateCRC(buf)
-        buf.append(pOut[0])
-        buf.append(pOut[1])
+        # Send the buffer with its CRC to the tag and receive the response
+        (status, backData, backLen) = self.TransceiveCRC(buf, self.timeouts['select'])
+        return self._check_select(status, backData, backLen)
 
-        # Send the buffer to the tag and receive the response
-        (status, backData, backLen) = self.MFRC522_ToCard(self.PCD_TRANSCEIVE, buf)
+    def _check_select(self, status, backData, backLen):
+        """
+        Checks the answer to a SELECT command.
+
+        Args:
+            status (int): The status returned by MFRC522_ToCard.
+            backData (bytes): The answer of the card.
+            backLen (int): The length of the answer in bits.
 
-        # Check if the response is successful and has the expected length
-        if (status == self.MI_OK) and (backLen == 0x18):
+        Returns:
+            int: The SAK byte, or 0 if the card was not selected.
+        """
+        sak = self._sak(status, backData, backLen)
+        if sak is not None:
             # Log the size of the response and return the first byte of the response
-            self.logger.debug("Size: " + str(backData[0]))
-            return backData[0]
+            self.logger.debug("Size: " + str(sak))
+            return sak
         else:
             # Return 0 if the response is not successful or has an unexpected length
             return 0
 
+    def _sak(self, status, backData, backLen):
+        """
+        Returns the SAK byte of a SELECT answer, or None if the card was not selected.
+        """
+        # Check if the response is successful and has the expected length (SAK, plus CRC unless the chip checked it)
+        if (status == self.MI_OK) and (backLen == (0x08 if self.crc_mode == 'frame' else 0x18)):
+            return backData[0]
+        return None
+
+    def SelectCard(self):
+        """
+        Runs the full ISO 14443-3 anticollision and selects one card; call after Request.
+
+        The anticollision is bit oriented and walks cascade levels 1 to 3. When several cards
+        answer, CollReg gives the first bit in which their UIDs differ, and the loop follows the
+        cards with a 1 in that bit. The other cards stay unselected, so halting the selected card
+        and calling Request again finds the next one.
+
+        Returns:
+            tuple: A tuple containing:
+                - status (int): MI_OK if a card was selected.
+                - uid (list): The UID of the card. Single size UIDs are returned as the 4 bytes
+                  followed by their BCC, like Anticoll does, so their IDs do not change; double and
+                  triple size UIDs as the full 7 or 10 bytes.
+                - sak (int): The final SAK byte.
+        """
+        return self._run_cascade(self._cascade())
+
+    def SelectUID(self, uid):
+        """
+        Selects a card with a known UID, skipping the anticollision; call after Request.
+
+        Args:
+            uid (list): The UID, as returned by SelectCard or Anticoll, or the plain 4, 7 or 10 bytes.
+
+        Returns:
+            tuple: The status and the final SAK byte.
+        """
+        (status, uid, sak) = self._run_cascade(self._cascade(uid))
+        return (status, sak)
+
+    def _run_cascade(self, steps):
+        """
+        Drives the steps of _cascade with synchronous transceives.
+        """
+        answer = None
+        try:
+            while True:
+                (frame, framing) = steps.send(answer)
+                answer = self._cascade_transceive(frame, framing)
+        except StopIteration as stop:
+            return stop.value
+
+    def _cascade_transceive(self, frame, framing):
+        """
+        Sends one frame of the cascade.
+
+        Args:
+            frame (list): The SEL, NVB and UID bytes.
+            framing (int): The BitFramingReg value of an anticollision frame, or None for a SELECT,
+                which is sent with its CRC.
+
+        Returns:
+            tuple: The status, the answer and its length in bits, and CollReg after a collision.
+        """
+        if framing is None:
+            self.SetBitFraming(0x00)
+            (status, backData, backLen) = self.TransceiveCRC(frame, self.timeouts['select'])
+        else:
+            self.SetFrameCRC(False, False)
+            self.SetBitFraming(framing)
+            (status, backData, backLen) = self.MFRC522_ToCard(
+                self.PCD_TRANSCEIVE, frame, self.timeouts['anticoll'])
+        coll = self.ReadReg(self.CollReg) if status == self.MI_COLLERR else 0
+        return (status, backData, backLen, coll)
+
+    def _cascade(self, uid=None):
+        """
+        The anticollision and selection loop, written as a generator so the synchronous and the
+        asyncio readers share it.
+
+        Yields (frame, framing) tuples for _cascade_transceive and receives its answers. Without a
+        UID the anticollision finds one; with a UID each cascade level is selected directly.
+
+        Returns:
+            tuple: (status, uid, sak), see SelectCard.
+        """
+        failed = (self.MI_ERR, None, 0)
+        levels = self._uid_levels(uid) if uid is not None else None
+        found = []
+        for level, sel in enumerate((self.PICC_ANTICOLL, self.PICC_ANTICOLL2, self.PICC_ANTICOLL3)):
+            if levels is not None:
+                field = levels[level] + [levels[level][0] ^ levels[level][1] ^ levels[level][2] ^ levels[level][3]]
+            else:
+                # Bit-oriented anticollision: send the known bits of the level, receive the rest
+                field = [0] * 5
+                known = 0
+                while known < 40:
+                    (nbytes, nbits) = divmod(known, 8)
+                    frame = [sel, 0x20 + (nbytes << 4) + nbits] + field[:nbytes + (1 if nbits else 0)]
+                    # RxAlign puts the first received bit right after the last bit sent
+                    (status, backData, backLen, coll) = yield (frame, (nbits << 4) | nbits)
+                    if status not in (self.MI_OK, self.MI_COLLERR) or not backData:
+                        return failed
+
+                    for i, byte in enumerate(backData[:5 - nbytes]):
+                        if i == 0 and nbits:
+                            mask = (1 << nbits) - 1
+                            byte = (field[nbytes] & mask) | (byte & ~mask & 0xFF)
+                        field[nbytes + i] = byte
+
+                    if status == self.MI_OK:
+                        known = 40
+                    else:
+                        if coll & 0x20:
+                            # CollPosNotValid
+                            return failed
+                        # CollPos (datasheet 9.3.1.15, CollReg) is the position of the first
+                        # collision, 1 for the first bit, 0 for the 32nd. It counts the bits of
+                        # the received bytes as stored in the FIFO, and RxAlign (9.3.1.14,
+                        # BitFramingReg) stores the first received bit at bit nbits of the first
+                        # byte, so the count starts at bit 0 of field[nbytes]
+                        pos = nbytes * 8 + ((coll & 0x1F) or 32)
+                        if pos <= known or pos > 40:
+                            return failed
+                        # Follow the cards with a 1 in the first colliding bit
+                        field[(pos - 1) // 8] |= 1 << ((pos - 1) % 8)
+                        known = pos
+
+                if field[0] ^ field[1] ^ field[2] ^ field[3] != field[4]:
+                    return failed
+
+            (status, backData, backLen, coll) = yield ([sel, 0x70] + field, None)
+            sak = self._sak(status, backData, backLen)
+            if sak is None:
+                return failed
+
+            # The cascade bit of the SAK says the UID continues at the next level
+            if sak & 0x04:
+                if levels is not None and level + 1 >= len(levels):
+                    return failed
+                found += field[1:4]
+                continue
+
+            found += field[0:4]
+            if len(found) == 4:
+                found.append(field[4])
+            return (self.MI_OK, found, sak)
+        return failed
+
+    def _uid_levels(self, uid):
+        """
+        Splits a UID into the 4-byte UID fields of its cascade levels, with the cascade tag 0x88.
+        """
+        uid = list(uid)
+        if len(uid) in (4, 5):
+            return [uid[:4]]
+        if len(uid) == 7:
+            return [[0x88] + uid[:3], uid[3:7]]
+        if len(uid) == 10:
+            return [[0x88] + uid[:3], [0x88] + uid[3:6], uid[6:10]]
+        raise ValueError("Invalid UID length {}".format(len(uid)))
+
     def Authenticate(self, authMode, BlockAddr, Sectorkey, serNum):
         """
         Authenticates a tag or card for a specific block.
@@ -512,6 +1346,19 @@ class MFRC522:
         Returns:
             The status of the authentication.
         """
+        buff = self._auth_frame(authMode, BlockAddr, Sectorkey, serNum)
+
+        # Now we start the authentication itself
+        (status, backData, backLen) = self.MFRC522_ToCard(self.PCD_AUTHENT, buff, self.timeouts['auth'])
+        return self._check_auth(status)
+
+    def _auth_frame(self, authMode, BlockAddr, Sectorkey, serNum):
+        """
+        Builds the FIFO contents of the MFAuthent command.
+
+        Returns:
+            list: The auth mode, block address, key and the first 4 bytes of the UID.
+        """
         buff = []
 
         # First byte should be the authMode (A or B)
@@ -524,18 +1371,31 @@ class MFRC522:
         for i in range(len(Sectorkey)):
             buff.append(Sectorkey[i])
 
-        # Next we append the first 4 bytes of the UID
+        # Next we append 4 bytes of the UID: the first 4 for single size UIDs, the last 4 for
+        # double and triple size UIDs
+        uid4 = serNum[-4:] if len(serNum) in (7, 10) else serNum[:4]
         for i in range(4):
-            buff.append(serNum[i])
+            buff.append(uid4[i])
+        return buff
 
-        # Now we start the authentication itself
-        (status, backData, backLen) = self.MFRC522_ToCard(self.PCD_AUTHENT, buff)
-        
+    def _check_auth(self, status):
+        """
+        Checks the outcome of the MFAuthent command.
+
+        Args:
+            status (int): The status returned by MFRC522_ToCard.
+
+        Returns:
+            int: The status, MI_ERR if Crypto1 was not switched on.
+        """
         # Check if an error occurred
         if not (status == self.MI_OK):
             self.logger.error("AUTH ERROR!!")
         if not (self.ReadReg(self.Status2Reg) & 0x08) != 0:
             self.logger.error("AUTH ERROR(status2reg & 0x08) != 0")
+            status = self.MI_ERR
+        if status != self.MI_OK and self.metrics is not None:
+            self.metrics.record_failure('AUTHENT', 'auth')
 
         # Return the status
         return status
@@ -546,36 +1406,45 @@ class MFRC522:
         """
         self.ClearBitMask(self.Status2Reg, 0x08)
 
-    def ReadTag(self, blockAddr):
+    def ReadTag(self, blockAddr, into=None):
         """
         Reads data from a specific block of a RFID card.
 
         Args:
             blockAddr (int): The block address of the RFID card to read from.
+            into (bytearray or memoryview): a writable buffer of 16 bytes to copy the block into,
+                such as a slice of a larger buffer (default None).
 
         Returns:
-            If the read is successful and the received data is of the correct length, the function returns the received data as a list of 16 bytes. If the read is unsuccessful or the received data is of incorrect length, the function returns None.
+            If the read is successful and the received data is of the correct length, the function returns the received data as 16 bytes, or into when it is given. If the read is unsuccessful or the received data is of incorrect length, the function returns None.
         """
 
         # create an array containing the READ command and the block address to be read
         recvData = []
         recvData.append(self.PICC_READ)
         recvData.append(blockAddr)
-        # calculate the CRC checksum for the command and block address
-        pOut = self.CalulateCRC(recvData)
-        # append the calculated checksum to the command and block address array
-        recvData.append(pOut[0])
-        recvData.append(pOut[1])
-        # send the command and block address array to the RFID card and receive response
-        (status, backData, backLen) = self.MFRC522_ToCard(
-            self.PCD_TRANSCEIVE, recvData)
+        # send the command and block address array with its CRC to the RFID card and receive response
+        (status, backData, backLen) = self.TransceiveCRC(recvData, self.timeouts['read'])
+        block = self._check_read(status, backData, blockAddr)
+        if block is None or into is None:
+            return block
+        into[:16] = block
+        return into
+
+    def _check_read(self, status, backData, blockAddr):
+        """
+        Checks the answer to a READ command.
+
+        Returns:
+            bytes: The 16 bytes of the block, or None.
+        """
         # if response status is not OK, print error message
         if not (status == self.MI_OK):
             self.logger.error("Error while reading!")
 
         # if response data has length 16, print debug message and return data
         if len(backData) == 16:
-            self.logger.debug("Sector " + str(blockAddr) + " " + str(backData))
+            self.logger.debug("Sector %s %s", blockAddr, list(backData))
             return backData
         # if response data length is not 16, return None
         else:
@@ -587,52 +1456,216 @@ class MFRC522:
 
         Args:
             blockAddr (int): The block address where data needs to be written
-            writeData (list): A list of 16 bytes of data to be written to the block
+            writeData (list or bytes-like): The 16 bytes of data to be written to the block; only
+                the first 16 are used
 
         Returns:
-            None
+            int: The status of the write, MI_OK if the card acknowledged both phases.
         """
 
+        buf = writeData[:16]
+        if len(buf) != 16:
+            raise ValueError("A block is written with 16 bytes, got {}".format(len(buf)))
+
         # The buffer to be sent to the tag for writing data
         buff = []
         buff.append(self.PICC_WRITE)
         buff.append(blockAddr)
 
-        # Calculate the CRC checksum for the buffer
-        crc = self.CalulateCRC(buff)
-        buff.append(crc[0])
-        buff.append(crc[1])
-
-        # Send the buffer to the tag and receive the response
-        (status, backData, backLen) = self.MFRC522_ToCard(
-            self.PCD_TRANSCEIVE, buff)
+        # Send the buffer with its CRC to the tag and receive the 4-bit ACK
+        (status, backData, backLen) = self.TransceiveCRC(buff, self.timeouts['write'], rxCRC=False)
 
         # Check if the write operation was successful or not
-        if not (status == self.MI_OK) or not (backLen == 4) or not ((backData[0] & 0x0F) == 0x0A):
-            status = self.MI_ERR
+        status = self._check_ack(status, backData, backLen)
 
         self.logger.debug("%s backdata &0x0F == 0x0A %s" %
-                          (backLen, backData[0] & 0x0F))
+                          (backLen, backData[0] & 0x0F if backData else None))
 
         # If the initial write operation was successful, write the actual data to the tag
         if status == self.MI_OK:
-            buf = []
-            for i in range(16):
-                buf.append(writeData[i])
-            # Calculate the CRC checksum for the data to be written
-            crc = self.CalulateCRC(buf)
-            buf.append(crc[0])
-            buf.append(crc[1])
-            # Send the data buffer to the tag and receive the response
-            (status, backData, backLen) = self.MFRC522_ToCard(
-                self.PCD_TRANSCEIVE, buf)
+            # Send the data buffer with its CRC to the tag and receive the 4-bit ACK
+            (status, backData, backLen) = self.TransceiveCRC(buf, self.timeouts['write'], rxCRC=False)
             # Check if the write operation was successful or not
-            if not (status == self.MI_OK) or not (backLen == 4) or not ((backData[0] & 0x0F) == 0x0A):
+            status = self._check_ack(status, backData, backLen)
+            if status != self.MI_OK:
                 self.logger.error("Error while writing")
             # If the write operation was successful, log it
             if status == self.MI_OK:
                 self.logger.debug("Data written")
 
+        return status
+
+    def _check_ack(self, status, backData, backLen):
+        """
+        Checks for the 4-bit ACK (0x0A) a MIFARE card answers to a write phase.
+
+        Returns:
+            int: The status, MI_ERR unless the card acknowledged.
+        """
+        if not (status == self.MI_OK) or not (backLen == 4) or not ((backData[0] & 0x0F) == 0x0A):
+            return self.MI_ERR
+        return status
+
+    def Increment(self, blockAddr, value):
+        """
+        Adds to the value of a value block; the result is kept in the card's transfer buffer
+        until Transfer stores it.
+
+        Args:
+            blockAddr (int): The value block.
+            value (int): The amount to add, 0 to 2^31 - 1.
+
+        Returns:
+            int: The status of the command.
+        """
+        return self._value_command(self.PICC_INCREMENT, blockAddr, value)
+
+    def Decrement(self, blockAddr, value):
+        """
+        Subtracts from the value of a value block; the result is kept in the card's transfer
+        buffer until Transfer stores it.
+
+        Args:
+            blockAddr (int): The value block.
+            value (int): The amount to subtract, 0 to 2^31 - 1.
+
+        Returns:
+            int: The status of the command.
+        """
+        return self._value_command(self.PICC_DECREMENT, blockAddr, value)
+
+    def Restore(self, blockAddr):
+        """
+        Copies the value of a value block into the card's transfer buffer, so that Transfer can
+        store it in another block of the sector, such as a backup.
+
+        Args:
+            blockAddr (int): The value block.
+
+        Returns:
+            int: The status of the command.
+        """
+        return self._value_command(self.PICC_RESTORE, blockAddr, 0)
+
+    def Transfer(self, blockAddr):
+        """
+        Writes the card's transfer buffer, set by Increment, Decrement or Restore, to a block.
+
+        Args:
+            blockAddr (int): The block to write, in the sector of the value block.
+
+        Returns:
+            int: The status of the write, MI_OK if the card acknowledged.
+        """
+        (status, backData, backLen) = self.TransceiveCRC([self.PICC_TRANSFER, blockAddr],
+                                                         self.timeouts['write'], rxCRC=False)
+        return self._check_ack(status, backData, backLen)
+
+    def _value_command(self, command, blockAddr, value):
+        """
+        Runs the two phases of INCREMENT, DECREMENT or RESTORE: the command, acknowledged by the
+        card, then the 4-byte operand, which the card does not answer unless it fails (NAK).
+
+        Returns:
+            int: The status of the command.
+        """
+        operand = self._value_operand(value)
+        (status, backData, backLen) = self.TransceiveCRC([command, blockAddr], self.timeouts['write'], rxCRC=False)
+        status = self._check_ack(status, backData, backLen)
+        if status != self.MI_OK:
+            return status
+        (status, backData, backLen) = self.TransceiveCRC(operand, self.timeouts['value'], rxCRC=False)
+        return self._check_value(status)
+
+    @staticmethod
+    def _value_operand(value):
+        """
+        Encodes the operand of a value command.
+
+        Returns:
+            bytes: The 4 bytes of the operand, little endian.
+        """
+        if not 0 <= value <= 0x7FFFFFFF:
+            raise ValueError("Invalid value operand {}".format(value))
+        return value.to_bytes(4, 'little')
+
+    def _check_value(self, status):
+        """
+        Checks the second phase of a value command, which the card only answers if it fails.
+
+        Returns:
+            int: The status, MI_OK if the card stayed silent.
+        """
+        # Silence within the timeout means the operation was accepted
+        if status == self.MI_NOTAGERR:
+            return self.MI_OK
+        self.logger.error("Error in value operation")
+        return self.MI_ERR
+
+    @staticmethod
+    def ValueBlock(value, addr):
+        """
+        Builds the 16 bytes of a value block: the value, its complement and the value again,
+        then the address byte, its complement, the byte and its complement.
+
+        Args:
+            value (int): The signed 32-bit value.
+            addr (int): The address byte, usually the block number, kept by Transfer.
+
+        Returns:
+            bytes: The block.
+        """
+        if not -0x80000000 <= value <= 0x7FFFFFFF:
+            raise ValueError("Invalid value {}".format(value))
+        v = value.to_bytes(4, 'little', signed=True)
+        inv = bytes(b ^ 0xFF for b in v)
+        return v + inv + v + bytes([addr & 0xFF, ~addr & 0xFF, addr & 0xFF, ~addr & 0xFF])
+
+    @staticmethod
+    def ParseValueBlock(data):
+        """
+        Decodes a value block.
+
+        Args:
+            data (bytes-like): The 16 bytes of the block.
+
+        Returns:
+            tuple: The value and the address byte, or None if the block is not a valid value block.
+        """
+        if data is None or len(data) != 16:
+            return None
+        b = bytes(data)
+        if b[0:4] != b[8:12] or any(x ^ y != 0xFF for x, y in zip(b[0:4], b[4:8])):
+            return None
+        if b[12] != b[14] or b[13] != b[15] or b[12] ^ b[13] != 0xFF:
+            return None
+        return (int.from_bytes(b[0:4], 'little', signed=True), b[12])
+
+    def HaltTag(self, wait=True):
+        """
+        Puts the selected tag or card into the HALT state.
+
+        A halted card only answers a wake-up request (PICC_REQALL), so it is not picked up again
+        by PICC_REQIDL while it stays in the field. When the card is authenticated, call this
+        before StopCrypto1 so the HALT frame is encrypted.
+
+        Args:
+            wait (bool): Wait out the halt timeout to check that the card did not answer (default
+                True). With False the frame is only transmitted, which saves the timeout.
+
+        Returns:
+            int: MI_OK if the card accepted the command. A card acknowledges HALT by not answering.
+        """
+        buf = [self.PICC_HALT, 0x00]
+        if not wait:
+            (status, backData, backLen) = self.MFRC522_ToCard(
+                self.PCD_TRANSMIT, self._crc_frame(buf, False), self.timeouts['halt'])
+            return status
+        (status, backData, backLen) = self.TransceiveCRC(buf, self.timeouts['halt'])
+        if status == self.MI_NOTAGERR:
+            return self.MI_OK
+        return self.MI_ERR
+
     def Init(self):
         """
         Initializes the MFRC522 RFID reader by resetting it and configuring its registers.
@@ -641,15 +1674,18 @@ class MFRC522:
         # Reset the MFRC522
         self.Reset()
 
-        # Set the timer mode and prescaler
-        self.WriteReg(self.TModeReg, 0x8D)
-        self.WriteReg(self.TPrescalerReg, 0x3E)
-        self.WriteReg(self.TReloadRegL, 30)
-        self.WriteReg(self.TReloadRegH, 0)
-
-        # Enable the auto-timer for transmission and set the mode
-        self.WriteReg(self.TxAutoReg, 0x40)
-        self.WriteReg(self.ModeReg, 0x3D)
-
-        # Turn on the antenna
-        self.AntennaOn()
+        # The configuration is one register program:
+        # start the timer automatically after each transmission (TAuto), with a 25 us tick. The
+        # reload value is programmed per command from the timeout profiles.
+        reload = self._timer_reload(self.timeouts['default'])
+        steps = [(self.TModeReg, 0x80), (self.TPrescalerReg, 0xA9),
+                 (self.TReloadRegH, reload >> 8), (self.TReloadRegL, reload & 0xFF)]
+
+        # Enable the auto-timer for transmission and set the mode, and read the antenna state
+        steps += [(self.TxAutoReg, 0x40), (self.ModeReg, 0x3D), (self.TxControlReg, None)]
+        (txControl,) = self._run(steps)
+        self._reload = reload
+
+        # Turn on the antenna if it is not on yet
+        if (txControl & 0x03) != 0x03:
+            self.WriteReg(self.TxControlReg, txControl | 0x03)
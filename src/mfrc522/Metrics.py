@@ -0,0 +1,214 @@
+import threading
+
+
+class Metrics:
+    """
+    Performance counters of an MFRC522 reader, enabled with MFRC522(metrics=True).
+
+    Every command sent with MFRC522_ToCard is counted under the name of the PICC command it carries
+    (REQA, ANTICOLL, SELECT, READ, ...), or of the PCD command for commands that do not talk to a
+    card (AUTHENT, CALCCRC). For each name the latency histogram, the number of polls of the
+    interrupt request register, the SPI traffic and the failures by type are kept.
+
+    A Metrics instance may be shared by several readers to aggregate them. The SPI traffic of a
+    command is counted by the transport of the reader that sent it, so readers running in
+    parallel do not add their traffic to each other's commands.
+
+    Attributes:
+        LATENCY_BUCKETS (tuple): The upper bounds of the latency histogram buckets, in milliseconds.
+    """
+
+    LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 50, 100)
+
+    PCD_COMMANDS = {
+        0x00: 'IDLE',
+        0x03: 'CALCCRC',
+        0x04: 'TRANSMIT',
+        0x08: 'RECEIVE',
+        0x0C: 'TRANSCEIVE',
+        0x0E: 'AUTHENT',
+        0x0F: 'RESETPHASE',
+    }
+
+    # First byte of a frame: (name, frame length without CRC)
+    PICC_COMMANDS = {
+        0x30: ('READ', 2),
+        0xA0: ('WRITE', 2),
+        0x50: ('HALT', 2),
+        0xC0: ('DECREMENT', 2),
+        0xC1: ('INCREMENT', 2),
+        0xC2: ('RESTORE', 2),
+        0xB0: ('TRANSFER', 2),
+        0xA2: ('WRITE_PAGE', 6),
+        0x3A: ('FAST_READ', 3),
+        0x60: ('GET_VERSION', 1),
+        0xE0: ('RATS', 2),
+        0xD0: ('PPS', 3),
+    }
+
+    # ErrorReg bits
+    ERRORS = (
+        (0x01, 'protocol'),
+        (0x02, 'parity'),
+        (0x04, 'crc'),
+        (0x08, 'collision'),
+        (0x10, 'overflow'),
+    )
+
+    def __init__(self):
+        """
+        Initializes an empty Metrics instance.
+        """
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Clear every counter.
+        """
+        with self._lock:
+            self.spi_transfers = 0
+            self.spi_bytes = 0
+            self._commands = {}
+            self._failures = {}
+
+    def count_transfer(self, nbytes):
+        """
+        Count one SPI transfer.
+
+        Args:
+            nbytes (int): The length of the transfer in bytes, address bytes included.
+        """
+        with self._lock:
+            self.spi_transfers += 1
+            self.spi_bytes += nbytes
+
+    def command_name(self, command, sendData, crc_appended):
+        """
+        Name the command carried by a frame.
+
+        Args:
+            command (int): The PCD command.
+            sendData (list): The bytes loaded into the FIFO.
+            crc_appended (bool): Whether sendData ends with a CRC computed on the host.
+
+        Returns:
+            str: The name of the command.
+        """
+        if command not in (0x04, 0x0C):
+            return self.PCD_COMMANDS.get(command, hex(command))
+        if not sendData:
+            return 'DATA'
+        first = sendData[0]
+        if len(sendData) == 1 and first in (0x26, 0x52):
+            return 'REQA' if first == 0x26 else 'WUPA'
+        if first in (0x93, 0x95, 0x97):
+            return 'SELECT' if sendData[1] == 0x70 else 'ANTICOLL'
+        if first in self.PICC_COMMANDS:
+            (name, length) = self.PICC_COMMANDS[first]
+            if len(sendData) == length + (2 if crc_appended else 0):
+                return name
+        return 'DATA'
+
+    def record_command(self, name, seconds, polls, transfers, nbytes, failure=None):
+        """
+        Record one command.
+
+        Args:
+            name (str): The name of the command.
+            seconds (float): The time from loading the FIFO to reading the answer.
+            polls (int): The number of reads of the interrupt request register.
+            transfers (int): The SPI transfers used.
+            nbytes (int): The SPI bytes used.
+            failure (str): The type of failure, or None if the command succeeded.
+        """
+        ms = seconds * 1000.0
+        with self._lock:
+            entry = self._commands.get(name)
+            if entry is None:
+                entry = self._commands[name] = {
+                    'count': 0,
+                    'polls': 0,
+                    'spi_transfers': 0,
+                    'spi_bytes': 0,
+                    'latency_sum_ms': 0.0,
+                    'latency_max_ms': 0.0,
+                    'histogram': [0] * (len(self.LATENCY_BUCKETS) + 1),
+                    'failures': {},
+                }
+            entry['count'] += 1
+            entry['polls'] += polls
+            entry['spi_transfers'] += transfers
+            entry['spi_bytes'] += nbytes
+            entry['latency_sum_ms'] += ms
+            entry['latency_max_ms'] = max(entry['latency_max_ms'], ms)
+            bucket = 0
+            while bucket < len(self.LATENCY_BUCKETS) and ms > self.LATENCY_BUCKETS[bucket]:
+                bucket += 1
+            entry['histogram'][bucket] += 1
+            if failure is not None:
+                self._count_failure(entry, failure)
+
+    def record_failure(self, name, failure):
+        """
+        Record a failure found after the command completed, such as a rejected authentication.
+
+        Args:
+            name (str): The name of the command.
+            failure (str): The type of failure.
+        """
+        with self._lock:
+            entry = self._commands.get(name)
+            if entry is not None:
+                self._count_failure(entry, failure)
+            else:
+                self._failures[failure] = self._failures.get(failure, 0) + 1
+
+    def error_type(self, error):
+        """
+        Name the first error flagged in ErrorReg.
+
+        Args:
+            error (int): The ErrorReg bits.
+
+        Returns:
+            str: The type of error.
+        """
+        for bit, name in self.ERRORS:
+            if error & bit:
+                return name
+        return 'error'
+
+    def snapshot(self):
+        """
+        Return a copy of the counters.
+
+        Returns:
+            dict: 'spi' with the transfer and byte counts, 'commands' with per-command counts,
+                polls, SPI traffic, latency statistics and histogram (bucket upper bound in ms to
+                count, the last bucket being '+inf') and failures, and 'failures' with the totals by
+                failure type.
+        """
+        with self._lock:
+            labels = [str(b) for b in self.LATENCY_BUCKETS] + ['+inf']
+            commands = {}
+            for name, entry in self._commands.items():
+                commands[name] = {
+                    'count': entry['count'],
+                    'polls': entry['polls'],
+                    'spi_transfers': entry['spi_transfers'],
+                    'spi_bytes': entry['spi_bytes'],
+                    'latency_mean_ms': entry['latency_sum_ms'] / entry['count'],
+                    'latency_max_ms': entry['latency_max_ms'],
+                    'latency_histogram': dict(zip(labels, entry['histogram'])),
+                    'failures': dict(entry['failures']),
+                }
+            return {
+                'spi': {'transfers': self.spi_transfers, 'bytes': self.spi_bytes},
+                'commands': commands,
+                'failures': dict(self._failures),
+            }
+
+    def _count_failure(self, entry, failure):
+        entry['failures'][failure] = entry['failures'].get(failure, 0) + 1
+        self._failures[failure] = self._failures.get(failure, 0) + 1
@@ -0,0 +1,507 @@
+from .Ultralight import Ultralight
+
+
+class NdefRecord:
+    """
+    One record of an NDEF message.
+
+    Attributes:
+        tnf (int): The type name format (TNF_WELL_KNOWN, TNF_MIME, ...).
+        type (bytes): The record type, such as b'U' or b'text/vcard'.
+        id (bytes): The record identifier, often empty.
+        payload (bytes): The payload.
+    """
+
+    # Type name formats
+    TNF_EMPTY = 0x00
+    TNF_WELL_KNOWN = 0x01
+    TNF_MIME = 0x02
+    TNF_ABSOLUTE_URI = 0x03
+    TNF_EXTERNAL = 0x04
+    TNF_UNKNOWN = 0x05
+    TNF_UNCHANGED = 0x06
+
+    # Header flags
+    MB = 0x80
+    ME = 0x40
+    CF = 0x20
+    SR = 0x10
+    IL = 0x08
+
+    # Abbreviations of the URI record type, by identifier code
+    URI_PREFIXES = (
+        '', 'http://www.', 'https://www.', 'http://', 'https://', 'tel:', 'mailto:',
+        'ftp://anonymous:anonymous@', 'ftp://ftp.', 'ftps://', 'sftp://', 'smb://', 'nfs://',
+        'ftp://', 'dav://', 'news:', 'telnet://', 'imap:', 'rtsp://', 'urn:', 'pop:', 'sip:',
+        'sips:', 'tftp:', 'btspp://', 'btl2cap://', 'btgoep://', 'tcpobex://', 'irdaobex://',
+        'file://', 'urn:epc:id:', 'urn:epc:tag:', 'urn:epc:pat:', 'urn:epc:raw:', 'urn:epc:',
+        'urn:nfc:',
+    )
+
+    def __init__(self, tnf, type=b'', payload=b'', id=b''):
+        """
+        Initializes an NdefRecord.
+
+        Args:
+            tnf (int): The type name format.
+            type (bytes): The record type (default empty).
+            payload (bytes): The payload (default empty).
+            id (bytes): The record identifier (default empty).
+        """
+        self.tnf = tnf
+        self.type = bytes(type)
+        self.payload = bytes(payload)
+        self.id = bytes(id)
+
+    @classmethod
+    def from_uri(cls, uri):
+        """
+        Create a URI record, with the longest matching prefix abbreviated.
+
+        Args:
+            uri (str): The URI.
+
+        Returns:
+            NdefRecord: The record.
+        """
+        code = 0
+        for i, prefix in enumerate(cls.URI_PREFIXES):
+            if prefix and uri.startswith(prefix) and len(prefix) > len(cls.URI_PREFIXES[code]):
+                code = i
+        return cls(cls.TNF_WELL_KNOWN, b'U', bytes([code]) + uri[len(cls.URI_PREFIXES[code]):].encode('utf-8'))
+
+    @classmethod
+    def from_text(cls, text, lang='en'):
+        """
+        Create a text record, encoded as UTF-8.
+
+        Args:
+            text (str): The text.
+            lang (str): The IANA language code (default 'en').
+
+        Returns:
+            NdefRecord: The record.
+        """
+        code = lang.encode('ascii')
+        if len(code) > 0x3F:
+            raise ValueError("Invalid language code {}".format(lang))
+        return cls(cls.TNF_WELL_KNOWN, b'T', bytes([len(code)]) + code + text.encode('utf-8'))
+
+    @property
+    def uri(self):
+        """
+        The URI of a URI record, or None for other records.
+        """
+        if self.tnf == self.TNF_ABSOLUTE_URI:
+            return self.type.decode('utf-8')
+        if self.tnf != self.TNF_WELL_KNOWN or self.type != b'U' or not self.payload:
+            return None
+        code = self.payload[0]
+        prefix = self.URI_PREFIXES[code] if code < len(self.URI_PREFIXES) else ''
+        return prefix + self.payload[1:].decode('utf-8')
+
+    @property
+    def text(self):
+        """
+        The text of a text record, or None for other records.
+        """
+        if self.tnf != self.TNF_WELL_KNOWN or self.type != b'T' or not self.payload:
+            return None
+        status = self.payload[0]
+        encoding = 'utf-16' if status & 0x80 else 'utf-8'
+        return self.payload[1 + (status & 0x3F):].decode(encoding)
+
+    @property
+    def lang(self):
+        """
+        The language code of a text record, or None for other records.
+        """
+        if self.tnf != self.TNF_WELL_KNOWN or self.type != b'T' or not self.payload:
+            return None
+        return self.payload[1:1 + (self.payload[0] & 0x3F)].decode('ascii')
+
+    def encode(self, first=True, last=True):
+        """
+        Encode the record.
+
+        Args:
+            first (bool): Set the message begin flag (default True).
+            last (bool): Set the message end flag (default True).
+
+        Returns:
+            bytes: The record.
+        """
+        header = self.tnf & 0x07
+        if first:
+            header |= self.MB
+        if last:
+            header |= self.ME
+        short = len(self.payload) < 0x100
+        if short:
+            header |= self.SR
+        if self.id:
+            header |= self.IL
+        data = bytearray([header, len(self.type)])
+        data += bytes([len(self.payload)]) if short else len(self.payload).to_bytes(4, 'big')
+        if self.id:
+            data.append(len(self.id))
+        return bytes(data) + self.type + self.id + self.payload
+
+    def __repr__(self):
+        return "NdefRecord(tnf={}, type={!r}, payload={!r})".format(self.tnf, self.type, self.payload)
+
+
+class NdefMessage:
+    """
+    An NDEF message, decoded lazily: iterating over it decodes one record header at a time, so
+    looking for the first record of a type does not decode the others.
+
+    Attributes:
+        data (bytes): The encoded message.
+    """
+
+    def __init__(self, data):
+        """
+        Initializes an NdefMessage from its encoding.
+
+        Args:
+            data (bytes-like): The encoded message.
+        """
+        self.data = bytes(data)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a message from records.
+
+        Args:
+            records (list): The NdefRecords.
+
+        Returns:
+            NdefMessage: The message.
+        """
+        records = list(records)
+        return cls(b''.join(record.encode(i == 0, i == len(records) - 1) for i, record in enumerate(records)))
+
+    def __iter__(self):
+        data = self.data
+        pos = 0
+        while pos < len(data):
+            header = data[pos]
+            length_size = 1 if header & NdefRecord.SR else 4
+            id_size = 1 if header & NdefRecord.IL else 0
+            if pos + 2 + length_size + id_size > len(data):
+                raise ValueError("Truncated NDEF record header")
+            type_length = data[pos + 1]
+            pos += 2
+            payload_length = int.from_bytes(data[pos:pos + length_size], 'big')
+            pos += length_size
+            id_length = data[pos] if id_size else 0
+            pos += id_size
+            end = pos + type_length + id_length + payload_length
+            if end > len(data):
+                raise ValueError("Truncated NDEF record")
+            type = data[pos:pos + type_length]
+            pos += type_length
+            id = data[pos:pos + id_length]
+            pos += id_length
+            yield NdefRecord(header & 0x07, type, data[pos:end], id)
+            pos = end
+            if header & NdefRecord.ME:
+                break
+
+    @property
+    def records(self):
+        """
+        All the records of the message, as a list.
+        """
+        return list(self)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return "NdefMessage({!r})".format(self.records)
+
+
+class Ndef:
+    """
+    Reads and writes the NDEF message of a card, fetching only the blocks it spans.
+
+    Two layouts are supported:
+        - Type 2 tags (MIFARE Ultralight, NTAG21x), through an Ultralight: the capability
+          container in page 3 gives the size of the data area, which starts at page 4.
+        - MIFARE Classic cards formatted for NFC, through a Tag of BasicMFRC522.session(): the
+          MIFARE Application Directory (MAD1, sector 0) lists the NDEF sectors (AID 0xE103),
+          whose data blocks make up the data area. Sector 0 is authenticated with mad_key and
+          the NDEF sectors with ndef_key, as key A. A MAD whose CRC does not match reads as a
+          card not formatted for NDEF; its info byte, which points to the card publisher
+          sector, is not used.
+
+    The data area holds TLVs. read() fetches the first block or pages, walks the TLVs up to the
+    NDEF TLV, and then fetches only the blocks up to the end of the message; it stops at a
+    terminator TLV (0xFE) without reading further. write() writes the NDEF TLV and a
+    terminator at the same place and skips the blocks or pages that already hold the new
+    content, so an unchanged message costs no write.
+
+    Attributes:
+        card (Ultralight or Tag): The card.
+        written_blocks (list): The blocks, or pages of a Type 2 tag, the last write() wrote.
+    """
+
+    MAD_KEY = [0xA0, 0xA1, 0xA2, 0xA3, 0xA4, 0xA5]
+    NDEF_KEY = [0xD3, 0xF7, 0xD3, 0xF7, 0xD3, 0xF7]
+    NDEF_AID = 0xE103
+    CC_MAGIC = 0xE1
+
+    # CRC-8 of MAD1: polynomial x^8 + x^4 + x^3 + x^2 + 1, preset 0xC7
+    MAD_CRC_POLY = 0x1D
+    MAD_CRC_PRESET = 0xC7
+
+    # TLV types
+    TLV_NULL = 0x00
+    TLV_NDEF = 0x03
+    TLV_TERMINATOR = 0xFE
+
+    def __init__(self, card, mad_key=MAD_KEY, ndef_key=NDEF_KEY):
+        """
+        Initializes an Ndef.
+
+        Args:
+            card (Ultralight or Tag): A selected Type 2 tag, or a MIFARE Classic card of a session.
+            mad_key (list): Key A of the MAD sector of a MIFARE Classic card (default MAD_KEY, None
+                for the reader's KEY or key ring).
+            ndef_key (list): Key A of the NDEF sectors (default NDEF_KEY, None for the reader's
+                KEY or key ring).
+        """
+        self.card = card
+        self.mad_key = mad_key
+        self.ndef_key = ndef_key
+        self.written_blocks = []
+        self._type2 = isinstance(card, Ultralight)
+        self.MFRC522 = card.reader if self._type2 else card.MFRC522
+        self._units = None  # Blocks or pages of the data area, in order
+        self._data = None
+        self._loaded = 0
+
+    def capacity(self):
+        """
+        Find the size of the data area.
+
+        Returns:
+            int: The size in bytes, or None if the card is not formatted for NDEF or did not answer.
+        """
+        if not self._open():
+            return None
+        return len(self._data)
+
+    def read(self):
+        """
+        Read the NDEF message.
+
+        Returns:
+            NdefMessage: The message, or None if the card holds none or the operation fails.
+        """
+        if not self._open():
+            return None
+        tlv = self._find_tlv()
+        if tlv is None or tlv[0] != self.TLV_NDEF:
+            return None
+        (tlv_type, pos, header, length) = tlv
+        if not self._ensure(pos + header + length):
+            return None
+        return NdefMessage(self._data[pos + header:pos + header + length])
+
+    def write(self, message):
+        """
+        Write an NDEF message, followed by a terminator TLV, in place of the current one.
+
+        Args:
+            message (NdefMessage, list of NdefRecord or bytes-like): The message.
+
+        Returns:
+            int: The status of the writes, MI_OK if all the blocks that changed were written.
+        """
+        if isinstance(message, NdefMessage):
+            message = message.data
+        elif isinstance(message, (list, tuple)):
+            message = NdefMessage.from_records(message).data
+        message = bytes(message)
+
+        self.written_blocks = []
+        formatted = self._open()
+        if formatted is None:
+            return self.MFRC522.MI_ERR
+        if not formatted:
+            raise ValueError("The card is not formatted for NDEF")
+        tlv = self._find_tlv()
+        if tlv is None:
+            return self.MFRC522.MI_ERR
+        pos = tlv[1]
+
+        if len(message) < 0xFF:
+            content = bytes([self.TLV_NDEF, len(message)]) + message
+        else:
+            content = bytes([self.TLV_NDEF, 0xFF]) + len(message).to_bytes(2, 'big') + message
+        content += bytes([self.TLV_TERMINATOR])
+        if pos + len(content) > len(self._data):
+            raise ValueError("The message of {} bytes does not fit in the {} bytes of the card".format(
+                len(message), len(self._data) - pos))
+
+        # The blocks the new content spans are read for the comparison
+        end = pos + len(content)
+        if not self._ensure(end):
+            return self.MFRC522.MI_ERR
+        new = bytearray(self._data)
+        new[pos:end] = content
+        size = self._unit_size()
+        for i in range(pos // size, (end + size - 1) // size):
+            unit = new[i * size:(i + 1) * size]
+            if unit == self._data[i * size:(i + 1) * size]:
+                continue
+            if self._write_unit(i, unit) != self.MFRC522.MI_OK:
+                return self.MFRC522.MI_ERR
+            self._data[i * size:(i + 1) * size] = unit
+            self.written_blocks.append(self._units[i])
+        return self.MFRC522.MI_OK
+
+    def _open(self):
+        """
+        Find the data area, reading the capability container or the MAD once.
+
+        Returns:
+            bool: True if the card is formatted for NDEF, False if not, None if it did not answer.
+        """
+        if self._units is not None:
+            return bool(self._units)
+        if self._type2:
+            return self._open_type2()
+        return self._open_classic()
+
+    def _open_type2(self):
+        card = self.card
+        if card.page_count is None:
+            card.detect()
+        # The capability container and the first pages of the data area, in one read
+        head = card.read_pages(3, 4)
+        if head is None:
+            return None
+        if head[0] != self.CC_MAGIC:
+            self._units = []
+            return False
+        pages = min(head[2] * 8 // 4, card.page_count - 4)
+        self._units = list(range(4, 4 + pages))
+        self._data = bytearray(pages * 4)
+        self._loaded = min(3, pages)
+        self._data[:self._loaded * 4] = head[4:4 + self._loaded * 4]
+        return True
+
+    def _open_classic(self):
+        mad = bytearray(32)
+        for i, block in enumerate((1, 2)):
+            if self._read_block(block, self.mad_key, memoryview(mad)[i * 16:(i + 1) * 16]) is None:
+                return None
+        # MAD1: CRC and info byte, then the AIDs of sectors 1 to 15, little endian. The CRC
+        # covers the info byte and the AIDs
+        if self._mad_crc(mad[1:]) != mad[0]:
+            self._units = []
+            return False
+        units = []
+        for sector in range(1, 16):
+            aid = mad[2 * sector] | (mad[2 * sector + 1] << 8)
+            if aid == self.NDEF_AID:
+                units += range(4 * sector, 4 * sector + 3)
+        self._units = units
+        self._data = bytearray(16 * len(units))
+        return bool(units)
+
+    @classmethod
+    def _mad_crc(cls, data):
+        crc = cls.MAD_CRC_PRESET
+        for byte in data:
+            crc ^= byte
+            for _ in range(8):
+                crc = ((crc << 1) ^ cls.MAD_CRC_POLY) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        return crc
+
+    def _find_tlv(self):
+        """
+        Walk the TLVs up to the NDEF TLV, or the place where one can be written.
+
+        Returns:
+            tuple: (type, position, header length, value length) of the NDEF TLV, or of the
+                terminator or end of the TLVs when there is none; None if the card did not answer.
+        """
+        data = self._data
+        pos = 0
+        while pos < len(data):
+            if not self._ensure(pos + 1):
+                return None
+            tlv_type = data[pos]
+            if tlv_type == self.TLV_NULL:
+                pos += 1
+                continue
+            if tlv_type == self.TLV_TERMINATOR:
+                return (tlv_type, pos, 1, 0)
+            if not self._ensure(pos + 2):
+                return None
+            (header, length) = (2, data[pos + 1])
+            if length == 0xFF:
+                if not self._ensure(pos + 4):
+                    return None
+                (header, length) = (4, int.from_bytes(data[pos + 2:pos + 4], 'big'))
+            if tlv_type == self.TLV_NDEF:
+                return (tlv_type, pos, header, length)
+            pos += header + length
+        return (self.TLV_TERMINATOR, min(pos, len(data)), 0, 0)
+
+    def _unit_size(self):
+        return 4 if self._type2 else 16
+
+    def _ensure(self, end):
+        """
+        Fetch the blocks or pages up to byte end of the data area, if not done yet.
+
+        Returns:
+            bool: False if the card did not answer.
+        """
+        size = self._unit_size()
+        needed = min((end + size - 1) // size, len(self._units))
+        if needed <= self._loaded:
+            return True
+        view = memoryview(self._data)
+        if self._type2:
+            # A READ returns four pages, so fetching fewer saves nothing
+            count = min(max(needed - self._loaded, 4), len(self._units) - self._loaded)
+            into = view[self._loaded * 4:(self._loaded + count) * 4]
+            if self.card.read_pages(self._units[self._loaded], count, into) is None:
+                return False
+            self._loaded += count
+            return True
+        while self._loaded < needed:
+            into = view[self._loaded * 16:(self._loaded + 1) * 16]
+            if self._read_block(self._units[self._loaded], self.ndef_key, into) is None:
+                return False
+            self._loaded += 1
+        return True
+
+    def _read_block(self, block, key, into):
+        if self._auth(block, key) != self.MFRC522.MI_OK:
+            return None
+        return self.card.read_block(block, into)
+
+    def _write_unit(self, i, data):
+        if self._type2:
+            return self.card.write_page(self._units[i], data)
+        if self._auth(self._units[i], self.ndef_key) != self.MFRC522.MI_OK:
+            return self.MFRC522.MI_ERR
+        return self.card.write_block(self._units[i], data)
+
+    def _auth(self, block, key):
+        # Authenticate a MIFARE Classic sector when the blocks move to it. The Tag knows which
+        # sector is authenticated, also when it was authenticated between two calls
+        if self.card._auth == self.card.trailer_block(block):
+            return self.MFRC522.MI_OK
+        if key is None:
+            return self.card.authenticate(block)
+        return self.card.authenticate(block, key, self.MFRC522.PICC_AUTHENT1A)
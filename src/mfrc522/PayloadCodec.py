@@ -0,0 +1,139 @@
+import binascii
+import struct
+import zlib
+
+
+class PayloadCodec:
+    """
+    Encodes text or bytes into a compact, self-describing payload for the data blocks of a card.
+
+    Layout: MAGIC (1 byte), flags (1 byte), the length n of the body (2 bytes, big endian), the
+    body (n bytes) and a CRC-16/CCITT of the header and the uncompressed body (2 bytes, big
+    endian). Text is stored as UTF-8 and comes back as str; bytes come back as bytes. The body
+    is compressed with raw deflate when that makes it shorter. A preset dictionary of strings
+    common in small payloads lets even short ones compress; a card must be read with the
+    dictionary it was written with, which the CRC checks.
+
+    The header tells the length of the payload, so a reader knows from the first block how many
+    blocks to read, and a writer only uses the blocks the payload needs.
+
+    Attributes:
+        compress (bool): Whether bodies are compressed when it saves space.
+        dictionary (bytes): The preset deflate dictionary, or None.
+        level (int): The zlib compression level.
+    """
+
+    MAGIC = 0xE5
+    HEADER = struct.Struct('>BBH')
+    CRC = struct.Struct('>H')
+    HEADER_SIZE = HEADER.size
+    OVERHEAD = HEADER.size + CRC.size
+
+    # Flags
+    TEXT = 0x01
+    DEFLATE = 0x02
+
+    DICTIONARY = (
+        b'0123456789 true false null https://www. http://www. .com/ .org/ .net/ '
+        b'"id": "name": "type": "value": "time": "date": "count": "balance": "user": '
+        b'"email": "phone": "url": "data": {"id": ["'
+    )
+
+    def __init__(self, compress=True, dictionary=DICTIONARY, level=9):
+        """
+        Initializes a PayloadCodec.
+
+        Args:
+            compress (bool): Compress bodies when it saves space (default True).
+            dictionary (bytes): The preset deflate dictionary (default DICTIONARY, None for none).
+            level (int): The zlib compression level, 1 (fastest) to 9 (smallest) (default 9).
+        """
+        self.compress = compress
+        self.dictionary = bytes(dictionary) if dictionary else None
+        self.level = level
+
+    def encode(self, data):
+        """
+        Encode text or bytes.
+
+        Args:
+            data (str or bytes-like): The data.
+
+        Returns:
+            bytes: The payload.
+        """
+        if isinstance(data, str):
+            flags = self.TEXT
+            body = data.encode('utf-8')
+        else:
+            flags = 0
+            body = bytes(data)
+        plain = body
+
+        if self.compress and body:
+            if self.dictionary:
+                compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, 9,
+                                              zlib.Z_DEFAULT_STRATEGY, self.dictionary)
+            else:
+                compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+            packed = compressor.compress(body) + compressor.flush()
+            if len(packed) < len(body):
+                flags |= self.DEFLATE
+                body = packed
+
+        if len(body) > 0xFFFF:
+            raise ValueError("Payload too large: {} bytes".format(len(body)))
+        header = self.HEADER.pack(self.MAGIC, flags, len(body))
+        crc = binascii.crc_hqx(plain, binascii.crc_hqx(header, 0xFFFF))
+        return header + body + self.CRC.pack(crc)
+
+    def encoded_length(self, header):
+        """
+        Read the total length of a payload from its header.
+
+        Args:
+            header (bytes-like): At least the first HEADER_SIZE bytes of the payload.
+
+        Returns:
+            int: The length of the payload, header and CRC included.
+        """
+        if len(header) < self.HEADER_SIZE:
+            raise ValueError("Payload header too short")
+        (magic, flags, length) = self.HEADER.unpack_from(header)
+        if magic != self.MAGIC:
+            raise ValueError("No encoded payload")
+        return length + self.OVERHEAD
+
+    def decode(self, payload):
+        """
+        Decode a payload. Bytes after its end, such as the padding of the last block, are ignored.
+
+        Args:
+            payload (bytes-like): The payload.
+
+        Returns:
+            str or bytes: The data, as str if it was encoded from text.
+        """
+        payload = memoryview(payload).cast('B')
+        length = self.encoded_length(payload)
+        if len(payload) < length:
+            raise ValueError("Payload truncated: {} of {} bytes".format(len(payload), length))
+        flags = payload[1]
+        body = payload[self.HEADER_SIZE:length - self.CRC.size]
+        if flags & self.DEFLATE:
+            if self.dictionary:
+                decompressor = zlib.decompressobj(-15, self.dictionary)
+            else:
+                decompressor = zlib.decompressobj(-15)
+            try:
+                body = decompressor.decompress(body) + decompressor.flush()
+            except zlib.error as error:
+                raise ValueError("Payload does not decompress: {}".format(error))
+
+        # The CRC covers the uncompressed body, so it also catches a wrong dictionary
+        (crc,) = self.CRC.unpack_from(payload, length - self.CRC.size)
+        if binascii.crc_hqx(body, binascii.crc_hqx(payload[:self.HEADER_SIZE], 0xFFFF)) != crc:
+            raise ValueError("Payload CRC mismatch")
+        if flags & self.TEXT:
+            return bytes(body).decode('utf-8')
+        return bytes(body)
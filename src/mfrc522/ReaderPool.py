@@ -0,0 +1,202 @@
+import queue
+import threading
+from collections import OrderedDict
+from time import sleep, monotonic
+from .BasicMFRC522 import BasicMFRC522
+from .MFRC522 import MFRC522
+
+
+class ReaderPool:
+    """
+    A set of MFRC522 readers polled together, for example several readers on CE0/CE1 of SPI0 and SPI1.
+
+    Each reader is wrapped in a BasicMFRC522. The pool polls the readers with an action, by default
+    BasicMFRC522.read_id_no_block, and delivers every non-empty result as an event tagged with the
+    name of the reader.
+
+    In 'round_robin' mode one thread polls the readers in turn. In 'parallel' mode every reader
+    gets a worker thread of its own. Readers on different buses then run concurrently, and readers
+    sharing a bus only take turns for their SPI transfers, which the SPI driver serializes, while
+    their waits for the cards overlap.
+
+    Attributes:
+        readers (OrderedDict): The readers, as BasicMFRC522 instances keyed by name.
+        mode (str): 'round_robin' or 'parallel'.
+    """
+
+    MODES = ('round_robin', 'parallel')
+
+    def __init__(self, readers, mode='round_robin', KEY=[0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF], keyring=None):
+        """
+        Initializes a ReaderPool and the readers it owns.
+
+        Args:
+            readers (list): One entry per reader: a dict of MFRC522 arguments (bus, device, pin_rst,
+                pin_irq, ...) with an optional 'name', an MFRC522, or a BasicMFRC522. Readers are
+                named "bus.device" unless a name is given.
+            mode (str): 'round_robin' or 'parallel' (default 'round_robin').
+            KEY (list): The authentication key of the BasicMFRC522 created for each reader.
+            keyring (KeyRing): The key ring shared by the readers (default None).
+        """
+        if mode not in self.MODES:
+            raise ValueError("Invalid pool mode {}".format(mode))
+        self.mode = mode
+        self.readers = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+        for config in readers:
+            if isinstance(config, BasicMFRC522):
+                reader = config
+                name = None
+            elif isinstance(config, MFRC522):
+                reader = BasicMFRC522(KEY, keyring, reader=config)
+                name = None
+            else:
+                config = dict(config)
+                name = config.pop('name', None)
+                reader = BasicMFRC522(KEY, keyring, **config)
+            if name is None:
+                name = "{}.{}".format(reader.MFRC522.bus, reader.MFRC522.device)
+            if name in self.readers:
+                raise ValueError("Duplicate reader name {}".format(name))
+            self.readers[name] = reader
+            self._stats[name] = {'polls': 0, 'events': 0, 'errors': 0, 'busy': 0.0}
+        self._start = monotonic()
+
+    def close(self):
+        """
+        Close every reader, then release the GPIO pins they used.
+
+        Readers may share a reset pin, so the pins are only released once all readers are closed.
+        """
+        pins = OrderedDict()
+        for reader in self.readers.values():
+            reader.MFRC522.Close(cleanup=False)
+            # Readers may use different GPIO modules, e.g. emulated ones
+            gpio = reader.MFRC522.gpio
+            (module, used) = pins.setdefault(id(gpio), (gpio, []))
+            used += [pin for pin in reader.MFRC522.gpio_pins() if pin not in used]
+        for module, used in pins.values():
+            module.cleanup(used)
+
+    def poll(self, action=None):
+        """
+        Poll every reader once, in order.
+
+        Args:
+            action (callable): Called with the BasicMFRC522 of each reader; a result other than
+                None is an event (default None, which reads the tag ID).
+
+        Returns:
+            list: The events of this pass, as (reader name, result) tuples.
+        """
+        events = []
+        for name in self.readers:
+            result = self._poll_one(name, action)
+            if result is not None:
+                events.append((name, result))
+        return events
+
+    def events(self, action=None, interval=0.0):
+        """
+        Poll the readers continuously and yield their events as one stream.
+
+        In 'parallel' mode the worker threads start with the first iteration and stop when the
+        generator is closed.
+
+        Args:
+            action (callable): The poll action, see poll() (default None, which reads the tag ID).
+            interval (float): Seconds to wait after each pass over the readers (default 0.0).
+
+        Yields:
+            tuple: (reader name, result) for every successful poll.
+        """
+        if self.mode == 'round_robin':
+            while True:
+                for event in self.poll(action):
+                    yield event
+                if interval:
+                    sleep(interval)
+
+        events = queue.Queue()
+        stop = threading.Event()
+        workers = []
+        for name in self.readers:
+            worker = threading.Thread(target=self._worker, args=(name, action, interval, events, stop))
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+        try:
+            while True:
+                yield events.get()
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+    def stats(self):
+        """
+        Return the per-reader throughput since the pool was created or reset_stats() was called.
+
+        Returns:
+            dict: For each reader name, the number of polls, events and errors, the polls and
+                events per second, and the share of the time the reader was busy.
+        """
+        elapsed = max(monotonic() - self._start, 1e-9)
+        with self._lock:
+            return {
+                name: {
+                    'polls': s['polls'],
+                    'events': s['events'],
+                    'errors': s['errors'],
+                    'polls_per_s': s['polls'] / elapsed,
+                    'events_per_s': s['events'] / elapsed,
+                    'busy': s['busy'] / elapsed,
+                }
+                for name, s in self._stats.items()
+            }
+
+    def reset_stats(self):
+        """
+        Reset the throughput counters.
+        """
+        with self._lock:
+            for s in self._stats.values():
+                s.update(polls=0, events=0, errors=0, busy=0.0)
+            self._start = monotonic()
+
+    def _poll_one(self, name, action):
+        """
+        Run the poll action on one reader and count it.
+
+        An exception raised by the action is counted as an error and treated as no event, so a
+        faulty reader does not stop the others.
+        """
+        reader = self.readers[name]
+        start = monotonic()
+        error = False
+        try:
+            result = action(reader) if action is not None else reader.read_id_no_block()
+        except Exception:
+            reader.MFRC522.logger.exception("Reader %s failed", name)
+            result = None
+            error = True
+        with self._lock:
+            s = self._stats[name]
+            s['polls'] += 1
+            s['busy'] += monotonic() - start
+            if error:
+                s['errors'] += 1
+            elif result is not None:
+                s['events'] += 1
+        return result
+
+    def _worker(self, name, action, interval, events, stop):
+        # Poll one reader until the event stream is closed
+        while not stop.is_set():
+            result = self._poll_one(name, action)
+            if result is not None:
+                events.put((name, result))
+            if interval:
+                stop.wait(interval)
@@ -0,0 +1,77 @@
+class RegisterProgram:
+    """
+    A fixed sequence of register accesses, compiled once and run as one batch on the bus.
+
+    Each step is a tuple:
+        (address, value): write value to the register.
+        (address, None): read the register; the values read are returned by run, in order.
+        (address, RegisterProgram.DATA): write the bytes passed to run to the register, such as
+            FIFODataReg. A program has at most one such step; it is skipped when the data is empty.
+
+    Transports turn a program into the cheapest form their bus allows and keep the result, so
+    the frames are built once per program rather than on every run: SpiTransport sends all the
+    transfers of a program with one SPI_IOC_MESSAGE ioctl, UartTransport with one write and one
+    read, and I2cTransport as one combined transaction. Programs are not changed after they are
+    created and may be shared between readers.
+
+    Attributes:
+        steps (tuple): The steps of the program.
+        reads (int): The number of values the program reads.
+        writes (tuple): The (address, value) pairs the program writes, in order.
+        data_addr (int): The register of the data step, or None.
+    """
+
+    DATA = object()
+
+    def __init__(self, steps):
+        """
+        Initializes a RegisterProgram.
+
+        Args:
+            steps (list): The steps, as described above.
+        """
+        self.steps = tuple(tuple(step) for step in steps)
+        if sum(1 for addr, val in self.steps if val is self.DATA) > 1:
+            raise ValueError("A register program takes at most one data step")
+        for addr, val in self.steps:
+            if not (val is None or val is self.DATA or 0 <= val <= 0xFF):
+                raise ValueError("Invalid value {} for register {:#x}".format(val, addr))
+        self.reads = sum(1 for addr, val in self.steps if val is None)
+        self.writes = tuple((addr, val) for addr, val in self.steps
+                            if val is not None and val is not self.DATA)
+        self.data_addr = next((addr for addr, val in self.steps if val is self.DATA), None)
+
+    def groups(self, data=None):
+        """
+        Split the program into runs of steps of the same kind, for transports that batch them.
+
+        Args:
+            data (list): The bytes of the data step (default None).
+
+        Returns:
+            list: ('write', pairs), ('read', addresses) and ('data', address, bytes) tuples.
+        """
+        groups = []
+        for addr, val in self.steps:
+            if val is self.DATA:
+                if data:
+                    groups.append(('data', addr, data))
+                continue
+            kind = 'read' if val is None else 'write'
+            if not groups or groups[-1][0] != kind:
+                groups.append((kind, []))
+            groups[-1][1].append(addr if val is None else (addr, val))
+        return groups
+
+    def run(self, transport, data=None):
+        """
+        Run the program on a transport.
+
+        Args:
+            transport (Transport): The bus to run on.
+            data (list): The bytes of the data step (default None).
+
+        Returns:
+            list: The values read.
+        """
+        return transport.run_program(self, data)
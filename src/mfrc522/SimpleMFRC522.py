@@ -13,14 +13,18 @@ class SimpleMFRC522:
         BLOCK_ADDRS (list): The list of block addresses used for reading and writing data.
     """
 
-    def __init__(self):
+    def __init__(self, reader=None, **kwargs):
         """
         Initializes a SimpleMFRC522 instance.
+
+        Args:
+            reader (MFRC522): The reader to use (default None, which creates one).
+            **kwargs: The arguments of MFRC522 (bus, device, pin_rst, pin_irq, ...) when no reader is given.
         """
         
         self.KEY = [0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF]
         self.TRAILER_BLOCK = 11
-        self.BasicMFRC522 = BasicMFRC522()
+        self.BasicMFRC522 = BasicMFRC522(self.KEY, reader=reader, **kwargs)
         self.MFRC522 = self.BasicMFRC522.MFRC522
         
     def close(self):
@@ -0,0 +1,239 @@
+class Tag:
+    """
+    A MIFARE Classic card kept selected by BasicMFRC522.session().
+
+    Reads and writes authenticate the sector of the block on demand and reuse the
+    authentication while the following blocks stay in the same sector.
+
+    Attributes:
+        uid (list): The UID of the card, as returned by SelectCard.
+        id (int): The UID as an integer.
+        sak (int): The SAK byte returned when the card was selected.
+    """
+
+    def __init__(self, reader, uid, sak):
+        """
+        Initializes a Tag for a card that was just selected.
+
+        Args:
+            reader (BasicMFRC522): The reader the card was selected with.
+            uid (list): The UID of the card, as returned by SelectCard.
+            sak (int): The SAK byte returned by SelectTag.
+        """
+        self.reader = reader
+        self.MFRC522 = reader.MFRC522
+        self.uid = uid
+        self.id = reader._uid_to_num(uid)
+        self.sak = sak
+        self._auth = None  # Trailer block of the authenticated sector
+
+    def authenticate(self, block_addr, key=None, auth_mode=None):
+        """
+        Authenticate the sector containing a block.
+
+        Without a key and auth mode the reader's KEY, or its key ring, is used.
+
+        Args:
+            block_addr (int): Any block of the sector to authenticate.
+            key (list): The key to use (default None, which uses the reader's KEY).
+            auth_mode (int): PICC_AUTHENT1A or PICC_AUTHENT1B (default None, which uses key A).
+
+        Returns:
+            int: The status of the authentication.
+        """
+        trailer_block = self.trailer_block(block_addr)
+        if key is None and auth_mode is None:
+            status = self.reader._authenticate(self.uid, trailer_block)
+        else:
+            if key is None:
+                key = self.reader.KEY
+            if auth_mode is None:
+                auth_mode = self.MFRC522.PICC_AUTHENT1A
+            status = self.MFRC522.Authenticate(auth_mode, trailer_block, key, self.uid)
+
+        if status == self.MFRC522.MI_OK:
+            self._auth = trailer_block
+        else:
+            # A failed authentication sends the card back to IDLE, select it again
+            self._auth = None
+            self.reader._reselect(self.uid)
+        return status
+
+    def read_block(self, block_addr, into=None):
+        """
+        Read one block, authenticating its sector first if needed.
+
+        Args:
+            block_addr (int): The block number to read.
+            into (bytearray or memoryview): A writable buffer of 16 bytes to read into (default None).
+
+        Returns:
+            bytes: The 16 bytes of the block, into when it is given, or None if the operation fails.
+        """
+        if self._ensure_auth(block_addr) != self.MFRC522.MI_OK:
+            return None
+        return self.MFRC522.ReadTag(block_addr, into)
+
+    def write_block(self, block_addr, data):
+        """
+        Write one block, authenticating its sector first if needed.
+
+        Args:
+            block_addr (int): The block number to write.
+            data (list or bytes-like): The 16 bytes to write.
+
+        Returns:
+            int: The status of the write.
+        """
+        if self._ensure_auth(block_addr) != self.MFRC522.MI_OK:
+            return self.MFRC522.MI_ERR
+        return self.MFRC522.WriteTag(block_addr, data)
+
+    def read_value(self, block_addr):
+        """
+        Read a value block.
+
+        Args:
+            block_addr (int): The value block.
+
+        Returns:
+            int: The value, or None if the read fails or the block is not a value block.
+        """
+        parsed = self.MFRC522.ParseValueBlock(self.read_block(block_addr))
+        return parsed[0] if parsed is not None else None
+
+    def write_value(self, block_addr, value):
+        """
+        Format a block as a value block holding a value.
+
+        Args:
+            block_addr (int): The block.
+            value (int): The signed 32-bit value.
+
+        Returns:
+            int: The status of the write.
+        """
+        return self.write_block(block_addr, self.MFRC522.ValueBlock(value, block_addr))
+
+    def increment(self, block_addr, value):
+        """
+        INCREMENT a value block into the transfer buffer, see MFRC522.Increment.
+
+        Returns:
+            int: The status of the command.
+        """
+        if self._ensure_auth(block_addr) != self.MFRC522.MI_OK:
+            return self.MFRC522.MI_ERR
+        return self.MFRC522.Increment(block_addr, value)
+
+    def decrement(self, block_addr, value):
+        """
+        DECREMENT a value block into the transfer buffer, see MFRC522.Decrement.
+
+        Returns:
+            int: The status of the command.
+        """
+        if self._ensure_auth(block_addr) != self.MFRC522.MI_OK:
+            return self.MFRC522.MI_ERR
+        return self.MFRC522.Decrement(block_addr, value)
+
+    def restore(self, block_addr):
+        """
+        RESTORE a value block into the transfer buffer, see MFRC522.Restore.
+
+        Returns:
+            int: The status of the command.
+        """
+        if self._ensure_auth(block_addr) != self.MFRC522.MI_OK:
+            return self.MFRC522.MI_ERR
+        return self.MFRC522.Restore(block_addr)
+
+    def transfer(self, block_addr):
+        """
+        TRANSFER the transfer buffer to a block, see MFRC522.Transfer.
+
+        Returns:
+            int: The status of the write.
+        """
+        if self._ensure_auth(block_addr) != self.MFRC522.MI_OK:
+            return self.MFRC522.MI_ERR
+        return self.MFRC522.Transfer(block_addr)
+
+    def adjust_value(self, block_addr, delta, transfer_block=None):
+        """
+        Add to or subtract from a value block on the card, with one value command and one
+        TRANSFER.
+
+        Each value command starts again from the block, not from the transfer buffer, so
+        several adjustments are added up first and applied as one INCREMENT or DECREMENT.
+
+        Args:
+            block_addr (int): The value block.
+            delta (int or list): The amount to add, negative to subtract, or a list of amounts.
+            transfer_block (int): The block of the sector that receives the result (default None,
+                the value block itself). With a delta of 0 this copies the value, such as to a
+                backup block.
+
+        Returns:
+            int: The status of the operation.
+        """
+        plan = self._value_plan(block_addr, delta, transfer_block)
+        if plan is None:
+            return self.MFRC522.MI_OK
+        (command, args, target) = plan
+        status = getattr(self, command)(block_addr, *args)
+        if status != self.MFRC522.MI_OK:
+            return status
+        return self.transfer(target)
+
+    @staticmethod
+    def _value_plan(block_addr, delta, transfer_block):
+        """
+        Plan the value command of adjust_value.
+
+        Returns:
+            tuple: The name of the method to run on the value block, its extra arguments and the
+                block to transfer to, or None if there is nothing to do.
+        """
+        if not isinstance(delta, int):
+            delta = sum(delta)
+        target = block_addr if transfer_block is None else transfer_block
+        if delta == 0 and target == block_addr:
+            return None
+        if delta > 0:
+            return ('increment', (delta,), target)
+        if delta < 0:
+            return ('decrement', (-delta,), target)
+        return ('restore', (), target)
+
+    def release(self, halt=True):
+        """
+        End the session with the card.
+
+        Args:
+            halt (bool): Put the card into the HALT state so it is not selected again while it stays in the field.
+        """
+        if halt:
+            self.MFRC522.HaltTag()
+        self.MFRC522.StopCrypto1()
+        self._auth = None
+
+    def trailer_block(self, block_addr):
+        """
+        Return the trailer block of the sector containing a block.
+
+        Args:
+            block_addr (int): The block number.
+
+        Returns:
+            int: The block number of the sector trailer.
+        """
+        # 4K cards use 16-block sectors above block 127
+        if block_addr < 128:
+            return block_addr - block_addr % 4 + 3
+        return block_addr - (block_addr - 128) % 16 + 15
+
+    def _ensure_auth(self, block_addr):
+        if self._auth == self.trailer_block(block_addr):
+            return self.MFRC522.MI_OK
+        return self.authenticate(block_addr)
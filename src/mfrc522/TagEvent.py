@@ -0,0 +1,37 @@
+class TagEvent:
+    """
+    A change in the card present on a reader, as yielded by BasicMFRC522.watch().
+
+    Attributes:
+        uid (list): The UID of the card, as returned by SelectCard.
+        id (int): The UID as an integer.
+        time (float): The time.monotonic() timestamp of the event.
+    """
+
+    def __init__(self, uid, id, time):
+        """
+        Initializes a TagEvent.
+
+        Args:
+            uid (list): The UID of the card, as returned by SelectCard.
+            id (int): The UID as an integer.
+            time (float): The time.monotonic() timestamp of the event.
+        """
+        self.uid = uid
+        self.id = id
+        self.time = time
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, self.id)
+
+
+class TagArrived(TagEvent):
+    """
+    A card was placed on the reader.
+    """
+
+
+class TagDeparted(TagEvent):
+    """
+    The card was removed from the reader.
+    """
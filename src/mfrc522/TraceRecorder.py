@@ -0,0 +1,96 @@
+import struct
+import time
+
+
+class TraceRecorder:
+    """
+    Records every SPI transfer of a reader into a compact binary trace file.
+
+    The recorder wraps an object with the spidev.SpiDev API and is used in its place, usually
+    through MFRC522(trace=...). Records are packed into a buffer that is written out every
+    FLUSH_SIZE bytes and on close(), so recording costs one struct.pack per transfer.
+
+    File format: MAGIC, then a header with the format version (uint8) and the time.time() of
+    the start of the recording (float64). Each transfer follows as a record: the microseconds
+    since the previous transfer (uint32) and the length n of the transfer (uint16), the n bytes
+    sent, and for reads (address byte with bit 7 set) the n - 1 bytes received after the
+    address byte. Integers are little endian. TraceReplay reads the file back.
+
+    Attributes:
+        spi (object): The wrapped SPI device.
+        count (int): The number of transfers recorded.
+    """
+
+    MAGIC = b'MFRC522TRACE'
+    VERSION = 1
+    HEADER = struct.Struct('<Bd')
+    RECORD = struct.Struct('<IH')
+    FLUSH_SIZE = 65536
+
+    def __init__(self, spi, file):
+        """
+        Initializes a TraceRecorder and writes the header of the trace.
+
+        Args:
+            spi (object): The SPI device to wrap.
+            file (str or file): A path or a binary file object to write the trace to. A file
+                opened from a path is closed with the recorder.
+        """
+        self.spi = spi
+        self._own_file = isinstance(file, str)
+        self._file = open(file, 'wb') if self._own_file else file
+        self._buffer = bytearray(self.MAGIC)
+        self._buffer += self.HEADER.pack(self.VERSION, time.time())
+        self._last = time.perf_counter()
+        self.count = 0
+
+    @property
+    def max_speed_hz(self):
+        return self.spi.max_speed_hz
+
+    @max_speed_hz.setter
+    def max_speed_hz(self, value):
+        self.spi.max_speed_hz = value
+
+    def open(self, bus, device):
+        self.spi.open(bus, device)
+
+    def xfer2(self, data, *args):
+        """
+        Run a transfer on the wrapped device and record it.
+        """
+        data = list(data)
+        back = self.spi.xfer2(data, *args)
+        now = time.perf_counter()
+        delta = min(int((now - self._last) * 1e6), 0xFFFFFFFF)
+        self._last = now
+
+        buffer = self._buffer
+        buffer += self.RECORD.pack(delta, len(data))
+        buffer += bytes(data)
+        if data and data[0] & 0x80:
+            buffer += bytes(back[1:])
+        self.count += 1
+        if len(buffer) >= self.FLUSH_SIZE:
+            self.flush()
+        return back
+
+    xfer = xfer2
+
+    def flush(self):
+        """
+        Write the buffered records to the trace file.
+        """
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+            self._file.flush()
+
+    def close(self):
+        """
+        Close the wrapped device and finish the trace file.
+        """
+        self.spi.close()
+        self.flush()
+        if self._own_file:
+            self._file.close()
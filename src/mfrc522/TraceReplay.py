@@ -0,0 +1,184 @@
+import argparse
+import sys
+import time
+from .Emulator import EmulatedGPIO
+from .MFRC522 import MFRC522
+from .TraceRecorder import TraceRecorder
+
+
+class TraceReplay:
+    """
+    Feeds a trace written by TraceRecorder back to a reader, in place of spidev.SpiDev.
+
+    Each transfer of the reader is checked against the next record of the trace and answered
+    with the bytes the chip sent back when the trace was recorded. Given the same answers the
+    library takes the same decisions, so a session captured on a field reader runs again
+    identically on a workstation, where it can be profiled or kept as a regression test. A
+    reader that sends something else than the trace raises ValueError at the first difference.
+
+    With realtime=True every transfer is delayed until its recorded time, which reproduces the
+    recorded timing; otherwise the trace is replayed as fast as the host runs. An IRQ pin is not
+    replayed: create the replay reader without pin_irq.
+
+    Attributes:
+        records (list): The transfers, as (seconds since the start, bytes sent, bytes received).
+        started (float): The time.time() at which the recording started.
+        position (int): The number of transfers replayed.
+        clock (float): The recorded time of the last transfer replayed, in seconds.
+    """
+
+    def __init__(self, file, realtime=False, strict=True):
+        """
+        Initializes a TraceReplay.
+
+        Args:
+            file (str or file): A path or a binary file object to read the trace from.
+            realtime (bool): Replay the transfers at their recorded times (default False).
+            strict (bool): Check every transfer against the trace (default True). When False, the
+                recorded answers are returned in order whatever the reader sends.
+        """
+        (self.started, self.records) = self.load(file)
+        self.realtime = realtime
+        self.strict = strict
+        self.max_speed_hz = 1000000
+        self.mode = 0
+        self.position = 0
+        self.clock = 0.0
+        self._start = None
+
+    @staticmethod
+    def load(file):
+        """
+        Read a trace file.
+
+        Args:
+            file (str or file): A path or a binary file object.
+
+        Returns:
+            tuple: The time.time() of the start of the recording and the list of records.
+        """
+        if isinstance(file, str):
+            with open(file, 'rb') as f:
+                data = f.read()
+        else:
+            data = file.read()
+
+        magic = TraceRecorder.MAGIC
+        if data[:len(magic)] != magic:
+            raise ValueError("Not an MFRC522 trace")
+        offset = len(magic)
+        (version, started) = TraceRecorder.HEADER.unpack_from(data, offset)
+        if version != TraceRecorder.VERSION:
+            raise ValueError("Unsupported trace version {}".format(version))
+        offset += TraceRecorder.HEADER.size
+
+        record = TraceRecorder.RECORD
+        records = []
+        clock = 0.0
+        while offset < len(data):
+            if offset + record.size > len(data):
+                raise ValueError("Truncated trace record at byte {}".format(offset))
+            (delta, length) = record.unpack_from(data, offset)
+            offset += record.size
+            sent = list(data[offset:offset + length])
+            offset += length
+            if sent and sent[0] & 0x80:
+                back = [0] + list(data[offset:offset + length - 1])
+                offset += length - 1
+            else:
+                back = [0] * length
+            if offset > len(data):
+                raise ValueError("Truncated trace record at byte {}".format(offset))
+            clock += delta / 1e6
+            records.append((clock, sent, back))
+        return started, records
+
+    def reader(self, **kwargs):
+        """
+        Create an MFRC522 replaying the trace, with GPIO pins wired to nothing.
+
+        Args:
+            **kwargs: The arguments of MFRC522 used for the recording, other than spi and gpio.
+
+        Returns:
+            MFRC522: The reader.
+        """
+        return MFRC522(spi=self, gpio=EmulatedGPIO(None), **kwargs)
+
+    @property
+    def remaining(self):
+        """
+        int: The number of transfers left in the trace.
+        """
+        return len(self.records) - self.position
+
+    # spidev.SpiDev API
+
+    def open(self, bus, device):
+        pass
+
+    def close(self):
+        pass
+
+    def xfer2(self, data, *args):
+        if self.position >= len(self.records):
+            raise ValueError("The trace ended after {} transfers".format(len(self.records)))
+        (clock, sent, back) = self.records[self.position]
+        data = list(data)
+        if self.strict and data != sent:
+            raise ValueError("Transfer {} differs from the trace: sent {}, recorded {}".format(
+                self.position, _hex(data), _hex(sent)))
+
+        if self.realtime:
+            now = time.perf_counter()
+            if self._start is None:
+                self._start = now - clock
+            wait = self._start + clock - now
+            if wait > 0:
+                time.sleep(wait)
+        self.position += 1
+        self.clock = clock
+        return list(back)
+
+    xfer = xfer2
+
+    def dump(self, file=None):
+        """
+        Print the trace with the register names, one transfer per line.
+
+        Args:
+            file (file): The text stream to print to (default None, standard output).
+        """
+        file = file or sys.stdout
+        names = {}
+        for name, value in vars(MFRC522).items():
+            if 'Reg' in name and isinstance(value, int):
+                names[value] = name
+        for clock, sent, back in self.records:
+            if not sent:
+                continue
+            reg = names.get((sent[0] >> 1) & 0x3F, hex(sent[0]))
+            if sent[0] & 0x80:
+                print("{:12.6f} R {:<16}{}".format(clock, reg, _hex(back[1:])), file=file)
+            else:
+                print("{:12.6f} W {:<16}{}".format(clock, reg, _hex(sent[1:])), file=file)
+
+
+def _hex(data):
+    return ' '.join('{:02X}'.format(b) for b in data)
+
+
+def main(argv=None):
+    """
+    Command line entry point: `python -m mfrc522.TraceReplay trace.bin` prints a trace.
+    """
+    parser = argparse.ArgumentParser(prog='python -m mfrc522.TraceReplay',
+                                     description='Print an MFRC522 SPI trace.')
+    parser.add_argument('trace', help='trace file written by TraceRecorder')
+    args = parser.parse_args(argv)
+    replay = TraceReplay(args.trace)
+    replay.dump()
+
+
+if __name__ == '__main__':
+    main()
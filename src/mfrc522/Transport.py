@@ -0,0 +1,439 @@
+import ctypes
+
+# fcntl is only needed to send register programs with one ioctl, on Linux
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class Transport:
+    """
+    The host interface an MFRC522 is reached through: SPI, UART or I2C.
+
+    A transport moves register values and leaves their meaning to MFRC522. The batch methods
+    write or read several registers in as few bus transactions as the interface allows; the
+    defaults here fall back to one transaction per register.
+
+    Attributes:
+        metrics (Metrics): Counts the bus transactions and bytes when set, see MFRC522(metrics=...).
+        transfers (int): The bus transactions of this transport counted while metrics is set.
+        bytes (int): The bytes of those transactions.
+    """
+
+    metrics = None
+    transfers = 0
+    bytes = 0
+
+    def write_reg(self, addr, val):
+        """
+        Write one register.
+
+        Args:
+            addr (int): The register address.
+            val (int): The value to write.
+        """
+        raise NotImplementedError
+
+    def read_reg(self, addr):
+        """
+        Read one register.
+
+        Args:
+            addr (int): The register address.
+
+        Returns:
+            int: The value read.
+        """
+        raise NotImplementedError
+
+    def write_regs(self, pairs):
+        """
+        Write several registers, in order.
+
+        Args:
+            pairs (list): (address, value) tuples.
+        """
+        for addr, val in pairs:
+            self.write_reg(addr, val)
+
+    def read_regs(self, addrs):
+        """
+        Read several registers, in order.
+
+        Args:
+            addrs (list): The register addresses.
+
+        Returns:
+            list: The values read.
+        """
+        return [self.read_reg(addr) for addr in addrs]
+
+    def write_fifo(self, addr, data):
+        """
+        Write a sequence of bytes to one register, such as FIFODataReg.
+
+        Args:
+            addr (int): The register address.
+            data (list): The bytes to write.
+        """
+        self.write_regs([(addr, b) for b in data])
+
+    def read_fifo(self, addr, count):
+        """
+        Read a number of bytes from one register, such as FIFODataReg.
+
+        Args:
+            addr (int): The register address.
+            count (int): The number of bytes to read.
+
+        Returns:
+            list: The bytes read.
+        """
+        return self.read_regs([addr] * count)
+
+    def read_fifo_into(self, addr, buffer):
+        """
+        Read bytes from one register, such as FIFODataReg, into a writable buffer.
+
+        Args:
+            addr (int): The register address.
+            buffer (bytearray or memoryview): The buffer to fill; its length is the number of
+                bytes read.
+        """
+        if len(buffer):
+            buffer[:] = bytes(self.read_fifo(addr, len(buffer)))
+
+    def run_program(self, program, data=None):
+        """
+        Run a RegisterProgram. The default runs each group of writes, reads or data as a batch.
+
+        Args:
+            program (RegisterProgram): The program.
+            data (list): The bytes of the data step of the program (default None).
+
+        Returns:
+            list: The values read by the program.
+        """
+        values = []
+        for group in program.groups(data):
+            if group[0] == 'write':
+                self.write_regs(group[1])
+            elif group[0] == 'read':
+                values += self.read_regs(group[1])
+            else:
+                self.write_fifo(group[1], group[2])
+        return values
+
+    def soft_reset(self, addr, command):
+        """
+        Write the SoftReset command and restore the interface settings the reset clears.
+
+        Args:
+            addr (int): The address of CommandReg.
+            command (int): The SoftReset command.
+        """
+        self.write_reg(addr, command)
+
+    def close(self):
+        """
+        Release the bus.
+        """
+
+    def _count(self, nbytes):
+        # Counted here for this transport's own commands, and in metrics, which readers may share
+        if self.metrics is not None:
+            self.transfers += 1
+            self.bytes += nbytes
+            self.metrics.count_transfer(nbytes)
+
+
+class _SpiIocTransfer(ctypes.Structure):
+    # struct spi_ioc_transfer of linux/spi/spidev.h
+    _fields_ = [
+        ('tx_buf', ctypes.c_uint64),
+        ('rx_buf', ctypes.c_uint64),
+        ('len', ctypes.c_uint32),
+        ('speed_hz', ctypes.c_uint32),
+        ('delay_usecs', ctypes.c_uint16),
+        ('bits_per_word', ctypes.c_uint8),
+        ('cs_change', ctypes.c_uint8),
+        ('tx_nbits', ctypes.c_uint8),
+        ('rx_nbits', ctypes.c_uint8),
+        ('word_delay_usecs', ctypes.c_uint8),
+        ('pad', ctypes.c_uint8),
+    ]
+
+
+def _spi_ioc_message(count):
+    # _IOW(SPI_IOC_MAGIC, 0, char[SPI_MSGSIZE(count)])
+    return (1 << 30) | ((count * ctypes.sizeof(_SpiIocTransfer)) << 16) | (ord('k') << 8)
+
+
+class SpiTransport(Transport):
+    """
+    The SPI interface, over an object with the spidev.SpiDev API.
+
+    Each transaction is one xfer2 call. The address byte is (address << 1) with bit 7 set for a
+    read. The chip writes every byte after the address byte to the same register, and answers a
+    read transfer with one register value per address byte, so bursts to the FIFO and reads of
+    several registers each take one transfer; writes to different registers take one each.
+
+    FIFO reads into a buffer (read_fifo_into) use one preallocated ioctl message whose receive
+    buffer is copied into the caller's buffer, so no list is built per byte.
+
+    Register programs are compiled into their transfers once. When the device has a file
+    descriptor (spidev.SpiDev.fileno) and fcntl is available, all the transfers of a program are
+    sent with one SPI_IOC_MESSAGE ioctl, with chip select released between them, so a program
+    costs one system call. Other devices, such as TraceRecorder or the emulator, get the
+    compiled transfers one xfer2 call at a time.
+
+    The chip takes SPI clocks up to 10 MHz, but long or loose wiring may not. tune() raises the
+    clock step by step while check_link() passes, and settles one step below the fastest clock
+    that passed, or on the fastest step if every one passed.
+
+    Attributes:
+        spi (object): The SPI device.
+    """
+
+    # The size of an SPI_IOC_MESSAGE request is a 14-bit field
+    MAX_MESSAGES = 511
+    FIFO_SIZE = 64
+
+    FIFODataReg = 0x09
+    FIFOLevelReg = 0x0A
+    ModWidthReg = 0x24
+    VersionReg = 0x37
+
+    # SPI clocks tried by tune(), slowest first
+    SPEEDS = (1000000, 2000000, 4000000, 6000000, 8000000, 10000000)
+
+    # Register values that show a floating or shorted MISO line rather than a chip
+    NO_CHIP = (0x00, 0xFF)
+
+    def __init__(self, spi):
+        """
+        Initializes an SpiTransport.
+
+        Args:
+            spi (object): An opened object with the spidev.SpiDev API.
+        """
+        self.spi = spi
+        self._programs = {}
+        self._fifo_messages = {}
+
+    def write_reg(self, addr, val):
+        self._xfer([(addr << 1) & 0x7E, val])
+
+    def read_reg(self, addr):
+        return self._xfer([((addr << 1) & 0x7E) | 0x80, 0])[1]
+
+    def read_regs(self, addrs):
+        if not addrs:
+            return []
+        return self._xfer([((addr << 1) & 0x7E) | 0x80 for addr in addrs] + [0])[1:]
+
+    def write_fifo(self, addr, data):
+        if len(data) == 0:
+            return
+        self._xfer([(addr << 1) & 0x7E] + list(data))
+
+    def read_fifo(self, addr, count):
+        if count <= 0:
+            return []
+        return self._xfer([((addr << 1) & 0x7E) | 0x80] * count + [0])[1:]
+
+    def read_fifo_into(self, addr, buffer):
+        count = len(buffer)
+        if count <= 0:
+            return
+        message = self._fifo_messages.get(addr)
+        if message is None and count <= self.FIFO_SIZE:
+            message = self._fifo_messages[addr] = self._fifo_message(addr)
+        if not message or count > self.FIFO_SIZE:
+            buffer[:] = bytes(self.read_fifo(addr, count))
+            return
+
+        # One address byte per FIFO byte, then 0x00 to end the read
+        (transfer, tx, rx) = message
+        self._count(count + 1)
+        tx[count] = 0
+        transfer[0].len = count + 1
+        try:
+            fcntl.ioctl(self.spi.fileno(), _spi_ioc_message(1), transfer)
+        finally:
+            tx[count] = ((addr << 1) & 0x7E) | 0x80
+        buffer[:] = rx[1:count + 1]
+
+    def run_program(self, program, data=None):
+        key = (program, bool(data))
+        compiled = self._programs.get(key)
+        if compiled is None:
+            compiled = self._programs[key] = self._compile(program, bool(data))
+        (frames, message) = compiled
+        if self.metrics is not None:
+            for frame in frames:
+                self._count(len(frame) if frame is not None else len(data) + 1)
+
+        if message is None:
+            values = []
+            for frame in frames:
+                if frame is None:
+                    self.spi.xfer2([(program.data_addr << 1) & 0x7E] + list(data))
+                elif frame[0] & 0x80:
+                    values += self.spi.xfer2(list(frame))[1:]
+                else:
+                    self.spi.xfer2(list(frame))
+            return values
+
+        (transfers, buffers, slot, keep) = message
+        if slot is not None:
+            tx = (ctypes.c_uint8 * (len(data) + 1))((program.data_addr << 1) & 0x7E, *data)
+            transfers[slot].tx_buf = ctypes.addressof(tx)
+            transfers[slot].len = len(tx)
+        fcntl.ioctl(self.spi.fileno(), _spi_ioc_message(len(transfers)), transfers)
+        values = []
+        for rx in buffers:
+            values += rx[1:]
+        return values
+
+    def close(self):
+        self.spi.close()
+
+    def check_link(self, rounds=4, version=None):
+        """
+        Test the link at the current clock: bursts of VersionReg reads, write and readback
+        patterns on ModWidthReg, and a FIFO burst written and read back. ModWidthReg is restored
+        and the FIFO flushed. The chip has to be idle.
+
+        Args:
+            rounds (int): The number of times the tests are repeated (default 4).
+            version (int): The VersionReg value to expect (default None, any value read
+                consistently other than 0x00 and 0xFF).
+
+        Returns:
+            bool: Whether every test passed.
+        """
+        versions = self.read_regs([self.VersionReg] * 8)
+        if version is None:
+            version = versions[0]
+        if version in self.NO_CHIP or any(v != version for v in versions):
+            return False
+
+        mod_width = self.read_reg(self.ModWidthReg)
+        pattern = [(i * 0x4B) & 0xFF for i in range(1, 33)]
+        try:
+            for _ in range(rounds):
+                if self.read_regs([self.VersionReg] * 8) != [version] * 8:
+                    return False
+                for value in (0x55, 0xAA, 0x0F, 0xF0):
+                    self.write_reg(self.ModWidthReg, value)
+                    if self.read_regs([self.ModWidthReg] * 2) != [value] * 2:
+                        return False
+                self.write_reg(self.FIFOLevelReg, 0x80)
+                self.write_fifo(self.FIFODataReg, pattern)
+                if self.read_reg(self.FIFOLevelReg) & 0x7F != len(pattern) or \
+                        self.read_fifo(self.FIFODataReg, len(pattern)) != pattern:
+                    return False
+        finally:
+            self.write_reg(self.FIFOLevelReg, 0x80)
+            self.write_reg(self.ModWidthReg, mod_width)
+        return True
+
+    def tune(self, max_speed_hz=10000000, rounds=4):
+        """
+        Set the fastest reliable SPI clock, up to max_speed_hz.
+
+        Each step of SPEEDS is tested with check_link(); the clock settles one step below the
+        fastest step that passed, as a margin, unless every step passed. A failed step may have
+        garbled register writes, so the chip should be reset afterwards.
+
+        Args:
+            max_speed_hz (int): The highest clock to try (default 10000000).
+            rounds (int): The repetitions of check_link() per step (default 4).
+
+        Returns:
+            int: The clock set, in Hz.
+        """
+        speeds = [speed for speed in self.SPEEDS if speed <= max_speed_hz] or [self.SPEEDS[0]]
+        self.spi.max_speed_hz = speeds[0]
+        version = self.read_reg(self.VersionReg)
+        passed = -1
+        for i, speed in enumerate(speeds):
+            self.spi.max_speed_hz = speed
+            if not self.check_link(rounds, version):
+                break
+            passed = i
+        if passed < 0:
+            self.spi.max_speed_hz = speeds[0]
+            raise IOError("The MFRC522 does not answer reliably on the SPI bus at {} Hz".format(speeds[0]))
+        if passed < len(speeds) - 1:
+            passed = max(passed - 1, 0)
+        self.spi.max_speed_hz = speeds[passed]
+        return speeds[passed]
+
+    def _compile(self, program, data):
+        """
+        Build the transfers of a program: a list of frames, None standing for the data step, and
+        the ioctl message when the device supports it.
+        """
+        frames = []
+        for group in program.groups([0] if data else None):
+            if group[0] == 'write':
+                frames += [bytes([(addr << 1) & 0x7E, val]) for addr, val in group[1]]
+            elif group[0] == 'read':
+                frames.append(bytes([((addr << 1) & 0x7E) | 0x80 for addr in group[1]] + [0]))
+            else:
+                frames.append(None)
+
+        if not 0 < len(frames) <= self.MAX_MESSAGES or not self._has_fileno():
+            return (frames, None)
+
+        transfers = (_SpiIocTransfer * len(frames))()
+        buffers = []
+        slot = None
+        # The transmit buffers must stay referenced as long as the message
+        keep = []
+        for i, frame in enumerate(frames):
+            # cs_change on all but the last transfer ends each register access with chip select
+            transfers[i].cs_change = 1 if i < len(frames) - 1 else 0
+            if frame is None:
+                slot = i
+                continue
+            tx = (ctypes.c_uint8 * len(frame)).from_buffer_copy(frame)
+            keep.append(tx)
+            transfers[i].tx_buf = ctypes.addressof(tx)
+            transfers[i].len = len(frame)
+            if frame[0] & 0x80:
+                rx = (ctypes.c_uint8 * len(frame))()
+                buffers.append(rx)
+                transfers[i].rx_buf = ctypes.addressof(rx)
+        return (frames, (transfers, buffers, slot, keep))
+
+    def _fifo_message(self, addr):
+        """
+        Build the ioctl message of read_fifo_into, or return False when the device has no file
+        descriptor.
+        """
+        if not self._has_fileno():
+            return False
+        tx = bytearray([((addr << 1) & 0x7E) | 0x80] * (self.FIFO_SIZE + 1))
+        rx = bytearray(self.FIFO_SIZE + 1)
+        transfer = (_SpiIocTransfer * 1)()
+        transfer[0].tx_buf = ctypes.addressof((ctypes.c_uint8 * len(tx)).from_buffer(tx))
+        transfer[0].rx_buf = ctypes.addressof((ctypes.c_uint8 * len(rx)).from_buffer(rx))
+        return (transfer, tx, memoryview(rx))
+
+    def _has_fileno(self):
+        # Whether the device can be driven with ioctl calls on its file descriptor
+        fileno = getattr(self.spi, 'fileno', None)
+        if fcntl is None or fileno is None:
+            return False
+        try:
+            return fileno() >= 0
+        except (AttributeError, OSError, TypeError):
+            return False
+
+    def _xfer(self, data):
+        self._count(len(data))
+        return self.spi.xfer2(data)
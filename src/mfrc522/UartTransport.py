@@ -0,0 +1,203 @@
+from .Transport import Transport
+
+# pyserial is only needed to open a port by name
+try:
+    import serial
+except ImportError:
+    serial = None
+
+
+class UartTransport(Transport):
+    """
+    The UART interface, over an object with the pyserial Serial API.
+
+    A read sends the address byte with bit 7 set and gets the register value back. A write sends
+    the address byte and the value, and the chip echoes the address byte. Batches are sent with
+    one write call and their answers collected with one read call, so the bytes of a batch or a
+    register program follow each other on the line without waiting for the answers.
+
+    The chip starts at 9600 baud. The transport raises the rate to the fastest one the port
+    accepts, up to max_baudrate, by writing SerialSpeedReg and checking that VersionReg still
+    reads back; a rate that fails the check is abandoned for the next slower one. A SoftReset
+    brings the chip back to 9600 baud, so soft_reset() negotiates again.
+
+    Attributes:
+        port (object): The serial port.
+        baudrate (int): The current data rate.
+        max_baudrate (int): The highest data rate negotiated.
+    """
+
+    SerialSpeedReg = 0x1F
+    VersionReg = 0x37
+
+    # Data rates and their SerialSpeedReg values, fastest first
+    BAUD_RATES = (
+        (1228800, 0x15),
+        (921600, 0x1C),
+        (460800, 0x3A),
+        (230400, 0x5A),
+        (115200, 0x7A),
+        (57600, 0x9A),
+        (38400, 0xAB),
+        (19200, 0xCB),
+        (9600, 0xEB),
+    )
+    RESET_BAUDRATE = 9600
+
+    def __init__(self, port, max_baudrate=1228800, timeout=0.1):
+        """
+        Initializes a UartTransport and negotiates the data rate.
+
+        Args:
+            port (str or object): A serial device name, such as '/dev/serial0', opened with
+                pyserial, or an object with the pyserial Serial API (write, read, baudrate,
+                reset_input_buffer).
+            max_baudrate (int): The highest data rate to use (default 1228800).
+            timeout (float): The read timeout in seconds of a port opened by name (default 0.1).
+        """
+        if isinstance(port, str):
+            if serial is None:
+                raise ImportError("pyserial is required to open a serial port by name")
+            port = serial.Serial(port, self.RESET_BAUDRATE, timeout=timeout)
+        self.port = port
+        self.port.baudrate = self.RESET_BAUDRATE
+        self.baudrate = self.RESET_BAUDRATE
+        self.max_baudrate = max_baudrate
+        self._programs = {}
+        self.negotiate()
+
+    def write_reg(self, addr, val):
+        self.write_regs([(addr, val)])
+
+    def read_reg(self, addr):
+        return self.read_regs([addr])[0]
+
+    def write_regs(self, pairs):
+        if not pairs:
+            return
+        frame = bytearray()
+        for addr, val in pairs:
+            frame.append(addr & 0x3F)
+            frame.append(val & 0xFF)
+        echo = self._exchange(frame, len(pairs))
+        if list(echo) != [addr & 0x3F for addr, val in pairs]:
+            raise IOError("The MFRC522 did not acknowledge the write on the UART")
+
+    def read_regs(self, addrs):
+        if not addrs:
+            return []
+        return list(self._exchange(bytes(0x80 | (addr & 0x3F) for addr in addrs), len(addrs)))
+
+    def run_program(self, program, data=None):
+        # The whole program goes out with one write and its answers come back with one read
+        key = (program, bool(data))
+        compiled = self._programs.get(key)
+        if compiled is None:
+            compiled = self._programs[key] = self._compile(program)
+        (before, after, answers_before, answers_after) = compiled
+        frame = bytearray(before)
+        answers = list(answers_before)
+        if data:
+            addr = program.data_addr & 0x3F
+            for b in data:
+                frame.append(addr)
+                frame.append(b & 0xFF)
+            answers += [addr] * len(data)
+        frame += after
+        answers += answers_after
+
+        values = []
+        for expected, b in zip(answers, self._exchange(frame, len(answers))):
+            if expected is None:
+                values.append(b)
+            elif b != expected:
+                raise IOError("The MFRC522 did not acknowledge the write on the UART")
+        return values
+
+    def soft_reset(self, addr, command):
+        # The reset drops the chip to 9600 baud, possibly before the echo is sent
+        self._write_blind(addr, command)
+        self._set_baudrate(self.RESET_BAUDRATE)
+        self.negotiate()
+
+    def negotiate(self):
+        """
+        Raise the data rate to the fastest one that works, up to max_baudrate.
+
+        Returns:
+            int: The data rate in use.
+        """
+        version = self.read_reg(self.VersionReg)
+        for rate, value in self.BAUD_RATES:
+            if rate > self.max_baudrate:
+                continue
+            if rate <= self.baudrate:
+                break
+            if not self._port_accepts(rate):
+                continue
+            previous = (self.baudrate, self._speed_value(self.baudrate))
+            self._write_blind(self.SerialSpeedReg, value)
+            self._set_baudrate(rate)
+            try:
+                if self.read_reg(self.VersionReg) == version:
+                    return rate
+            except IOError:
+                pass
+            # Bring the chip back to the last rate that worked
+            self._write_blind(self.SerialSpeedReg, previous[1])
+            self._set_baudrate(previous[0])
+            self.read_reg(self.VersionReg)
+        return self.baudrate
+
+    def close(self):
+        self.port.close()
+
+    def _compile(self, program):
+        # The bytes sent before and after the data step, and the answers expected for them:
+        # the echoed address of a write, or None for the value of a read
+        parts = ([bytearray(), []], [bytearray(), []])
+        part = parts[0]
+        for addr, val in program.steps:
+            if val is program.DATA:
+                part = parts[1]
+            elif val is None:
+                part[0].append(0x80 | (addr & 0x3F))
+                part[1].append(None)
+            else:
+                part[0] += bytes([addr & 0x3F, val])
+                part[1].append(addr & 0x3F)
+        return (bytes(parts[0][0]), bytes(parts[1][0]), parts[0][1], parts[1][1])
+
+    def _write_blind(self, addr, val):
+        # A write that changes the data rate: its echo may come at either rate, so it is not checked
+        self._count(3)
+        self.port.write(bytes([addr & 0x3F, val]))
+        self.port.read(1)
+
+    def _port_accepts(self, rate):
+        try:
+            self.port.baudrate = rate
+            return True
+        except (ValueError, IOError):
+            return False
+        finally:
+            self.port.baudrate = self.baudrate
+
+    def _set_baudrate(self, rate):
+        self.port.baudrate = rate
+        self.baudrate = rate
+        self.port.reset_input_buffer()
+
+    def _speed_value(self, rate):
+        for known, value in self.BAUD_RATES:
+            if known == rate:
+                return value
+        raise ValueError("Unsupported baud rate {}".format(rate))
+
+    def _exchange(self, frame, count):
+        self._count(len(frame) + count)
+        self.port.write(frame)
+        answer = self.port.read(count)
+        if len(answer) != count:
+            raise IOError("No answer from the MFRC522 on the UART")
+        return answer
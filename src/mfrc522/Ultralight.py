@@ -0,0 +1,247 @@
+class Ultralight:
+    """
+    A MIFARE Ultralight or NTAG21x card, driven through an MFRC522.
+
+    Memory is made of 4-byte pages. READ returns four pages, WRITE stores one. Cards that answer
+    GET_VERSION (Ultralight EV1, NTAG21x) give their size with it and support FAST_READ, which
+    returns a range of pages in one frame; read_pages uses it for bulk reads. The answer of a
+    frame has to fit in the 64-byte FIFO, so a FAST_READ covers at most 15 pages, or 16 when the
+    chip checks and strips the CRC (crc='frame'): a whole NTAG216 takes 16 frames instead of the
+    58 READs or the 231 page by page reads.
+
+    Attributes:
+        reader (MFRC522): The reader the card was selected with.
+        uid (list): The UID of the card, as returned by SelectCard.
+        id (int): The UID as an integer.
+        sak (int): The SAK byte returned when the card was selected.
+        version (bytes): The answer to GET_VERSION, or None before detect() or for a card without it.
+        model (str): The name of the card type, set by detect().
+        page_count (int): The number of pages of the card, set by detect().
+    """
+
+    PAGE_SIZE = 4
+
+    # Commands
+    READ = 0x30
+    WRITE = 0xA2
+    GET_VERSION = 0x60
+    FAST_READ = 0x3A
+
+    # GET_VERSION product type and storage size bytes: card name and number of pages
+    VERSIONS = {
+        (0x03, 0x0B): ('MIFARE Ultralight EV1 MF0UL11', 20),
+        (0x03, 0x0E): ('MIFARE Ultralight EV1 MF0UL21', 41),
+        (0x04, 0x0B): ('NTAG210', 20),
+        (0x04, 0x0E): ('NTAG212', 41),
+        (0x04, 0x0F): ('NTAG213', 45),
+        (0x04, 0x11): ('NTAG215', 135),
+        (0x04, 0x13): ('NTAG216', 231),
+    }
+
+    def __init__(self, reader, uid, sak=0x00):
+        """
+        Initializes an Ultralight for a card that was just selected.
+
+        Args:
+            reader (MFRC522): The reader the card was selected with.
+            uid (list): The UID of the card, as returned by SelectCard.
+            sak (int): The SAK byte returned by SelectCard (default 0x00).
+        """
+        self.reader = reader
+        self.uid = list(uid)
+        self.id = 0
+        for b in self.uid:
+            self.id = self.id * 256 + b
+        self.sak = sak
+        self.version = None
+        self.model = None
+        self.page_count = None
+
+    @classmethod
+    def select(cls, reader):
+        """
+        Select a card in the field.
+
+        Args:
+            reader (MFRC522): The reader.
+
+        Returns:
+            Ultralight: The selected card, or None if no card answered or it is not an Ultralight
+                or NTAG (SAK other than 0x00).
+        """
+        (status, TagType) = reader.Request(reader.PICC_REQIDL)
+        if status != reader.MI_OK:
+            return None
+        (status, uid, sak) = reader.SelectCard()
+        if status != reader.MI_OK or sak != 0x00:
+            return None
+        return cls(reader, uid, sak)
+
+    def get_version(self):
+        """
+        Send GET_VERSION.
+
+        A card without the command, such as a MIFARE Ultralight, goes back to IDLE; it is
+        selected again, so it can still be used.
+
+        Returns:
+            bytes: The 8 bytes of the answer, or None if the card does not support it.
+        """
+        reader = self.reader
+        (status, backData, backLen) = reader.TransceiveCRC([self.GET_VERSION], reader.timeouts['read'])
+        data = self._check_crc(status, backData, 8)
+        if data is None:
+            self._reselect()
+        return data
+
+    def detect(self):
+        """
+        Find out the card type and its size with GET_VERSION.
+
+        A card that does not answer GET_VERSION is taken for a MIFARE Ultralight of 16 pages and
+        read without FAST_READ. Sets version, model and page_count.
+
+        Returns:
+            int: The number of pages of the card.
+        """
+        self.version = self.get_version()
+        if self.version is None:
+            (self.model, self.page_count) = ('MIFARE Ultralight', 16)
+        else:
+            key = (self.version[2], self.version[6])
+            # For other cards, the 4 header pages and the lower bound of the user memory the
+            # storage size byte gives (2^n bytes, n in bits 7-1)
+            default = ('Unknown', 4 + (1 << (self.version[6] >> 1)) // self.PAGE_SIZE)
+            (self.model, self.page_count) = self.VERSIONS.get(key, default)
+        return self.page_count
+
+    def read_pages(self, start, count, into=None):
+        """
+        Read consecutive pages.
+
+        After detect() found FAST_READ, the range is read with as few FAST_READ frames as the
+        FIFO allows; otherwise with READ, four pages at a time.
+
+        Args:
+            start (int): The first page.
+            count (int): The number of pages.
+            into (bytearray or memoryview): A writable buffer of 4 * count bytes to read into
+                (default None).
+
+        Returns:
+            bytes: The 4 * count bytes read, into when it is given, or None if the operation fails.
+        """
+        if count < 0 or start < 0 or start + count > 256:
+            raise ValueError("Invalid page range {} + {}".format(start, count))
+        data = bytearray(count * self.PAGE_SIZE) if into is None else into
+        view = memoryview(data)
+        page = start
+        while page < start + count:
+            if self.version is not None:
+                n = min(start + count - page, self._fast_read_pages())
+                chunk = self._fast_read(page, page + n - 1)
+            else:
+                n = min(start + count - page, 4)
+                chunk = self._read(page)
+            if chunk is None:
+                return None
+            offset = (page - start) * self.PAGE_SIZE
+            view[offset:offset + n * self.PAGE_SIZE] = chunk[:n * self.PAGE_SIZE]
+            page += n
+        return bytes(data) if into is None else into
+
+    def read_all(self):
+        """
+        Read the whole memory of the card, detecting its size first if needed.
+
+        Returns:
+            bytes: The content of all the pages, or None if the operation fails.
+        """
+        if self.page_count is None:
+            self.detect()
+        return self.read_pages(0, self.page_count)
+
+    def write_page(self, page, data):
+        """
+        Write one page with WRITE (0xA2).
+
+        Args:
+            page (int): The page number.
+            data (list or bytes-like): The 4 bytes to write.
+
+        Returns:
+            int: The status of the write, MI_OK if the card acknowledged.
+        """
+        if len(data) != self.PAGE_SIZE:
+            raise ValueError("A page is written with 4 bytes, got {}".format(len(data)))
+        reader = self.reader
+        frame = bytes([self.WRITE, page]) + bytes(data)
+        (status, backData, backLen) = reader.TransceiveCRC(frame, reader.timeouts['write'], rxCRC=False)
+        return reader._check_ack(status, backData, backLen)
+
+    def write_pages(self, start, data):
+        """
+        Write consecutive pages, stopping at the first page that fails.
+
+        Args:
+            start (int): The first page.
+            data (bytes-like): The data, a multiple of 4 bytes.
+
+        Returns:
+            int: The status of the writes.
+        """
+        view = memoryview(data).cast('B')
+        if len(view) % self.PAGE_SIZE:
+            raise ValueError("Pages are written with multiples of 4 bytes, got {}".format(len(view)))
+        status = self.reader.MI_OK
+        for i in range(0, len(view), self.PAGE_SIZE):
+            status = self.write_page(start + i // self.PAGE_SIZE, view[i:i + self.PAGE_SIZE])
+            if status != self.reader.MI_OK:
+                break
+        return status
+
+    def release(self, halt=True):
+        """
+        End the session with the card.
+
+        Args:
+            halt (bool): Put the card into the HALT state so it is not selected again while it stays in the field.
+        """
+        if halt:
+            self.reader.HaltTag()
+
+    def _read(self, page):
+        reader = self.reader
+        (status, backData, backLen) = reader.TransceiveCRC([self.READ, page], reader.timeouts['read'],
+                                                           maxLen=18)
+        return self._check_crc(status, backData, 16)
+
+    def _fast_read(self, first, last):
+        reader = self.reader
+        count = (last - first + 1) * self.PAGE_SIZE
+        (status, backData, backLen) = reader.TransceiveCRC([self.FAST_READ, first, last], reader.timeouts['read'],
+                                                           maxLen=count + 2)
+        return self._check_crc(status, backData, count)
+
+    def _fast_read_pages(self):
+        # The answer and its CRC, unless the chip strips it, have to fit in the FIFO
+        crc = 0 if self.reader.crc_mode == 'frame' else 2
+        return (self.reader.FIFO_SIZE - crc) // self.PAGE_SIZE
+
+    def _check_crc(self, status, backData, length):
+        """
+        Check an answer of length bytes, and its CRC_A unless the chip already did.
+
+        Returns:
+            bytes: The answer without its CRC, or None.
+        """
+        data = self.reader.CheckCRC(status, backData)
+        return data if data is not None and len(data) == length else None
+
+    def _reselect(self):
+        reader = self.reader
+        (status, TagType) = reader.Request(reader.PICC_REQALL)
+        if status != reader.MI_OK:
+            return False
+        (status, sak) = reader.SelectUID(self.uid)
+        return status == reader.MI_OK
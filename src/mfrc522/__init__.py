@@ -1,4 +1,24 @@
 from .MFRC522 import MFRC522
 from .BasicMFRC522 import BasicMFRC522
 from .SimpleMFRC522 import SimpleMFRC522
+from .Tag import Tag
+from .Ultralight import Ultralight
+from .IsoDep import IsoDep
+from .Ndef import Ndef, NdefMessage, NdefRecord
+from .TagEvent import TagEvent, TagArrived, TagDeparted
+from .KeyRing import KeyRing
+from .PayloadCodec import PayloadCodec
+from .Metrics import Metrics
+from .Emulator import (Emulator, EmulatedCard, EmulatedClassic, EmulatedUltralight, EmulatedIsoDep,
+                       EmulatedGPIO, EmulatedSerial, EmulatedI2C)
+from .TraceRecorder import TraceRecorder
+from .TraceReplay import TraceReplay
+from .Transport import Transport, SpiTransport
+from .RegisterProgram import RegisterProgram
+from .UartTransport import UartTransport
+from .I2cTransport import I2cTransport
+from .ReaderPool import ReaderPool
+from .AsyncMFRC522 import AsyncMFRC522
+from .AsyncBasicMFRC522 import AsyncBasicMFRC522
+from .AsyncTag import AsyncTag
 name = "mfrc522"
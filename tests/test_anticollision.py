@@ -0,0 +1,45 @@
+import pytest
+
+from mfrc522 import EmulatedClassic, EmulatedUltralight, Emulator, MFRC522
+
+
+def select_all(reader, count):
+    """
+    Select and halt the cards in the field one after the other, returning their UIDs.
+    """
+    uids = []
+    for _ in range(count):
+        assert reader.Request(MFRC522.PICC_REQIDL)[0] == MFRC522.MI_OK
+        (status, uid, sak) = reader.SelectCard()
+        assert status == MFRC522.MI_OK
+        uids.append(uid)
+        reader.HaltTag()
+    assert reader.Request(MFRC522.PICC_REQIDL)[0] != MFRC522.MI_OK
+    return uids
+
+
+def with_bcc(uid):
+    return list(uid) + [uid[0] ^ uid[1] ^ uid[2] ^ uid[3]]
+
+
+@pytest.mark.parametrize('uids', [
+    # The UIDs differ only in their last byte, so the collision is at bit 25
+    [(0xDE, 0xAD, 0xBE, 0x01), (0xDE, 0xAD, 0xBE, 0x02)],
+    # A collision in byte 1, then another one after the first has been resolved
+    [(0xDE, 0x12, 0xBE, 0xEF), (0xDE, 0x34, 0xBE, 0xEF), (0xDE, 0x34, 0x77, 0xEF)],
+    # A collision at bit 9, then one at bit 21 found after sending 1 byte and 1 bit, which
+    # CollPos reports as 13 counted from the second byte
+    [(0x00, 0x01, 0x10, 0x00), (0x00, 0x01, 0x20, 0x00), (0x00, 0x00, 0x10, 0x00)],
+])
+def test_collision_after_the_first_byte(uids):
+    chip = Emulator([EmulatedClassic(uid=uid) for uid in uids], realtime=False)
+    found = select_all(chip.reader(), len(uids))
+    assert sorted(found) == sorted(with_bcc(uid) for uid in uids)
+
+
+def test_double_size_uids_colliding_at_the_second_level():
+    # The same cascade level 1, so the collision is only found at level 2
+    uids = [(0x04, 0x11, 0x22, 0x33, 0x44, 0x55, 0x66), (0x04, 0x11, 0x22, 0x33, 0x44, 0x56, 0x66)]
+    chip = Emulator([EmulatedUltralight(uid=uid) for uid in uids], realtime=False)
+    found = select_all(chip.reader(), len(uids))
+    assert sorted(found) == sorted(list(uid) for uid in uids)
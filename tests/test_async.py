@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from mfrc522 import AsyncBasicMFRC522, AsyncMFRC522, BasicMFRC522, EmulatedClassic, Emulator, MFRC522
+
+
+def make_card():
+    card = EmulatedClassic()
+    card.blocks[8] = list(range(0x70, 0x80))
+    card.blocks[9] = list(range(0xF0, 0x100))
+    return card
+
+
+def test_read_no_block_matches_sync_reader():
+    async def read():
+        reader = AsyncBasicMFRC522(reader=Emulator([make_card()], realtime=False).reader())
+        return await reader.read_no_block(11)
+
+    (id, text) = asyncio.run(read())
+    expected = BasicMFRC522(reader=Emulator([make_card()], realtime=False).reader()).read_no_block(11)
+    assert (id, text) == expected
+    # One character per byte, bytes above 0x7F included
+    assert text[16:32] == bytes(range(0xF0, 0x100)).decode('latin-1')
+
+
+def test_constants_and_pure_methods_come_from_the_reader():
+    reader = AsyncMFRC522(Emulator([], realtime=False).reader())
+    assert reader.MI_OK == MFRC522.MI_OK
+    assert reader.PICC_AUTHENT1A == MFRC522.PICC_AUTHENT1A
+    assert reader.ParseValueBlock(reader.ValueBlock(7, 4)) == (7, 4)
+    assert reader.gpio_pins() == reader.MFRC522.gpio_pins()
+
+
+@pytest.mark.parametrize('name', ['ReadReg', 'WriteReg', 'AntennaOn', 'Init', 'SetBitRate'])
+def test_blocking_methods_are_not_forwarded(name):
+    reader = AsyncMFRC522(Emulator([], realtime=False).reader())
+    with pytest.raises(AttributeError):
+        getattr(reader, name)
+    assert callable(getattr(reader.MFRC522, name))
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from mfrc522 import AsyncBasicMFRC522, AsyncMFRC522, BasicMFRC522, EmulatedClassic, Emulator
+from mfrc522.MFRC522 import crc_a
+
+# CRC_A test vectors of ISO/IEC 14443-3, annex B
+VECTORS = [
+    ([0x00, 0x00], [0xA0, 0x1E]),
+    ([0x12, 0x34], [0x26, 0xCF]),
+    ([0x50, 0x00], [0x57, 0xCD]),
+]
+
+FRAMES = [
+    [0x30, 0x04],
+    [0x60, 0x07],
+    [0x93, 0x70, 0xDE, 0xAD, 0xBE, 0xEF, 0x22],
+    list(range(16)),
+    [0xFF] * 18,
+    [],
+]
+
+
+@pytest.mark.parametrize('data, crc', VECTORS)
+def test_iso_14443_vectors(data, crc):
+    assert list(crc_a(data)) == crc
+    assert list(crc_a(bytes(data))) == crc
+
+
+@pytest.mark.parametrize('data', FRAMES)
+def test_host_and_chip_crc_match(data):
+    chip = Emulator([], realtime=False)
+    host = chip.reader(crc='host')
+    coprocessor = chip.reader(crc='chip')
+    assert list(host.CalulateCRC(data)) == list(coprocessor.CalulateCRC(data)) == list(crc_a(data))
+
+
+@pytest.mark.parametrize('data, crc', VECTORS)
+def test_chip_crc_vectors(data, crc):
+    chip = Emulator([], realtime=False)
+    assert list(chip.reader(crc='chip').CalulateCRC(data)) == crc
+
+
+def test_crc_modes_read_the_same_card():
+    blocks = {}
+    for mode in ('host', 'chip', 'frame'):
+        card = EmulatedClassic()
+        card.blocks[4] = list(range(16))
+        chip = Emulator([card], realtime=False)
+        reader = BasicMFRC522(reader=chip.reader(crc=mode))
+        with reader.session(halt=False) as tag:
+            blocks[mode] = tag.read_block(4)
+    assert blocks['host'] == blocks['chip'] == blocks['frame'] == bytes(range(16))
+
+
+def test_async_chip_crc_is_awaited():
+    card = EmulatedClassic()
+    card.blocks[4] = list(range(16))
+    chip = Emulator([card], realtime=False)
+    reader = chip.reader(crc='chip')
+
+    def blocking_wait(*args):
+        raise AssertionError("the blocking wait of the sync reader was used")
+    reader._wait_irq = blocking_wait
+    async_reader = AsyncMFRC522(reader)
+
+    async def main():
+        assert list(await async_reader.CalulateCRC([0x50, 0x00])) == [0x57, 0xCD]
+        async with AsyncBasicMFRC522(reader=async_reader).session(halt=True) as tag:
+            return await tag.read_block(4)
+
+    assert asyncio.run(main()) == bytes(range(16))
@@ -0,0 +1,48 @@
+from mfrc522 import BasicMFRC522, EmulatedClassic, Emulator
+
+
+def make_reader():
+    card = EmulatedClassic()
+    chip = Emulator([card], realtime=False)
+    return (chip, card, BasicMFRC522(reader=chip.reader(), diff_write=True))
+
+
+def test_write_skips_unchanged_blocks():
+    (chip, card, reader) = make_reader()
+    text = 'a' * 16 + 'b' * 16 + 'c' * 16
+    assert reader.write_sector(text, 11)[0]
+    assert reader.written_blocks == [8, 9, 10]
+    assert reader.write_sector(text, 11)[0]
+    assert reader.written_blocks == []
+    assert reader.write_sector('a' * 16 + 'x' * 16 + 'c' * 16, 11)[0]
+    assert reader.written_blocks == [9]
+    assert bytes(card.blocks[9]) == b'x' * 16
+
+
+def test_clear_skips_zero_blocks():
+    (chip, card, reader) = make_reader()
+    assert reader.write_sector('a' * 20, 11)[0]
+    assert reader.written_blocks == [8, 9, 10]
+    assert reader.clear_sector(11)
+    # Block 10 only ever held the padding spaces
+    assert reader.written_blocks == [8, 9, 10]
+    assert reader.clear_sector(11)
+    assert reader.written_blocks == []
+    assert all(card.blocks[b] == [0] * 16 for b in (8, 9, 10))
+
+
+def test_failed_call_leaves_written_blocks_empty():
+    # A failed call reports no writes, not those of the call before it
+    (chip, card, reader) = make_reader()
+    assert reader.write_sector('hello', 11)[0]
+    assert reader.written_blocks
+    chip.cards.clear()
+    assert reader.clear_no_sector(11) is None
+    assert reader.written_blocks == []
+
+    chip.cards.append(card)
+    assert reader.write_sector('world', 11)[0]
+    assert reader.written_blocks
+    chip.cards.clear()
+    assert reader.write_no_block('hello', 11) == (None, None)
+    assert reader.written_blocks == []
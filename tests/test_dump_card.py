@@ -0,0 +1,59 @@
+import io
+
+from mfrc522 import BasicMFRC522, EmulatedClassic, Emulator, MFRC522
+
+WRONG_KEY = [0x12] * 6
+
+
+def make_reader(card):
+    chip = Emulator([card], realtime=False)
+    reader = chip.reader(metrics=True)
+    return (chip, BasicMFRC522(reader=reader))
+
+
+def fill(card):
+    for i, block in enumerate(card.blocks):
+        if i and (i + 1) % 4:
+            card.blocks[i] = [(i + j) & 0xFF for j in range(16)]
+
+
+def test_dump_1k_in_one_selection():
+    card = EmulatedClassic()
+    fill(card)
+    (chip, reader) = make_reader(card)
+    clock = chip.clock
+    out = io.BytesIO()
+    (id, image, status) = reader.dump_card_no_block(file=out)
+    assert id is not None
+    assert status == [MFRC522.MI_OK] * 16
+    assert len(image) == 1024
+    assert out.getvalue() == image
+    assert image == bytes(b for block in card.blocks for b in block)
+    commands = reader.MFRC522.metrics.snapshot()['commands']
+    assert commands['REQA']['count'] == 1
+    assert commands['AUTHENT']['count'] == 16
+    assert commands['READ']['count'] == 64
+    # 140 ms of air time at 106 kbit/s, and the SPI traffic at 1 MHz
+    assert chip.clock - clock < 0.2
+
+
+def test_dump_4k_detected_from_sak():
+    card = EmulatedClassic(size=4096)
+    fill(card)
+    (chip, reader) = make_reader(card)
+    (id, image, status) = reader.dump_card_no_block()
+    assert len(image) == 4096
+    assert len(status) == 40
+    assert image[128 * 16:129 * 16] == bytes(card.blocks[128])
+
+
+def test_dump_skips_sector_it_cannot_open():
+    card = EmulatedClassic(keys={3: (WRONG_KEY, WRONG_KEY)})
+    fill(card)
+    (chip, reader) = make_reader(card)
+    (id, image, status) = reader.dump_card_no_block()
+    assert status[3] == MFRC522.MI_ERR
+    assert image[12 * 16:16 * 16] == bytes(64)
+    # The card is selected again and the next sectors are read
+    assert status[:3] + status[4:] == [MFRC522.MI_OK] * 15
+    assert image[16 * 16:17 * 16] == bytes(card.blocks[16])
@@ -0,0 +1,127 @@
+from mfrc522 import EmulatedIsoDep, Emulator, IsoDep, MFRC522
+
+
+class LossyIsoDep(EmulatedIsoDep):
+    """
+    A card whose first answers after the ATS and PPS are lost.
+    """
+
+    def __init__(self, lost=1, **kwargs):
+        super().__init__(**kwargs)
+        self.lost = lost
+
+    def active(self, frame, chip):
+        lose = self._protocol and not self._pps and self.lost
+        response = super().active(frame, chip)
+        if lose:
+            self.lost -= 1
+            return None
+        return response
+
+
+class WrongBlockIsoDep(EmulatedIsoDep):
+    """
+    A card that answers I-blocks with the wrong block number.
+    """
+
+    def _next_block(self, delay=0.0):
+        self._bn ^= 1
+        return super()._next_block(delay)
+
+
+class ShortAtsIsoDep(EmulatedIsoDep):
+    """
+    A card whose ATS announces TA(1), TB(1) and TC(1) but stops after TA(1).
+    """
+
+    @property
+    def ats(self):
+        return [0x03, 0x78, self.ta]
+
+
+def activated(card, bit_rate=424):
+    chip = Emulator([card], realtime=False)
+    reader = chip.reader()
+    tag = IsoDep.select(reader)
+    assert tag is not None
+    assert tag.activate(bit_rate) == MFRC522.MI_OK
+    return (reader, tag)
+
+
+def read_binary(offset, length):
+    return bytes([0x00, 0xB0, offset >> 8, offset & 0xFF, length & 0xFF])
+
+
+def test_ats_and_pps():
+    card = EmulatedIsoDep()
+    (reader, tag) = activated(card, 848)
+    assert tag.ats == bytes(card.ats)
+    assert tag.historical == b'\x80'
+    assert tag.fsc == 256
+    assert tag.bit_rates == [106, 212, 424, 848]
+    assert abs(tag.fwt - IsoDep.FWT_UNIT * (1 << 8)) < 1e-9
+    assert card.rates == (3, 3)
+    assert tag.transceive(read_binary(0, 16)) == bytes(range(16)) + b'\x90\x00'
+
+
+def test_pps_limited_by_card():
+    card = EmulatedIsoDep(ta=0x11)
+    (reader, tag) = activated(card, 848)
+    assert tag.bit_rates == [106, 212]
+    assert card.rates == (1, 1)
+
+
+def test_chaining_both_ways():
+    # The card takes frames of 32 bytes, so the command is sent in chained I-blocks; the answer
+    # is longer than the 64-byte frames of the reader, so it comes back chained too
+    card = EmulatedIsoDep(fsci=2)
+    (reader, tag) = activated(card)
+    data = bytes(range(100, 200))
+    command = bytes([0x00, 0xD6, 0x00, 0x10, len(data)]) + data
+    assert tag.transceive(command) == b'\x90\x00'
+    assert card.apdus[-1] == command
+    assert bytes(card.data[0x10:0x10 + len(data)]) == data
+    answer = tag.transceive(read_binary(0, 200))
+    assert answer == bytes(card.data[:200]) + b'\x90\x00'
+
+
+def test_waiting_time_extension():
+    card = EmulatedIsoDep()
+    card.apdu_time = 1.0
+    (reader, tag) = activated(card)
+    assert tag.transceive(read_binary(0, 4)) == bytes(range(4)) + b'\x90\x00'
+
+
+def test_lost_block_recovered_with_nak():
+    card = LossyIsoDep()
+    (reader, tag) = activated(card)
+    assert tag.transceive(read_binary(0, 4)) == bytes(range(4)) + b'\x90\x00'
+    assert len(card.apdus) == 1
+    assert tag.transceive(read_binary(4, 4)) == bytes(range(4, 8)) + b'\x90\x00'
+
+
+def test_too_many_lost_blocks():
+    card = LossyIsoDep(lost=IsoDep.RETRIES + 2)
+    (reader, tag) = activated(card)
+    assert tag.transceive(read_binary(0, 4)) is None
+
+
+def test_wrong_block_number_rejected():
+    card = WrongBlockIsoDep()
+    (reader, tag) = activated(card)
+    assert tag.transceive(read_binary(0, 4)) is None
+
+
+def test_truncated_ats():
+    chip = Emulator([ShortAtsIsoDep()], realtime=False)
+    tag = IsoDep.select(chip.reader())
+    assert tag.rats() is None
+    assert tag.ats is None
+
+
+def test_deselect():
+    card = EmulatedIsoDep()
+    (reader, tag) = activated(card, 848)
+    assert tag.deselect() == MFRC522.MI_OK
+    assert card.state == card.HALT
+    assert reader.Request(MFRC522.PICC_REQIDL)[0] != MFRC522.MI_OK
@@ -0,0 +1,106 @@
+from mfrc522 import BasicMFRC522, EmulatedClassic, Emulator, KeyRing
+
+KEY_A = [0x11, 0x22, 0x33, 0x44, 0x55, 0x66]
+KEY_B = [0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5]
+WRONG = [[0xA0 + i] * 6 for i in range(3)]
+UID = [0x01, 0x02, 0x03, 0x04]
+
+
+def test_cache_is_lru():
+    ring = KeyRing(cache_size=2)
+    ring.remember(UID, 1, KeyRing.PICC_AUTHENT1A, KEY_A)
+    ring.remember(UID, 2, KeyRing.PICC_AUTHENT1A, KEY_A)
+    # Using sector 1 makes sector 2 the least recently used entry
+    assert ring.candidates(UID, 1)[0] == (KeyRing.PICC_AUTHENT1A, KEY_A)
+    ring.remember(UID, 3, KeyRing.PICC_AUTHENT1A, KEY_A)
+    assert ring.lookup(UID, 1) is not None
+    assert ring.lookup(UID, 2) is None
+    assert ring.lookup(UID, 3) is not None
+    assert ring.stats()['cached'] == 2
+
+
+def test_candidates_order():
+    ring = KeyRing(keys_a=WRONG[:2], keys_b=[KEY_B])
+    assert ring.candidates(UID, 1) == [(0x60, WRONG[0]), (0x60, WRONG[1]), (0x61, KEY_B)]
+    ring.remember(UID, 1, KeyRing.PICC_AUTHENT1B, KEY_B, attempts=3)
+    assert ring.candidates(UID, 1) == [(0x61, KEY_B), (0x60, WRONG[0]), (0x60, WRONG[1])]
+    # Other cards and sectors are not affected
+    assert ring.candidates([9, 9, 9, 9], 1)[0] == (0x60, WRONG[0])
+    ring.set_sector_keys(4, keys_a=[KEY_A])
+    assert ring.candidates(UID, 4) == [(0x60, KEY_A)]
+
+
+def test_hits_misses_and_stats():
+    ring = KeyRing()
+    ring.remember(UID, 1, KeyRing.PICC_AUTHENT1A, KEY_A, attempts=2)
+    ring.remember(UID, 1, KeyRing.PICC_AUTHENT1A, KEY_A)
+    ring.remember(UID, 1, KeyRing.PICC_AUTHENT1A, KEY_A)
+    assert ring.stats() == {'hits': 2, 'misses': 1, 'hit_rate': 2 / 3, 'cached': 1}
+    ring.failed(UID, 1)
+    assert ring.lookup(UID, 1) is None
+    assert ring.stats() == {'hits': 2, 'misses': 2, 'hit_rate': 0.5, 'cached': 0}
+    ring.remember(UID, 1, KeyRing.PICC_AUTHENT1A, KEY_A)
+    ring.remember(UID, 2, KeyRing.PICC_AUTHENT1A, KEY_A)
+    ring.forget(UID)
+    assert ring.stats()['cached'] == 0
+
+
+def make_reader(ring, keys):
+    card = EmulatedClassic(keys=keys)
+    card.blocks[8] = list(b'behind a key    ')
+    chip = Emulator([card], realtime=False)
+    reader = BasicMFRC522(keyring=ring, reader=chip.reader())
+    attempts = []
+    authenticate = reader.MFRC522.Authenticate
+
+    def recording_authenticate(auth_mode, block, key, uid):
+        attempts.append((auth_mode, list(key)))
+        return authenticate(auth_mode, block, key, uid)
+
+    reader.MFRC522.Authenticate = recording_authenticate
+    return (card, reader, attempts)
+
+
+def read(reader):
+    # Retry the request, as a card left selected only goes back to IDLE on the first one
+    for _ in range(2):
+        (id, text) = reader.read_no_block(11)
+        if id is not None:
+            return text
+    return None
+
+
+def test_finds_key_and_reuses_it():
+    ring = KeyRing(keys_a=WRONG + [KEY_A])
+    (card, reader, attempts) = make_reader(ring, {2: (KEY_A, KEY_B)})
+    # The card is selected again after each rejected key
+    assert read(reader).startswith('behind a key')
+    assert attempts == [(0x60, key) for key in WRONG + [KEY_A]]
+    uid = card.uid + [card.uid[0] ^ card.uid[1] ^ card.uid[2] ^ card.uid[3]]
+    assert ring.lookup(uid, 2) == (0x60, KEY_A)
+    assert (ring.hits, ring.misses) == (0, 1)
+
+    del attempts[:]
+    assert read(reader).startswith('behind a key')
+    assert attempts == [(0x60, KEY_A)]
+    assert (ring.hits, ring.misses) == (1, 1)
+
+
+def test_falls_back_to_key_b():
+    ring = KeyRing(keys_a=WRONG, keys_b=[KEY_B])
+    (card, reader, attempts) = make_reader(ring, {2: (KEY_A, KEY_B)})
+    assert read(reader).startswith('behind a key')
+    assert attempts[-1] == (0x61, KEY_B)
+    del attempts[:]
+    assert read(reader).startswith('behind a key')
+    assert attempts == [(0x61, KEY_B)]
+
+
+def test_no_key_works():
+    ring = KeyRing(keys_a=WRONG)
+    (card, reader, attempts) = make_reader(ring, {2: (KEY_A, KEY_B)})
+    # The card is read, but no data comes back
+    assert read(reader) == ''
+    assert attempts == [(0x60, key) for key in WRONG]
+    assert ring.stats()['cached'] == 0
+    assert ring.misses == 1
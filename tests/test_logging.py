@@ -0,0 +1,16 @@
+import logging
+
+from mfrc522 import Emulator, ReaderPool
+
+
+def test_readers_do_not_add_handlers():
+    logger = logging.getLogger('mfrc522Logger')
+    before = list(logger.handlers)
+    readers = [Emulator([], realtime=False).reader() for _ in range(4)]
+    chips = [Emulator([], realtime=False) for _ in range(3)]
+    pool = ReaderPool([{'name': str(i), 'spi': chip, 'gpio': chip.gpio} for i, chip in enumerate(chips)])
+    assert logger.handlers == before
+    assert all(isinstance(handler, logging.NullHandler) for handler in logger.handlers)
+    pool.close()
+    for reader in readers:
+        reader.Close()
@@ -0,0 +1,51 @@
+from mfrc522 import EmulatedClassic, Emulator, MFRC522, Metrics
+
+
+class BusySpi:
+    """
+    An spidev.SpiDev stand-in that lets another reader use its bus between every transfer, as a
+    reader running in parallel would.
+    """
+
+    def __init__(self, chip, other):
+        self.chip = chip
+        self.other = other
+        self.max_speed_hz = 1000000
+
+    def xfer2(self, data, *args):
+        self.other.transport.read_reg(MFRC522.VersionReg)
+        return self.chip.xfer2(data, *args)
+
+    def close(self):
+        pass
+
+
+def request_commands(reader):
+    for _ in range(3):
+        assert reader.Request(MFRC522.PICC_REQIDL)[0] == MFRC522.MI_OK
+        reader.AntennaOff()
+        reader.AntennaOn()
+    return reader.metrics.snapshot()['commands']
+
+
+def test_shared_metrics_count_traffic_per_reader():
+    chip = Emulator([EmulatedClassic()], realtime=False)
+    alone = request_commands(chip.reader(metrics=True))
+
+    metrics = Metrics()
+    other_chip = Emulator([], realtime=False)
+    other = other_chip.reader(metrics=metrics)
+    chip = Emulator([EmulatedClassic()], realtime=False)
+    reader = MFRC522(spi=BusySpi(chip, other), gpio=chip.gpio, metrics=metrics)
+    metrics.reset()
+    start = (reader.transport.transfers + other.transport.transfers,
+             reader.transport.bytes + other.transport.bytes)
+    shared = request_commands(reader)
+
+    for name, entry in alone.items():
+        assert shared[name]['count'] == entry['count']
+        assert shared[name]['spi_transfers'] == entry['spi_transfers']
+        assert shared[name]['spi_bytes'] == entry['spi_bytes']
+    spi = metrics.snapshot()['spi']
+    assert spi['transfers'] == reader.transport.transfers + other.transport.transfers - start[0]
+    assert spi['bytes'] == reader.transport.bytes + other.transport.bytes - start[1]
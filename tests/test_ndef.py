@@ -0,0 +1,130 @@
+import pytest
+
+from mfrc522 import BasicMFRC522, EmulatedClassic, EmulatedUltralight, Emulator, Ndef, NdefMessage, NdefRecord, Ultralight
+
+RECORDS = [NdefRecord.from_uri('https://www.example.com/'), NdefRecord.from_text('Front door')]
+
+
+def ntag(pages=None):
+    card = EmulatedUltralight.ntag(213)
+    for i, page in enumerate(pages or []):
+        card.pages[4 + i] = list(page)
+    chip = Emulator([card], realtime=False)
+    return (card, Ultralight.select(chip.reader()))
+
+
+def classic_card(info=0x01):
+    # Sector 0 holds the MAD, sectors 1 and 2 the NDEF data area
+    keys = {0: (Ndef.MAD_KEY, [0xFF] * 6), 1: (Ndef.NDEF_KEY, [0xFF] * 6), 2: (Ndef.NDEF_KEY, [0xFF] * 6)}
+    card = EmulatedClassic(keys=keys)
+    mad = [0, info, 0x03, 0xE1, 0x03, 0xE1] + [0] * 26
+    mad[0] = Ndef._mad_crc(mad[1:])
+    (card.blocks[1], card.blocks[2]) = (mad[:16], mad[16:])
+    card.blocks[4][:3] = [0x03, 0x00, 0xFE]
+    return card
+
+
+def test_message_round_trip():
+    message = NdefMessage.from_records(RECORDS)
+    records = NdefMessage(message.data).records
+    assert [r.uri for r in records] == ['https://www.example.com/', None]
+    assert [r.text for r in records] == [None, 'Front door']
+    assert records[1].lang == 'en'
+    assert message.data[0] & NdefRecord.MB and not message.data[0] & NdefRecord.ME
+
+
+def test_message_stops_at_message_end():
+    data = NdefRecord.from_text('one').encode() + b'\xff\xff'
+    assert len(NdefMessage(data).records) == 1
+
+
+def test_truncated_record_raises():
+    data = NdefRecord.from_text('truncated').encode()[:-2]
+    with pytest.raises(ValueError):
+        NdefMessage(data).records
+
+
+def test_type2_write_and_read():
+    (card, tag) = ntag()
+    assert Ndef(tag).write(RECORDS) == tag.reader.MI_OK
+    message = Ndef(tag).read()
+    assert [r.uri or r.text for r in message] == ['https://www.example.com/', 'Front door']
+
+
+def test_type2_skips_null_and_other_tlvs():
+    record = NdefRecord.from_text('hi').encode()
+    # NULL TLV, a proprietary TLV of 2 bytes, then the NDEF TLV
+    data = bytes([0x00, 0xFD, 0x02, 0xAA, 0xBB, 0x03, len(record)]) + record + bytes([0xFE])
+    data += bytes(-len(data) % 4)
+    (card, tag) = ntag(data[i:i + 4] for i in range(0, len(data), 4))
+    assert Ndef(tag).read().records[0].text == 'hi'
+
+
+def test_type2_stops_at_terminator():
+    record = NdefRecord.from_text('hidden').encode()
+    # An NDEF TLV after the terminator is not read
+    data = bytes([0xFE, 0x03, len(record)]) + record
+    data += bytes(-len(data) % 4)
+    (card, tag) = ntag(data[i:i + 4] for i in range(0, len(data), 4))
+    reads = []
+    read_pages = tag.read_pages
+
+    def recording_read_pages(start, count, into=None):
+        reads.append((start, count))
+        return read_pages(start, count, into)
+
+    tag.read_pages = recording_read_pages
+    assert Ndef(tag).read() is None
+    # Only the capability container and the first pages of the data area
+    assert reads == [(3, 4)]
+
+
+def test_type2_rewrite_writes_nothing():
+    (card, tag) = ntag()
+    ndef = Ndef(tag)
+    assert ndef.write(RECORDS) == tag.reader.MI_OK
+    assert ndef.written_blocks
+    ndef = Ndef(tag)
+    assert ndef.write(RECORDS) == tag.reader.MI_OK
+    assert ndef.written_blocks == []
+
+
+def test_classic_write_and_rewrite():
+    card = classic_card()
+    reader = BasicMFRC522(reader=Emulator([card], realtime=False).reader())
+    with reader.session(halt=False) as tag:
+        ndef = Ndef(tag)
+        assert ndef.write(RECORDS) == reader.MFRC522.MI_OK
+        assert ndef.written_blocks == [4, 5, 6]
+        ndef = Ndef(tag)
+        assert ndef.read().records[1].text == 'Front door'
+        assert ndef.write(RECORDS) == reader.MFRC522.MI_OK
+        assert ndef.written_blocks == []
+
+
+def test_classic_reauthenticates_after_tag_moved_to_another_sector():
+    card = classic_card()
+    reader = BasicMFRC522(reader=Emulator([card], realtime=False).reader())
+    with reader.session(halt=False) as tag:
+        ndef = Ndef(tag)
+        assert ndef.read() is not None
+        # Sector 3 has the default key; the NDEF sector must be authenticated with ndef_key again
+        assert tag.read_block(12) is not None
+        assert ndef.write([NdefRecord.from_text('Back door')]) == reader.MFRC522.MI_OK
+        assert Ndef(tag).read().records[0].text == 'Back door'
+
+
+def test_classic_bad_mad_crc():
+    card = classic_card()
+    card.blocks[1][0] ^= 0xFF
+    reader = BasicMFRC522(reader=Emulator([card], realtime=False).reader())
+    with reader.session(halt=False) as tag:
+        ndef = Ndef(tag)
+        assert ndef.read() is None
+        with pytest.raises(ValueError):
+            ndef.write(RECORDS)
+
+
+def test_mad_crc():
+    # CRC-8/MIFARE-MAD check value
+    assert Ndef._mad_crc(b'123456789') == 0x99
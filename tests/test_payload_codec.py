@@ -0,0 +1,96 @@
+import pytest
+
+from mfrc522 import BasicMFRC522, EmulatedClassic, Emulator, PayloadCodec
+
+JSON = '{"id": 1234, "name": "front door", "type": "badge", "count": 42}'
+
+
+@pytest.mark.parametrize('data', [JSON, 'héllo', '', b'\x00\x01\x02\xff' * 20, b''])
+def test_round_trip(data):
+    codec = PayloadCodec()
+    payload = codec.encode(data)
+    assert codec.encoded_length(payload) == len(payload)
+    # The padding of the last block is ignored
+    assert codec.decode(payload + bytes(16)) == data
+
+
+def test_text_flag():
+    codec = PayloadCodec(compress=False)
+    payload = codec.encode('abc')
+    assert payload[:4] == bytes([PayloadCodec.MAGIC, PayloadCodec.TEXT, 0, 3])
+    assert payload[4:7] == b'abc'
+    assert codec.decode(payload) == 'abc'
+
+
+def test_deflate_shortens_repetitive_data():
+    codec = PayloadCodec()
+    payload = codec.encode(JSON)
+    assert payload[1] == PayloadCodec.TEXT | PayloadCodec.DEFLATE
+    assert len(payload) < len(JSON) + PayloadCodec.OVERHEAD
+    assert PayloadCodec(compress=False).decode(payload) == JSON
+
+
+def test_incompressible_data_is_stored():
+    payload = PayloadCodec().encode(b'\x9c')
+    assert payload[1] == 0
+
+
+def test_rejects_bad_header():
+    codec = PayloadCodec()
+    payload = bytearray(codec.encode('abc'))
+    payload[0] ^= 0xFF
+    with pytest.raises(ValueError):
+        codec.decode(payload)
+    with pytest.raises(ValueError):
+        codec.encoded_length(b'\xe5\x01')
+
+
+def test_rejects_truncated_payload():
+    codec = PayloadCodec()
+    with pytest.raises(ValueError):
+        codec.decode(codec.encode('abcdef')[:-1])
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_rejects_crc_mismatch(compress):
+    codec = PayloadCodec(compress=compress)
+    payload = bytearray(codec.encode(JSON))
+    payload[-1] ^= 0x01
+    with pytest.raises(ValueError):
+        codec.decode(payload)
+
+
+def test_rejects_other_dictionary():
+    payload = PayloadCodec().encode(JSON)
+    with pytest.raises(ValueError):
+        PayloadCodec(dictionary=b'"id": "name": "other"').decode(payload)
+
+
+def test_read_stops_at_the_end_of_the_payload():
+    # A different key on sector 3 makes any read past the payload fail
+    card = EmulatedClassic(keys={3: ([0x01] * 6, [0x01] * 6)})
+    chip = Emulator([card], realtime=False)
+    reader = BasicMFRC522(reader=chip.reader(), codec=PayloadCodec(compress=False))
+    text = 'x' * 60
+    (id, written) = reader.write_sectors(text, [7, 11, 15])
+    assert written == text
+
+    read = []
+    read_tag = reader.MFRC522.ReadTag
+
+    def recording_read_tag(block_addr, *args):
+        read.append(block_addr)
+        return read_tag(block_addr, *args)
+
+    reader.MFRC522.ReadTag = recording_read_tag
+    assert reader.read_sectors([7, 11, 15]) == (id, text)
+    # 60 bytes and 6 of overhead take 5 blocks, in sectors 1 and 2
+    assert read == [4, 5, 6, 8, 9]
+    assert card.blocks[10] == [0] * 16
+
+
+def test_write_rejects_payload_too_large():
+    chip = Emulator([EmulatedClassic()], realtime=False)
+    reader = BasicMFRC522(reader=chip.reader(), codec=PayloadCodec(compress=False))
+    with pytest.raises(ValueError):
+        reader.write_sectors('x' * 48, [7])
@@ -0,0 +1,66 @@
+from mfrc522 import BasicMFRC522, EmulatedClassic, Emulator, MFRC522
+
+FIFO_WRITE = (MFRC522.FIFODataReg << 1) & 0x7E
+FIFO_READ = FIFO_WRITE | 0x80
+
+
+class CountingSpi:
+    """
+    An spidev.SpiDev stand-in that records every transfer before passing it to the emulator.
+    """
+
+    def __init__(self, chip):
+        self.chip = chip
+        self.max_speed_hz = 1000000
+        self.frames = []
+
+    def xfer2(self, data, *args):
+        self.frames.append(list(data))
+        return self.chip.xfer2(data, *args)
+
+    def close(self):
+        pass
+
+    def fifo_writes(self):
+        return [f for f in self.frames if f[0] == FIFO_WRITE]
+
+    def fifo_reads(self):
+        return [f for f in self.frames if f[0] == FIFO_READ]
+
+
+def make_reader():
+    chip = Emulator([EmulatedClassic()], realtime=False)
+    spi = CountingSpi(chip)
+    reader = MFRC522(spi=spi, gpio=chip.gpio)
+    return (spi, reader, BasicMFRC522(reader=reader))
+
+
+def test_read_tag_loads_and_drains_fifo_in_one_transfer_each():
+    (spi, reader, basic) = make_reader()
+    with basic.session(halt=False) as tag:
+        assert tag.authenticate(4) == MFRC522.MI_OK
+        spi.frames.clear()
+        block = reader.ReadTag(4)
+
+    assert block == bytes(16)
+    # READ and its CRC go in with one burst; the 16 bytes and the CRC come out with one
+    assert spi.fifo_writes() == [[FIFO_WRITE, MFRC522.PICC_READ, 4] + list(MFRC522.CalulateCRC(reader, [0x30, 4]))]
+    assert len(spi.fifo_reads()) == 1
+    assert len(spi.fifo_reads()[0]) == 1 + MFRC522.MAX_LEN
+
+
+def test_write_tag_loads_and_drains_each_phase_in_one_transfer():
+    (spi, reader, basic) = make_reader()
+    data = bytes(range(16))
+    with basic.session(halt=False) as tag:
+        assert tag.authenticate(4) == MFRC522.MI_OK
+        spi.frames.clear()
+        assert reader.WriteTag(4, data) == MFRC522.MI_OK
+
+    # WRITE with its CRC, then the 16 bytes with theirs, one burst per phase
+    writes = spi.fifo_writes()
+    assert len(writes) == 2
+    assert len(writes[0]) == 1 + 2 + 2
+    assert writes[1][1:17] == list(data) and len(writes[1]) == 1 + 16 + 2
+    # The 4-bit ACK of each phase is drained with one transfer
+    assert len(spi.fifo_reads()) == 2
@@ -0,0 +1,50 @@
+import pytest
+
+from mfrc522 import BasicMFRC522, EmulatedClassic, Emulator, SpiTransport
+
+
+@pytest.mark.parametrize(('limit', 'expected'), [
+    # One step below the fastest step that passed
+    (5000000, 2000000),
+    (9000000, 6000000),
+    (2000000, 1000000),
+    # Only the first step passed, there is no step below it
+    (1500000, 1000000),
+    # Every step passed, so there is no margin
+    (None, 10000000),
+])
+def test_auto_speed(limit, expected):
+    chip = Emulator([EmulatedClassic()], realtime=False)
+    chip.spi_limit_hz = limit
+    reader = chip.reader(spd='auto')
+    assert reader.spd == expected
+    assert chip.max_speed_hz == expected
+    # The chip was configured at the chosen clock, and answers reliably
+    (id, text) = BasicMFRC522(reader=reader).read_no_block(11)
+    assert id is not None
+
+
+def test_tune_respects_max_speed():
+    chip = Emulator([], realtime=False)
+    transport = SpiTransport(chip)
+    assert transport.tune(max_speed_hz=4000000) == 4000000
+    assert chip.max_speed_hz == 4000000
+
+
+def test_tune_fails_when_no_clock_works():
+    chip = Emulator([], realtime=False)
+    chip.spi_limit_hz = 500000
+    transport = SpiTransport(chip)
+    with pytest.raises(IOError):
+        transport.tune()
+    assert chip.max_speed_hz == SpiTransport.SPEEDS[0]
+
+
+def test_check_link():
+    chip = Emulator([], realtime=False)
+    chip.spi_limit_hz = 4000000
+    transport = SpiTransport(chip)
+    chip.max_speed_hz = 4000000
+    assert transport.check_link()
+    chip.max_speed_hz = 6000000
+    assert not transport.check_link()
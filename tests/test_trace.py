@@ -0,0 +1,78 @@
+import io
+
+import pytest
+
+from mfrc522 import BasicMFRC522, EmulatedClassic, Emulator, TraceRecorder, TraceReplay
+
+
+def session(reader):
+    basic = BasicMFRC522(reader=reader)
+    results = [basic.write_no_block('traced', 11)]
+    # The card is left selected, so the first request only sends it back to IDLE
+    results.append(basic.read_no_block(11))
+    results.append(basic.read_no_block(11))
+    return results
+
+
+def record():
+    chip = Emulator([EmulatedClassic()], realtime=False)
+    trace = io.BytesIO()
+    reader = chip.reader(trace=trace)
+    results = session(reader)
+    reader.Close()
+    return (trace.getvalue(), results)
+
+
+def test_replay_gives_the_same_results():
+    (data, results) = record()
+    assert results[2][1].startswith('traced')
+    replay = TraceReplay(io.BytesIO(data))
+    reader = replay.reader()
+    assert session(reader) == results
+    assert replay.remaining == 0
+
+
+def test_replay_rejects_other_transfers():
+    (data, results) = record()
+    replay = TraceReplay(io.BytesIO(data))
+    reader = replay.reader()
+    basic = BasicMFRC522(reader=reader)
+    with pytest.raises(ValueError):
+        basic.write_no_block('something else', 11)
+
+
+def test_replay_not_strict_returns_recorded_answers():
+    (data, results) = record()
+    replay = TraceReplay(io.BytesIO(data), strict=False)
+    reader = replay.reader()
+    assert session(reader) == results
+
+
+def test_bad_magic():
+    (data, results) = record()
+    with pytest.raises(ValueError):
+        TraceReplay(io.BytesIO(b'X' + data[1:]))
+
+
+def test_unsupported_version():
+    (data, results) = record()
+    data = bytearray(data)
+    data[len(TraceRecorder.MAGIC)] = TraceRecorder.VERSION + 1
+    with pytest.raises(ValueError):
+        TraceReplay(io.BytesIO(bytes(data)))
+
+
+def test_truncated_trace():
+    (data, results) = record()
+    with pytest.raises(ValueError):
+        TraceReplay(io.BytesIO(data[:-1]))
+
+
+def test_dump():
+    (data, results) = record()
+    replay = TraceReplay(io.BytesIO(data))
+    out = io.StringIO()
+    replay.dump(out)
+    lines = out.getvalue().splitlines()
+    assert len(lines) == len(replay.records)
+    assert any(' R VersionReg ' in line or ' W CommandReg ' in line for line in lines)
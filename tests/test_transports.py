@@ -0,0 +1,183 @@
+import pytest
+
+from mfrc522 import BasicMFRC522, EmulatedClassic, EmulatedI2C, EmulatedSerial, Emulator, I2cTransport, MFRC522, UartTransport
+
+
+class LimitedSerial(EmulatedSerial):
+    """
+    A port that does not support some data rates.
+    """
+
+    unsupported = (1228800,)
+
+    @property
+    def baudrate(self):
+        return self._baudrate
+
+    @baudrate.setter
+    def baudrate(self, rate):
+        if rate in self.unsupported:
+            raise ValueError("Unsupported baud rate {}".format(rate))
+        self._baudrate = rate
+
+
+class NoisySerial(EmulatedSerial):
+    """
+    A port that loses the answers of the chip above a data rate.
+    """
+
+    limit = 921600
+
+    def read(self, size=1):
+        answer = super().read(size)
+        return answer if self.baudrate <= self.limit else b''
+
+
+class WrongEchoSerial(EmulatedSerial):
+    """
+    A port that garbles the echoes of writes once broken is set.
+    """
+
+    broken = False
+
+    def read(self, size=1):
+        answer = super().read(size)
+        return bytes(b ^ 0x01 for b in answer) if self.broken else answer
+
+
+class RecordingI2C(EmulatedI2C):
+    """
+    An I2C bus that records the lengths of the SMBus block transfers.
+    """
+
+    def __init__(self, chip):
+        super().__init__(chip)
+        self.blocks = []
+
+    def write_i2c_block_data(self, address, reg, data):
+        self.blocks.append(('write', len(data)))
+        super().write_i2c_block_data(address, reg, data)
+
+    def read_i2c_block_data(self, address, reg, length):
+        self.blocks.append(('read', length))
+        return super().read_i2c_block_data(address, reg, length)
+
+
+class PlainSMBus:
+    """
+    An SMBus without combined transactions, so each register takes its own transaction.
+    """
+
+    def __init__(self, bus):
+        self.bus = bus
+
+    def __getattr__(self, name):
+        if name in ('i2c_rdwr', 'i2c_msg'):
+            raise AttributeError(name)
+        return getattr(self.bus, name)
+
+
+def read_card(chip, reader):
+    chip.cards[0].blocks[8] = list(b'over another bus')
+    (id, text) = BasicMFRC522(reader=reader).read_no_block(11)
+    assert id is not None
+    assert text.startswith('over another bus')
+
+
+def test_uart_negotiates_fastest_rate():
+    chip = Emulator([EmulatedClassic()], realtime=False)
+    reader = chip.reader(transport=UartTransport(EmulatedSerial(chip)))
+    assert reader.transport.baudrate == 1228800
+    assert chip.uart_baudrate() == pytest.approx(1228800, rel=0.03)
+    read_card(chip, reader)
+
+
+def test_uart_respects_max_baudrate():
+    chip = Emulator([EmulatedClassic()], realtime=False)
+    transport = UartTransport(EmulatedSerial(chip), max_baudrate=115200)
+    assert transport.baudrate == 115200
+    assert chip.uart_baudrate() == pytest.approx(115200, rel=0.03)
+
+
+def test_uart_skips_rate_the_port_rejects():
+    chip = Emulator([EmulatedClassic()], realtime=False)
+    reader = chip.reader(transport=UartTransport(LimitedSerial(chip)))
+    assert reader.transport.baudrate == 921600
+    assert chip.uart_baudrate() == pytest.approx(921600, rel=0.03)
+    read_card(chip, reader)
+
+
+def test_uart_falls_back_when_check_fails():
+    chip = Emulator([EmulatedClassic()], realtime=False)
+    reader = chip.reader(transport=UartTransport(NoisySerial(chip)))
+    assert reader.transport.baudrate == 921600
+    assert chip.uart_baudrate() == pytest.approx(921600, rel=0.03)
+    read_card(chip, reader)
+
+
+def test_uart_soft_reset_negotiates_again():
+    chip = Emulator([EmulatedClassic()], realtime=False)
+    reader = chip.reader(transport=UartTransport(EmulatedSerial(chip)))
+    reader.Init()
+    assert reader.transport.baudrate == 1228800
+    assert chip.uart_baudrate() == pytest.approx(1228800, rel=0.03)
+    read_card(chip, reader)
+
+
+def test_uart_checks_write_echo():
+    chip = Emulator([EmulatedClassic()], realtime=False)
+    port = WrongEchoSerial(chip)
+    transport = UartTransport(port)
+    transport.write_regs([(MFRC522.TxAutoReg, 0x40)])
+    port.broken = True
+    with pytest.raises(IOError):
+        transport.write_regs([(MFRC522.TxAutoReg, 0x40)])
+
+
+def test_uart_no_answer():
+    chip = Emulator([EmulatedClassic()], realtime=False)
+    port = EmulatedSerial(chip)
+    transport = UartTransport(port)
+    # The chip no longer understands the port
+    port.baudrate = 9600
+    with pytest.raises(IOError):
+        transport.read_reg(MFRC522.VersionReg)
+
+
+@pytest.mark.parametrize('count', [1, 32, 33, 64])
+def test_i2c_fifo_split_in_blocks(count):
+    chip = Emulator([], realtime=False)
+    bus = RecordingI2C(chip)
+    transport = I2cTransport(bus)
+    data = list(range(count))
+    sizes = [32] * (count // 32) + ([count % 32] if count % 32 else [])
+    transport.write_reg(MFRC522.FIFOLevelReg, 0x80)
+    transport.write_fifo(MFRC522.FIFODataReg, data)
+    assert bus.blocks == [('write', n) for n in sizes]
+    assert transport.read_reg(MFRC522.FIFOLevelReg) == count
+    del bus.blocks[:]
+    assert transport.read_fifo(MFRC522.FIFODataReg, count) == data
+    assert bus.blocks == [('read', n) for n in sizes]
+
+
+@pytest.mark.parametrize('bus', [EmulatedI2C, lambda chip: PlainSMBus(EmulatedI2C(chip))])
+def test_i2c_reads_card(bus):
+    chip = Emulator([EmulatedClassic()], realtime=False)
+    reader = chip.reader(transport=I2cTransport(bus(chip)))
+    read_card(chip, reader)
+
+
+def test_i2c_batches_in_one_transaction():
+    chip = Emulator([], realtime=False)
+    transport = I2cTransport(EmulatedI2C(chip))
+    before = chip.transfers
+    transport.write_regs([(MFRC522.TxAutoReg, 0x40), (MFRC522.ModeReg, 0x3D)])
+    assert transport.read_regs([MFRC522.TxAutoReg, MFRC522.ModeReg]) == [0x40, 0x3D]
+    assert chip.transfers == before + 2
+
+
+def test_i2c_wrong_address():
+    chip = Emulator([], realtime=False)
+    transport = I2cTransport(EmulatedI2C(chip), address=0x29)
+    with pytest.raises(IOError):
+        transport.read_reg(MFRC522.VersionReg)
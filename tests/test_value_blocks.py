@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from mfrc522 import AsyncBasicMFRC522, BasicMFRC522, EmulatedClassic, Emulator, MFRC522
+
+
+def make_reader(**kwargs):
+    card = EmulatedClassic()
+    chip = Emulator([card], realtime=False)
+    return (card, BasicMFRC522(reader=chip.reader(**kwargs)))
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.mark.parametrize('value', [0, 1, -1, 100, 0x7FFFFFFF, -0x80000000])
+def test_value_block_round_trip(value):
+    block = MFRC522.ValueBlock(value, 5)
+    assert len(block) == 16
+    assert MFRC522.ParseValueBlock(block) == (value, 5)
+
+
+def test_value_block_rejects_out_of_range():
+    with pytest.raises(ValueError):
+        MFRC522.ValueBlock(0x80000000, 4)
+
+
+@pytest.mark.parametrize('index', [0, 4, 8, 12, 13])
+def test_parse_rejects_malformed_block(index):
+    block = bytearray(MFRC522.ValueBlock(42, 4))
+    block[index] ^= 0x01
+    assert MFRC522.ParseValueBlock(block) is None
+
+
+@pytest.mark.parametrize('crc', ['host', 'frame'])
+def test_increment_decrement_transfer(crc):
+    (card, reader) = make_reader(crc=crc)
+    with reader.session(halt=False) as tag:
+        assert tag.write_value(4, 100) == MFRC522.MI_OK
+        assert tag.increment(4, 5) == MFRC522.MI_OK
+        assert tag.transfer(4) == MFRC522.MI_OK
+        assert tag.read_value(4) == 105
+        assert tag.decrement(4, 110) == MFRC522.MI_OK
+        assert tag.transfer(4) == MFRC522.MI_OK
+        assert tag.read_value(4) == -5
+    assert MFRC522.ParseValueBlock(bytes(card.blocks[4])) == (-5, 4)
+
+
+def test_restore_copies_to_backup_block():
+    (card, reader) = make_reader()
+    with reader.session(halt=False) as tag:
+        assert tag.write_value(4, 77) == MFRC522.MI_OK
+        assert tag.restore(4) == MFRC522.MI_OK
+        assert tag.transfer(5) == MFRC522.MI_OK
+        assert tag.read_value(5) == 77
+
+
+def test_adjust_value():
+    (card, reader) = make_reader()
+    uid = reader.write_value(4, 100)
+    assert uid is not None
+    assert reader.adjust_value(4, -30) == uid
+    assert reader.read_value(4) == (uid, 70)
+    # Several deltas are summed into one command
+    assert reader.adjust_value(4, [5, 10, -3]) == uid
+    assert reader.read_value(4) == (uid, 82)
+    assert reader.adjust_value(4, 0, transfer_block=6) == uid
+    assert MFRC522.ParseValueBlock(bytes(card.blocks[6]))[0] == 82
+
+
+def test_adjust_value_of_data_block_fails():
+    (card, reader) = make_reader()
+    # Block 6 holds zeros, not a value block, so the card refuses the command
+    assert reader.adjust_value_no_block(6, 5) is None
+    with pytest.raises(ValueError):
+        reader.adjust_value(7, 1)
+
+
+def test_operand_out_of_range():
+    (card, reader) = make_reader()
+    with reader.session(halt=False) as tag:
+        with pytest.raises(ValueError):
+            tag.increment(4, -1)
+
+
+def test_async_value_commands():
+    card = EmulatedClassic()
+    chip = Emulator([card], realtime=False)
+    reader = AsyncBasicMFRC522(reader=chip.reader())
+
+    async def main():
+        async with reader.session(halt=False) as tag:
+            assert await tag.write_value(4, 10) == MFRC522.MI_OK
+            assert await tag.read_value(4) == 10
+            assert await tag.increment(4, 7) == MFRC522.MI_OK
+            assert await tag.transfer(4) == MFRC522.MI_OK
+            assert await tag.read_value(4) == 17
+            assert await tag.decrement(4, 20) == MFRC522.MI_OK
+            assert await tag.transfer(4) == MFRC522.MI_OK
+            assert await tag.read_value(4) == -3
+            assert await tag.restore(4) == MFRC522.MI_OK
+            assert await tag.transfer(5) == MFRC522.MI_OK
+            assert await tag.read_value(5) == -3
+            assert await tag.adjust_value(4, [10, 5]) == MFRC522.MI_OK
+            assert await tag.read_value(4) == 12
+            assert await tag.adjust_value(4, 0) == MFRC522.MI_OK
+
+    run(main())
+    assert MFRC522.ParseValueBlock(bytes(card.blocks[4])) == (12, 4)